@@ -8,10 +8,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
 from uuid import UUID
 
+from sqlalchemy import Integer, Text, cast, func, literal, null, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from gotrue.types import User
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.db.session import get_session
 from app.db.models import Document, Summary, Quiz, Question, UserAnswer
 from app.dependencies import get_current_user
@@ -35,13 +37,74 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 
-def truncate_text(text: str, max_length: int = 200) -> str:
+PREVIEW_LENGTH = 200
+
+
+def truncate_text(text: str, max_length: int = PREVIEW_LENGTH) -> str:
     """Truncate text to max_length characters, adding ellipsis if needed."""
     if len(text) <= max_length:
         return text
     return text[:max_length].rstrip() + "..."
 
 
+def preview_column(column):
+    """
+    SQL expression for the start of a long text column: one character more than
+    PREVIEW_LENGTH, so truncate_text can still tell whether to add an ellipsis
+    without the whole text being transferred.
+    """
+    return func.substr(column, 1, PREVIEW_LENGTH + 1)
+
+
+def summary_preview_column():
+    """
+    The stored summary preview; summaries written before the column existed fall
+    back to the start of summary_text.
+    """
+    return func.coalesce(Summary.summary_preview, preview_column(Summary.summary_text))
+
+
+def parse_cursor(cursor: Optional[str]):
+    """
+    Decodes the optional cursor query parameter.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_query(query, timestamp_column, id_column, after, offset: int, limit: int):
+    """
+    Orders a feed query newest first and selects one page of it.
+
+    With a cursor the page starts right after the cursor position (offset is
+    ignored); otherwise offset is applied. One extra row is fetched so the caller
+    can tell whether there is a next page.
+    """
+    if after is not None:
+        query = query.where(tuple_(timestamp_column, id_column) < tuple_(*after))
+    elif offset:
+        query = query.offset(offset)
+    return query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def next_page_cursor(rows, limit: int, timestamp_of, id_of) -> Optional[str]:
+    """Cursor for the page after rows (fetched with limit + 1), or None on the last page."""
+    if len(rows) <= limit or limit <= 0:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(timestamp_of(last), id_of(last))
+
+
 @router.get(
     "/history/summaries",
     response_model=SummaryHistoryResponse,
@@ -54,12 +117,14 @@ async def get_summary_history(
     current_user: Optional[User] = Depends(get_current_user),
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ):
     """
     Retrieve all summaries for the authenticated user in chronological order (newest first).
     
     - **limit**: Maximum number of summaries to return (default: 50)
     - **offset**: Number of summaries to skip for pagination (default: 0)
+    - **cursor**: `next_cursor` of the previous page; takes precedence over offset
     """
     if not current_user:
         raise HTTPException(
@@ -68,38 +133,46 @@ async def get_summary_history(
         )
     
     user_id = UUID(current_user.id)
+    after = parse_cursor(cursor)
     logger.info(f"Fetching summary history for user: {user_id}")
     
     try:
         # Query summaries with document join for document title
-        query = (
-            select(Summary, Document)
+        # Only the columns the list shows: never the full summary or document text
+        query = keyset_query(
+            select(
+                Summary.id,
+                Summary.document_id,
+                Document.filename,
+                summary_preview_column().label("preview"),
+                Summary.generated_at,
+                Summary.ai_model,
+            )
             .join(Document, Summary.document_id == Document.id)
-            .where(Summary.user_id == user_id)
-            .order_by(Summary.generated_at.desc())
-            .offset(offset)
-            .limit(limit)
+            .where(Summary.user_id == user_id),
+            Summary.generated_at, Summary.id, after, offset, limit,
         )
         
         result = await session.execute(query)
         rows = result.all()
+        next_cursor = next_page_cursor(rows, limit, lambda row: row.generated_at, lambda row: row.id)
+        rows = rows[:limit]
         
         # Count total summaries for pagination
-        count_query = select(Summary).where(Summary.user_id == user_id)
-        count_result = await session.execute(count_query)
-        total = len(count_result.all())
+        count_query = select(func.count()).select_from(Summary).where(Summary.user_id == user_id)
+        total = (await session.execute(count_query)).scalar_one()
         
         # Transform to response model
         history_items: List[SummaryHistoryItem] = []
-        for summary, document in rows:
+        for row in rows:
             history_items.append(
                 SummaryHistoryItem(
-                    id=summary.id,
-                    document_id=summary.document_id,
-                    document_title=document.filename,
-                    summary_preview=truncate_text(summary.summary_text) if summary.summary_text else None,
-                    generated_at=summary.generated_at,
-                    ai_model=summary.ai_model,
+                    id=row.id,
+                    document_id=row.document_id,
+                    document_title=row.filename,
+                    summary_preview=truncate_text(row.preview) if row.preview else None,
+                    generated_at=row.generated_at,
+                    ai_model=row.ai_model,
                     type=HistoryItemType.SUMMARY,
                 )
             )
@@ -109,6 +182,7 @@ async def get_summary_history(
         return SummaryHistoryResponse(
             data=history_items,
             total=total,
+            next_cursor=next_cursor,
             message=f"Retrieved {len(history_items)} summaries"
         )
         
@@ -132,12 +206,14 @@ async def get_quiz_history(
     current_user: Optional[User] = Depends(get_current_user),
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ):
     """
     Retrieve all quizzes for the authenticated user in chronological order (newest first).
     
     - **limit**: Maximum number of quizzes to return (default: 50)
     - **offset**: Number of quizzes to skip for pagination (default: 0)
+    - **cursor**: `next_cursor` of the previous page; takes precedence over offset
     """
     if not current_user:
         raise HTTPException(
@@ -146,40 +222,49 @@ async def get_quiz_history(
         )
     
     user_id = UUID(current_user.id)
+    after = parse_cursor(cursor)
     logger.info(f"Fetching quiz history for user: {user_id}")
     
     try:
         # Query quizzes with document join for document title
-        query = (
-            select(Quiz, Document)
+        query = keyset_query(
+            select(
+                Quiz.id,
+                Quiz.document_id,
+                Document.filename,
+                Quiz.title,
+                Quiz.status,
+                Quiz.total_questions,
+                Quiz.created_at,
+                Quiz.ai_model,
+            )
             .join(Document, Quiz.document_id == Document.id)
-            .where(Quiz.user_id == user_id)
-            .order_by(Quiz.created_at.desc())
-            .offset(offset)
-            .limit(limit)
+            .where(Quiz.user_id == user_id),
+            Quiz.created_at, Quiz.id, after, offset, limit,
         )
         
         result = await session.execute(query)
         rows = result.all()
+        next_cursor = next_page_cursor(rows, limit, lambda row: row.created_at, lambda row: row.id)
+        rows = rows[:limit]
         
         # Count total quizzes for pagination
-        count_query = select(Quiz).where(Quiz.user_id == user_id)
-        count_result = await session.execute(count_query)
-        total = len(count_result.all())
+        count_query = select(func.count()).select_from(Quiz).where(Quiz.user_id == user_id)
+        total = (await session.execute(count_query)).scalar_one()
         
         # Transform to response model
         history_items: List[QuizHistoryItem] = []
-        for quiz, document in rows:
+        for row in rows:
             history_items.append(
                 QuizHistoryItem(
-                    id=quiz.id,
-                    document_id=quiz.document_id,
-                    document_title=document.filename,
-                    title=quiz.title,
-                    status=quiz.status,
-                    total_questions=quiz.total_questions,
-                    created_at=quiz.created_at,
-                    ai_model=quiz.ai_model,
+                    id=row.id,
+                    document_id=row.document_id,
+                    document_title=row.filename,
+                    title=row.title,
+                    status=row.status,
+                    total_questions=row.total_questions,
+                    created_at=row.created_at,
+                    ai_model=row.ai_model,
                     type=HistoryItemType.QUIZ,
                 )
             )
@@ -189,6 +274,7 @@ async def get_quiz_history(
         return QuizHistoryResponse(
             data=history_items,
             total=total,
+            next_cursor=next_cursor,
             message=f"Retrieved {len(history_items)} quizzes"
         )
         
@@ -212,6 +298,7 @@ async def get_combined_history(
     current_user: Optional[User] = Depends(get_current_user),
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ):
     """
     Retrieve all summaries and quizzes for the authenticated user in chronological order (newest first).
@@ -219,6 +306,7 @@ async def get_combined_history(
     
     - **limit**: Maximum number of items to return (default: 50)
     - **offset**: Number of items to skip for pagination (default: 0)
+    - **cursor**: `next_cursor` of the previous page; takes precedence over offset
     """
     if not current_user:
         raise HTTPException(
@@ -227,75 +315,89 @@ async def get_combined_history(
         )
     
     user_id = UUID(current_user.id)
+    after = parse_cursor(cursor)
     logger.info(f"Fetching combined history for user: {user_id}")
     
     try:
-        # Fetch summaries
-        summary_query = (
-            select(Summary, Document)
+        # Summaries and quizzes as one feed with identical columns; the database
+        # sorts and pages it, so each request only reads one page of rows.
+        # Each branch is cut to the rows the page can need along its own
+        # (user_id, timestamp, id) index before the merge.
+        branch_limit = limit if after is not None else offset + limit
+        summary_query = keyset_query(
+            select(
+                Summary.id.label("id"),
+                Summary.document_id.label("document_id"),
+                Document.filename.label("document_title"),
+                cast(null(), Text).label("title"),
+                summary_preview_column().label("preview"),
+                literal(HistoryItemType.SUMMARY.value).label("type"),
+                cast(null(), Text).label("status"),
+                cast(null(), Integer).label("total_questions"),
+                Summary.generated_at.label("created_at"),
+                Summary.ai_model.label("ai_model"),
+            )
             .join(Document, Summary.document_id == Document.id)
-            .where(Summary.user_id == user_id)
-        )
-        summary_result = await session.execute(summary_query)
-        summary_rows = summary_result.all()
-        
-        # Fetch quizzes
-        quiz_query = (
-            select(Quiz, Document)
+            .where(Summary.user_id == user_id),
+            Summary.generated_at, Summary.id, after, 0, branch_limit,
+        ).subquery()
+        quiz_query = keyset_query(
+            select(
+                Quiz.id.label("id"),
+                Quiz.document_id.label("document_id"),
+                Document.filename.label("document_title"),
+                Quiz.title.label("title"),
+                cast(null(), Text).label("preview"),
+                literal(HistoryItemType.QUIZ.value).label("type"),
+                Quiz.status.label("status"),
+                Quiz.total_questions.label("total_questions"),
+                Quiz.created_at.label("created_at"),
+                Quiz.ai_model.label("ai_model"),
+            )
             .join(Document, Quiz.document_id == Document.id)
-            .where(Quiz.user_id == user_id)
+            .where(Quiz.user_id == user_id),
+            Quiz.created_at, Quiz.id, after, 0, branch_limit,
+        ).subquery()
+        feed = union_all(select(summary_query), select(quiz_query)).subquery()
+        page_query = (
+            select(feed)
+            .order_by(feed.c.created_at.desc(), feed.c.id.desc())
+            .offset(0 if after is not None else offset)
+            .limit(limit + 1)
         )
-        quiz_result = await session.execute(quiz_query)
-        quiz_rows = quiz_result.all()
-        
-        # Combine and transform items
-        combined_items: List[CombinedHistoryItem] = []
-        
-        for summary, document in summary_rows:
-            combined_items.append(
-                CombinedHistoryItem(
-                    id=summary.id,
-                    document_id=summary.document_id,
-                    document_title=document.filename,
-                    title=None,
-                    preview=truncate_text(summary.summary_text) if summary.summary_text else None,
-                    type=HistoryItemType.SUMMARY,
-                    status=None,
-                    total_questions=None,
-                    created_at=summary.generated_at,
-                    ai_model=summary.ai_model,
-                )
-            )
-        
-        for quiz, document in quiz_rows:
-            combined_items.append(
-                CombinedHistoryItem(
-                    id=quiz.id,
-                    document_id=quiz.document_id,
-                    document_title=document.filename,
-                    title=quiz.title,
-                    preview=None,
-                    type=HistoryItemType.QUIZ,
-                    status=quiz.status,
-                    total_questions=quiz.total_questions,
-                    created_at=quiz.created_at,
-                    ai_model=quiz.ai_model,
-                )
+        rows = (await session.execute(page_query)).all()
+        next_cursor = next_page_cursor(rows, limit, lambda row: row.created_at, lambda row: row.id)
+        rows = rows[:limit]
+        
+        # Both counts in one round-trip
+        total_query = select(
+            select(func.count()).select_from(Summary).where(Summary.user_id == user_id).scalar_subquery()
+            + select(func.count()).select_from(Quiz).where(Quiz.user_id == user_id).scalar_subquery()
+        )
+        total = (await session.execute(total_query)).scalar_one()
+        
+        paginated_items = [
+            CombinedHistoryItem(
+                id=row.id,
+                document_id=row.document_id,
+                document_title=row.document_title,
+                title=row.title,
+                preview=truncate_text(row.preview) if row.preview else None,
+                type=HistoryItemType(row.type),
+                status=row.status,
+                total_questions=row.total_questions,
+                created_at=row.created_at,
+                ai_model=row.ai_model,
             )
-        
-        # Sort by created_at descending
-        combined_items.sort(key=lambda x: x.created_at, reverse=True)
-        
-        total = len(combined_items)
-        
-        # Apply pagination
-        paginated_items = combined_items[offset:offset + limit]
+            for row in rows
+        ]
         
         logger.info(f"Retrieved {len(paginated_items)} combined history items for user: {user_id}")
         
         return CombinedHistoryResponse(
             data=paginated_items,
             total=total,
+            next_cursor=next_cursor,
             message=f"Retrieved {len(paginated_items)} history items"
         )
         
@@ -339,7 +441,7 @@ async def get_quiz_review(
     try:
         # Query quiz with document join
         quiz_query = (
-            select(Quiz, Document)
+            select(Quiz, Document.filename)
             .join(Document, Quiz.document_id == Document.id)
             .where(Quiz.id == quiz_id)
         )
@@ -353,7 +455,7 @@ async def get_quiz_review(
                 detail="Quiz not found"
             )
         
-        quiz, document = quiz_row
+        quiz, document_title = quiz_row
         
         # Check if user owns this quiz
         if quiz.user_id != user_id:
@@ -391,15 +493,6 @@ async def get_quiz_review(
         for question in questions:
             user_answer = answer_map.get(question.id)
             
-            # Parse options from JSON string if present
-            options = None
-            if question.options:
-                import json
-                try:
-                    options = json.loads(question.options)
-                except json.JSONDecodeError:
-                    options = None
-            
             is_correct = user_answer.is_correct if user_answer else None
             if is_correct:
                 correct_count += 1
@@ -409,7 +502,7 @@ async def get_quiz_review(
                     id=question.id,
                     question_text=question.question_text,
                     question_type=question.question_type,
-                    options=options,
+                    options=question.options,
                     correct_answer=question.correct_answer,
                     explanation=question.explanation,
                     user_answer=user_answer.user_answer if user_answer else None,
@@ -426,7 +519,7 @@ async def get_quiz_review(
         quiz_detail = QuizReviewDetail(
             id=quiz.id,
             document_id=quiz.document_id,
-            document_title=document.filename,
+            document_title=document_title,
             title=quiz.title,
             status=quiz.status,
             total_questions=total_questions,
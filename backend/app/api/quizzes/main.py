@@ -1,18 +1,19 @@
 # backend/app/api/quizzes/main.py
 
-import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Callable, Optional, List
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from gotrue.types import User
 
-from app.db.session import get_session
+from app.db.session import get_session, get_session_factory
 from app.db.models import Document, Quiz, Question
 from app.dependencies import get_current_user
+from app.api.sse import SSE_HEADERS, status_event_stream
 from app.schemas.quiz import (
     QuizGenerateRequest,
     QuizGenerateResponse,
@@ -24,7 +25,11 @@ from app.schemas.quiz import (
     QuestionType,
     QuizStatus,
 )
-from app.services.ai_generation.quiz_generator import generate_quiz, grade_quiz
+from app.services.ai_generation.quiz_generator import grade_quiz
+from app.services.events.status_bus import QUIZ
+from app.services.jobs.queue import enqueue_job, JOB_GENERATE_QUIZ
+from app.services.read_models.quiz_cache import cache_quiz, get_cached_quiz
+from app.services.storage.content import has_document_content
 
 router = APIRouter()
 
@@ -33,40 +38,6 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 
-async def run_quiz_generation(
-    document_id: UUID,
-    user_id: Optional[UUID],
-    num_questions: int,
-    question_types: Optional[List[QuestionType]],
-    quiz_id: UUID,
-    db_session: AsyncSession,
-):
-    """
-    Background task to generate quiz using AI.
-    """
-    logger.info(f"Starting quiz generation for document_id: {document_id}, quiz_id: {quiz_id}")
-    
-    try:
-        await generate_quiz(
-            document_id=document_id,
-            user_id=user_id,
-            num_questions=num_questions,
-            question_types=question_types,
-            session=db_session
-        )
-        logger.info(f"Quiz generation completed for quiz_id: {quiz_id}")
-    except Exception as e:
-        logger.error(f"Quiz generation failed for quiz_id: {quiz_id}. Error: {e}", exc_info=True)
-        # Update quiz status to failed
-        try:
-            quiz = await db_session.get(Quiz, quiz_id)
-            if quiz:
-                quiz.status = "failed"
-                await db_session.commit()
-        except Exception as db_error:
-            logger.error(f"Failed to update quiz status to failed: {db_error}")
-
-
 @router.post(
     "/quizzes/generate",
     response_model=QuizGenerateResponse,
@@ -74,7 +45,6 @@ async def run_quiz_generation(
 )
 async def generate_quiz_endpoint(
     request: QuizGenerateRequest,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: Optional[User] = Depends(get_current_user)
 ):
@@ -82,7 +52,8 @@ async def generate_quiz_endpoint(
     Generate a quiz from a document.
     
     This endpoint initiates quiz generation using AI and returns immediately.
-    The quiz will be generated in the background.
+    The quiz will be generated by a background job; its status moves from
+    "generating" to "ready" (or "failed").
     """
     effective_user_id: Optional[UUID] = None
     if current_user:
@@ -97,7 +68,7 @@ async def generate_quiz_endpoint(
         )
     
     # Check if document has extracted text
-    if not document.raw_content:
+    if not await has_document_content(session, request.document_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Document text has not been extracted yet. Please wait for processing to complete."
@@ -111,16 +82,31 @@ async def generate_quiz_endpoint(
         )
     
     try:
-        # Generate quiz directly (not in background for simplicity in MVP)
-        quiz = await generate_quiz(
+        # Create the quiz record now and generate its questions in a background job
+        quiz = Quiz(
             document_id=request.document_id,
             user_id=effective_user_id,
-            num_questions=request.num_questions or 5,
-            question_types=request.question_types,
-            session=session
+            title=f"Quiz for {document.filename}",
+            status="generating",
+            total_questions=0,
+            ai_model="gemini-2.5-flash"
+        )
+        session.add(quiz)
+        enqueue_job(
+            session,
+            JOB_GENERATE_QUIZ,
+            {
+                "quiz_id": quiz.id,
+                "document_id": request.document_id,
+                "user_id": effective_user_id,
+                "num_questions": request.num_questions or 5,
+                "question_types": [qt.value for qt in request.question_types] if request.question_types else None,
+            },
         )
+        await session.commit()
+        await session.refresh(quiz)
         
-        logger.info(f"Quiz {quiz.id} generation initiated for document {request.document_id}")
+        logger.info(f"Quiz {quiz.id} generation queued for document {request.document_id}")
         
         return QuizGenerateResponse(
             data=QuizResponse(
@@ -131,17 +117,12 @@ async def generate_quiz_endpoint(
                 total_questions=quiz.total_questions,
                 created_at=quiz.created_at
             ),
-            message="Quiz generated successfully.",
+            message="Quiz generation started.",
             status="success"
         )
         
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
     except Exception as e:
-        logger.error(f"Error generating quiz: {e}", exc_info=True)
+        logger.error(f"Error queuing quiz generation: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while generating the quiz"
@@ -159,7 +140,21 @@ async def get_quiz(
 ):
     """
     Get a quiz with its questions (without answers for taking the quiz).
+
+    Ready quizzes are served from the serialized quiz cache when possible.
     """
+    effective_user_id = UUID(current_user.id) if current_user else None
+
+    cached = await get_cached_quiz(quiz_id)
+    if cached:
+        owner_id, body = cached
+        if current_user and owner_id and owner_id != effective_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to access this quiz"
+            )
+        return Response(content=body, media_type="application/json")
+
     quiz = await session.get(Quiz, quiz_id)
     if not quiz:
         raise HTTPException(
@@ -168,7 +163,6 @@ async def get_quiz(
         )
     
     # Check ownership if user is authenticated
-    effective_user_id = UUID(current_user.id) if current_user else None
     if current_user and quiz.user_id and quiz.user_id != effective_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -184,16 +178,15 @@ async def get_quiz(
     # Convert questions to response format (without correct answers)
     question_responses = []
     for q in questions:
-        options = json.loads(q.options) if q.options else None
         question_responses.append(QuestionResponse(
             id=q.id,
             question_type=QuestionType(q.question_type),
             question_text=q.question_text,
-            options=options,
+            options=q.options,
             order_index=q.order_index
         ))
     
-    return QuizWithQuestionsResponse(
+    response = QuizWithQuestionsResponse(
         id=quiz.id,
         document_id=quiz.document_id,
         title=quiz.title,
@@ -202,6 +195,48 @@ async def get_quiz(
         created_at=quiz.created_at,
         questions=question_responses
     )
+    body = response.model_dump_json().encode("utf-8")
+    if quiz.status == "ready":
+        # Ready quizzes are immutable until regenerated
+        await cache_quiz(quiz_id, quiz.user_id, body)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/quizzes/{quiz_id}/status/stream")
+async def stream_quiz_status(
+    quiz_id: UUID,
+    session_factory: Callable[[], AsyncSession] = Depends(get_session_factory),
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """
+    Pushes the quiz's status as Server-Sent Events until it is ready or failed,
+    instead of the client polling GET /quizzes/{quiz_id}.
+
+    Event: `status` with {"type": "quiz", "id", "status"}.
+    """
+    async with session_factory() as session:
+        row = (await session.execute(select(Quiz.user_id).where(Quiz.id == quiz_id))).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Quiz with id {quiz_id} not found"
+        )
+    if current_user and row.user_id and row.user_id != UUID(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to access this quiz"
+        )
+
+    async def read_status():
+        # A session per read: the stream must not hold a pooled connection while it waits
+        async with session_factory() as session:
+            return (await session.execute(select(Quiz.status).where(Quiz.id == quiz_id))).scalar_one_or_none()
+
+    return StreamingResponse(
+        status_event_stream(QUIZ, quiz_id, read_status),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
 
 
 @router.post(
@@ -0,0 +1,65 @@
+# backend/app/api/sse.py
+"""
+Server-Sent Events helpers shared by the streaming endpoints.
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.events.status_bus import get_status_bus, is_terminal, status_event
+
+# Sent while no event is due, so proxies keep idle streams open
+KEEPALIVE_COMMENT = ": keep-alive\n\n"
+
+# Headers for every event stream: no caching, no proxy buffering
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Formats one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def status_event_stream(
+    kind: str,
+    entity_id: UUID,
+    read_status: Callable[[], Awaitable[Optional[str]]],
+) -> AsyncIterator[str]:
+    """
+    Streams "status" events for one document or quiz: the current status, then
+    each transition, until a terminal status or STATUS_STREAM_TIMEOUT_SECONDS.
+
+    Subscribes before reading the current status, so no transition committed in
+    between is missed; the status is read again on every keep-alive. read_status
+    should use a short-lived session of its own (see get_session_factory): the
+    stream may stay open for minutes.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.STATUS_STREAM_TIMEOUT_SECONDS
+    async with get_status_bus().subscribe(kind, entity_id) as events:
+        current = await read_status()
+        yield sse_event("status", status_event(kind, entity_id, current))
+        while not is_terminal(kind, current):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(
+                    events.get(), timeout=min(settings.STATUS_STREAM_KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                # Catches up on a transition whose event was lost (e.g. while the
+                # StatusListener reconnected)
+                status = await read_status()
+                if status != current:
+                    current = status
+                    yield sse_event("status", status_event(kind, entity_id, current))
+                else:
+                    yield KEEPALIVE_COMMENT
+                continue
+            if event["status"] != current:
+                current = event["status"]
+                yield sse_event("status", event)
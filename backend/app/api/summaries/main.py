@@ -2,8 +2,9 @@
 
 import logging
 import asyncio
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status, BackgroundTasks
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Callable, Optional
 from uuid import UUID, uuid4
 import os
 
@@ -11,14 +12,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from gotrue.types import User # Import Supabase User type
 
-from app.db.session import get_session
+from app.db.session import get_session, get_session_factory
 from app.db.models import Document, Summary
 from app.schemas.document import DocumentUploadRequestFields, DocumentUploadResponse
 from app.core.config import settings
-from app.supabase_client import get_supabase_admin_client
 from app.dependencies import get_current_user
-from app.services.ai_generation.text_extractor import extract_text_from_file
-from app.services.ai_generation.summary_generator import generate_summary
+from app.api.sse import SSE_HEADERS, sse_event, status_event_stream
+from app.services.ai_generation.extraction_pool import extract_text_in_pool
+from app.services.ai_generation.summary_generator import IncrementalSummarizer, generate_summary, stream_summary
+from app.services.storage.ingest import ingest_upload, matches_declared_type, media_type, UploadTooLargeError
+from app.services.storage.dedup import blob_storage_path, find_blob_path, find_extracted_text_for_duplicate
+from app.services.storage.content import has_document_content, load_document_content, save_document_content
+from app.services.storage.backends import get_document_storage
+from app.services.storage.base import StorageBackend
+from app.services.jobs.queue import enqueue_job, JOB_EXTRACT_TEXT, JOB_GENERATE_SUMMARY
+from app.services.events.status_bus import DOCUMENT, publish_status
 
 router = APIRouter()
 
@@ -36,39 +44,66 @@ MAX_FILE_SIZE_MB = 20
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
 
+async def _mark_extraction_failed(db_session: AsyncSession, document_id: UUID) -> None:
+    document = await db_session.get(Document, document_id)
+    if document:
+        document.status = "extraction-failed"
+        await db_session.commit()
+        await publish_status(db_session, DOCUMENT, document_id, "extraction-failed")
+
+
 async def run_text_extraction(
     document_id: UUID,
     storage_path: str,
     filename: str,
     user_id: Optional[UUID],
-    supabase_admin,
+    storage: StorageBackend,
     db_session: AsyncSession,
     auto_generate_summary: bool = True,
 ):
     """
-    Background task to extract text from an uploaded file and optionally trigger summary generation.
+    Job handler body: extract text from an uploaded file and optionally trigger summary generation.
+    Failures are recorded on the document and re-raised so the job queue can retry; files
+    of an unsupported type are marked extraction-failed without a retry.
     """
     logger.info(f"Starting text extraction for document_id: {document_id}")
     extracted_text = None
     document = None
-    
+    summarizer = None
+
     try:
-        # 1. Download the file from Supabase Storage (synchronous operation)
-        file_content = supabase_admin.storage.from_("user_documents").download(storage_path)
+        # 1. Reuse text already extracted from an identical upload, if any
+        extracted_text = await find_extracted_text_for_duplicate(db_session, document_id)
+        if extracted_text is not None:
+            logger.info(f"Reusing extracted text from an identical upload for document_id: {document_id}")
+        else:
+            # 2. Extraction workers map files on local storage directly; anything else is downloaded
+            file_source = storage.local_path(storage_path) or await storage.download(storage_path)
 
-        # 2. Extract text from the file content
-        extracted_text = extract_text_from_file(file_content, filename)
+            # 3. Extract text from the file content in the extraction process pool. When a summary
+            # follows, its chunks start summarizing while later pages are still being extracted
+            if auto_generate_summary:
+                summarizer = IncrementalSummarizer()
+            extracted_text = await extract_text_in_pool(
+                file_source, filename, on_part=summarizer.add if summarizer else None
+            )
+            if extracted_text is None:
+                # No extractor for this file type; a retry would fail the same way
+                logger.error(f"Unsupported file type for text extraction: {filename} (document_id: {document_id})")
+                await _mark_extraction_failed(db_session, document_id)
+                return
 
-        # 3. Update the document in the database with the existing session
+        # 4. Update the document in the database with the existing session
         document = await db_session.get(Document, document_id)
         if document:
-            document.raw_content = extracted_text
+            await save_document_content(db_session, document_id, extracted_text)
             document.status = "text-extracted"
             await db_session.commit()
+            await publish_status(db_session, DOCUMENT, document_id, "text-extracted")
             await db_session.refresh(document)
             logger.info(f"Successfully extracted text and updated status for document_id: {document_id}")
             
-            # 4. If text extraction is successful and auto_generate_summary is True, trigger summary generation
+            # 5. If text extraction is successful and auto_generate_summary is True, trigger summary generation
             if extracted_text and auto_generate_summary:
                 logger.info(f"Triggering summary generation for document_id: {document_id}")
                 # Pass user_id as-is (None for guests)
@@ -76,7 +111,8 @@ async def run_text_extraction(
                     document_id=document.id,
                     user_id=user_id,  # None for guest users is now supported
                     extracted_text=extracted_text,
-                    session=db_session # pass the existing session
+                    session=db_session, # pass the existing session
+                    summarizer=summarizer,
                 )
             elif extracted_text and not auto_generate_summary:
                 logger.info(f"Skipping auto summary generation for document_id: {document_id} (user will choose)")
@@ -86,12 +122,14 @@ async def run_text_extraction(
     except Exception as e:
         logger.error(f"Error during text extraction for document_id: {document_id}. Error: {e}", exc_info=True)
         try:
-            document = await db_session.get(Document, document_id)
-            if document:
-                document.status = "extraction-failed"
-                await db_session.commit()
+            await _mark_extraction_failed(db_session, document_id)
         except Exception as db_error:
             logger.error(f"Failed to update document status to extraction-failed: {db_error}")
+        raise
+    finally:
+        # No-op once generate_summary has consumed the summarizer
+        if summarizer:
+            summarizer.cancel()
 
 @router.post(
     "/documents/upload",
@@ -99,12 +137,11 @@ async def run_text_extraction(
     status_code=status.HTTP_202_ACCEPTED
 )
 async def upload_document_endpoint(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_id: Optional[UUID] = Form(None), # User ID from frontend (can be None for guest)
     auto_generate_summary: bool = Form(True), # Whether to auto-generate summary after text extraction
     session: AsyncSession = Depends(get_session),
-    supabase_admin = Depends(get_supabase_admin_client),  # Use admin client for storage operations
+    storage: StorageBackend = Depends(get_document_storage),
     current_user: Optional[User] = Depends(get_current_user) # Authenticated user from token
 ):
     # --- Security: Validate user_id ---
@@ -124,8 +161,9 @@ async def upload_document_endpoint(
             detail="Cannot provide user ID if not authenticated."
         )
 
-    # Server-side validation
-    if file.content_type not in ALLOWED_FILE_TYPES:
+    # Server-side validation (on the media type; parameters such as charset are ignored)
+    file_type = media_type(file.content_type)
+    if file_type not in ALLOWED_FILE_TYPES:
         logger.warning(f"Upload attempt with unsupported file type: {file.content_type} by user_id: {effective_user_id}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -133,24 +171,45 @@ async def upload_document_endpoint(
         )
 
     try:
-        file_content = await file.read()
-        if len(file_content) > MAX_FILE_SIZE_BYTES:
+        # Stream the upload in bounded chunks instead of buffering it in memory
+        try:
+            ingested = await ingest_upload(file, max_bytes=MAX_FILE_SIZE_BYTES)
+        except UploadTooLargeError:
             logger.warning(f"Upload attempt with oversized file by user_id: {effective_user_id}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File size exceeds limit. Max size is {MAX_FILE_SIZE_MB}MB."
             )
 
-        document_id = uuid4()
-        file_extension = os.path.splitext(file.filename)[1] if os.path.splitext(file.filename)[1] else ""
-        storage_path = f"user_uploads/{document_id}{file_extension}"
+        try:
+            if not matches_declared_type(file_type, ingested):
+                logger.warning(
+                    f"Upload content ({ingested.sniffed_content_type}) does not match declared type "
+                    f"{file.content_type} for user_id: {effective_user_id}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File content does not match the declared file type: {file.content_type}."
+                )
+
+            document_id = uuid4()
+            content_hash = ingested.sha256
+            logger.info(f"Ingested {ingested.size} bytes for document {document_id} (sha256={content_hash})")
 
-        # Upload to Supabase (synchronous call, no await needed)
-        supabase_admin.storage.from_("user_documents").upload(
-            path=storage_path,
-            file=file_content,
-            file_options={"content-type": file.content_type}
-        )
+            # Blobs are content-addressed: identical uploads share one stored file
+            storage_path = await find_blob_path(session, content_hash)
+            if storage_path:
+                logger.info(f"Document {document_id} deduplicated against stored blob {storage_path}")
+            else:
+                file_extension = os.path.splitext(file.filename)[1] if os.path.splitext(file.filename)[1] else ""
+                storage_path = blob_storage_path(content_hash, file_extension)
+
+                # Stream the spool file to Supabase without blocking the event loop.
+                # upsert makes concurrent uploads of the same content idempotent.
+                with ingested.open() as spooled_file:
+                    await storage.upload(storage_path, spooled_file, content_type=file_type, upsert=True)
+        finally:
+            ingested.cleanup()
 
         # Store metadata in DB
         # For now, set user_id to None to avoid FK constraints until profile system is fully set up
@@ -159,42 +218,40 @@ async def upload_document_endpoint(
             id=document_id,
             user_id=effective_user_id,
             filename=file.filename,
-            file_type=file.content_type,
+            file_type=file_type,
             storage_path=storage_path,
+            content_hash=content_hash,
             status="uploaded"
         )
         session.add(db_document)
-        
-        document_saved = False
+
+        # The extraction job is committed together with the document row, so it
+        # survives restarts and is picked up by a worker once the file is stored
+        enqueue_job(
+            session,
+            JOB_EXTRACT_TEXT,
+            {
+                "document_id": db_document.id,
+                "storage_path": storage_path,
+                "filename": file.filename,
+                "user_id": effective_user_id,
+                "auto_generate_summary": auto_generate_summary,
+            },
+        )
+
         try:
             await session.commit()
             await session.refresh(db_document)
-            document_saved = True
             logger.info(f"Document {document_id} metadata saved to database successfully")
         except Exception as db_error:
             logger.error(f"Could not save document metadata to database: {db_error}. File upload succeeded.", exc_info=True)
             # File is already uploaded to storage, so we'll still return success
             # The document record can be created later or manually
-            pass
-
-        # Only add text extraction if document was saved to database
-        if document_saved:
-            background_tasks.add_task(
-                run_text_extraction,
-                document_id=db_document.id,
-                storage_path=db_document.storage_path,
-                filename=db_document.filename,
-                user_id=effective_user_id,
-                supabase_admin=supabase_admin,
-                db_session=session,
-                auto_generate_summary=auto_generate_summary
-            )
-        else:
             logger.warning(f"Skipping text extraction for document {document_id} - not saved to database")
 
         logger.info(f"Document {document_id} upload accepted from user_id: {effective_user_id}. Text extraction scheduled.")
         return DocumentUploadResponse(
-            document_id=db_document.id,
+            document_id=document_id,
             message="File upload initiated successfully. Processing will begin shortly."
         )
 
@@ -218,19 +275,19 @@ async def get_document_status(
     logger.info(f"Fetching status for document_id: {document_id}")
     
     try:
-        statement = select(Document).where(Document.id == document_id)
+        statement = select(Document.status).where(Document.id == document_id)
         results = await session.execute(statement)
-        document = results.scalar_one_or_none()
+        document_status = results.scalar_one_or_none()
 
-        if not document:
+        if document_status is None:
             logger.warning(f"Status query for non-existent document_id: {document_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Document not found."
             )
         
-        logger.info(f"Status for document {document_id} is '{document.status}'")
-        return {"document_id": document_id, "status": document.status}
+        logger.info(f"Status for document {document_id} is '{document_status}'")
+        return {"document_id": document_id, "status": document_status}
 
     except HTTPException as e:
         raise e
@@ -241,16 +298,50 @@ async def get_document_status(
             detail="An unexpected error occurred while fetching document status."
         )
 
-@router.post("/documents/{document_id}/generate-summary")
+@router.get("/documents/{document_id}/status/stream")
+async def stream_document_status(
+    document_id: UUID,
+    session_factory: Callable[[], AsyncSession] = Depends(get_session_factory)
+):
+    """
+    Pushes the document's status as Server-Sent Events: the current status first,
+    then every transition until the pipeline finishes (summarized or failed).
+    Replaces polling GET /documents/{document_id}/status.
+
+    Event: `status` with {"type": "document", "id", "status"}.
+    """
+    async def read_status():
+        # A session per read: the stream must not hold a pooled connection while it waits
+        async with session_factory() as session:
+            return (
+                await session.execute(select(Document.status).where(Document.id == document_id))
+            ).scalar_one_or_none()
+
+    if await read_status() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+
+    return StreamingResponse(
+        status_event_stream(DOCUMENT, document_id, read_status),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+@router.post(
+    "/documents/{document_id}/generate-summary",
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def generate_summary_endpoint(
     document_id: UUID,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """
     Manually trigger summary generation for a document that has extracted text.
     This is used when the user chooses to generate a summary after uploading.
+    The summary is generated by a background job; poll the document status for progress.
     """
     logger.info(f"Manual summary generation requested for document_id: {document_id}")
     
@@ -268,7 +359,7 @@ async def generate_summary_endpoint(
                 detail="Document not found."
             )
         
-        if not document.raw_content:
+        if not await has_document_content(session, document_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Document text has not been extracted yet. Please wait for processing to complete."
@@ -285,18 +376,18 @@ async def generate_summary_endpoint(
                 detail="Summary already exists for this document."
             )
         
-        # Trigger summary generation
-        await generate_summary(
-            document_id=document.id,
-            user_id=effective_user_id,
-            extracted_text=document.raw_content,
-            session=session
+        # Queue summary generation
+        enqueue_job(
+            session,
+            JOB_GENERATE_SUMMARY,
+            {"document_id": document_id, "user_id": effective_user_id},
         )
+        await session.commit()
         
-        logger.info(f"Summary generation completed for document_id: {document_id}")
+        logger.info(f"Summary generation queued for document_id: {document_id}")
         return {
             "document_id": document_id,
-            "message": "Summary generation completed."
+            "message": "Summary generation started."
         }
 
     except HTTPException as e:
@@ -308,6 +399,74 @@ async def generate_summary_endpoint(
             detail="An unexpected error occurred while generating summary."
         )
 
+@router.get("/documents/{document_id}/summary/stream")
+async def stream_document_summary(
+    document_id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """
+    Generates the summary for a document and streams it as Server-Sent Events.
+
+    Events: `token` ({"text": ...}) for each piece of summary text as it arrives,
+    then `done` ({"document_id", "summary_id"}) once the summary is stored, or
+    `error` ({"detail": ...}) if generation fails. An existing summary is streamed
+    as a single token.
+    """
+    logger.info(f"Streamed summary requested for document_id: {document_id}")
+
+    effective_user_id: Optional[UUID] = None
+    if current_user:
+        effective_user_id = UUID(current_user.id)
+
+    document = await session.get(Document, document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+
+    summary_results = await session.execute(select(Summary).where(Summary.document_id == document_id))
+    existing_summary = summary_results.scalar_one_or_none()
+
+    extracted_text = None
+    if not existing_summary:
+        extracted_text = await load_document_content(session, document_id)
+        if not extracted_text:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Document text has not been extracted yet. Please wait for processing to complete."
+            )
+        if document.status == "summarizing":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Summary generation is already in progress for this document."
+            )
+
+    async def events():
+        if existing_summary:
+            yield sse_event("token", {"text": existing_summary.summary_text})
+            yield sse_event("done", {"document_id": document_id, "summary_id": existing_summary.id})
+            return
+        try:
+            async for piece in stream_summary(document_id, effective_user_id, extracted_text, session):
+                yield sse_event("token", {"text": piece})
+        except Exception as e:
+            logger.error(f"Error streaming summary for document_id: {document_id}. Error: {e}", exc_info=True)
+            yield sse_event("error", {"detail": "An unexpected error occurred while generating summary."})
+            return
+        summary_id = (
+            await session.execute(select(Summary.id).where(Summary.document_id == document_id))
+        ).scalar_one_or_none()
+        yield sse_event("done", {"document_id": document_id, "summary_id": summary_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so tokens reach the client as they are generated
+        headers=SSE_HEADERS,
+    )
+
 @router.get("/documents/{document_id}/summary")
 async def get_document_summary(
     document_id: UUID,
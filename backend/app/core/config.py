@@ -1,6 +1,7 @@
 # backend/app/core/config.py
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 import os
 
 class Settings(BaseSettings):
@@ -10,16 +11,118 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: str  # Required for admin operations on storage
     SUPABASE_JWT_SECRET: str # Needed for validating JWTs from Supabase Auth
 
+    # Supabase HTTP connections, shared by all Supabase clients of a process
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 50
+    SUPABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    SUPABASE_HTTP_TIMEOUT_SECONDS: float = 30.0
+
+    # Storage of uploaded documents
+    STORAGE_BACKEND: str = "supabase"  # "supabase", or "local" for self-hosted and CI setups without network
+    STORAGE_LOCAL_ROOT: str = ".storage/user_documents"  # Root directory of the local backend
+    STORAGE_BUCKET: str = "user_documents"  # Supabase Storage bucket
+    STORAGE_MAX_CONNECTIONS: int = 20
+    STORAGE_TIMEOUT_SECONDS: float = 120.0  # Per network read/write, not per transfer
+    STORAGE_RETRY_ATTEMPTS: int = 3
+    STORAGE_RETRY_BASE_SECONDS: float = 0.5
+    STORAGE_RETRY_MAX_WAIT_SECONDS: float = 10.0
+
+    # Auth: access tokens are verified in-process (HS256 with SUPABASE_JWT_SECRET,
+    # asymmetric signing keys from the project's JWKS endpoint)
+    AUTH_LOCAL_JWT_VERIFICATION: bool = True  # False: ask Supabase Auth for every request
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    SUPABASE_JWKS_URL: Optional[str] = None  # Defaults to {SUPABASE_URL}/auth/v1/.well-known/jwks.json
+    AUTH_JWKS_CACHE_SECONDS: int = 600
+    AUTH_CLOCK_SKEW_SECONDS: int = 30
+    AUTH_TOKEN_CACHE_TTL_SECONDS: float = 60.0  # Never longer than the token's own expiry
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+
     # Gemini API Key
     GEMINI_API_KEY: str
 
     # Database URL
     DATABASE_URL: str
 
+    # Database engine and connection pool (per process; size against the pooler's client limit)
+    DB_ECHO: bool = False  # Log every SQL statement
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this
+    DB_POOL_PRE_PING: bool = True  # Detect connections dropped by the pooler before use
+    DB_SSL: str = "require"
+    # Supabase's pooler in transaction mode (port 6543) cannot keep prepared statements
+    # across transactions; disables asyncpg's statement caches. Set False for session mode
+    # or direct connections.
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = True
+
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
 
+    # Background job queue
+    WORKER_IN_PROCESS: bool = True  # Run a job worker inside the web process (set False when running app.worker)
+    WORKER_CONCURRENCY: int = 4
+    JOB_LEASE_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 30.0
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None  # Enables the on-disk tier, e.g. ".cache/llm_responses.sqlite3"
+    LLM_CACHE_DISK_MAX_ENTRIES: int = 10_000
+
+    # Gemini client
+    GEMINI_EXECUTOR_MAX_WORKERS: int = 16  # Threads for blocking Gemini SDK calls (per process)
+    # Client-side limits per process; divide the project quota by the number of processes
+    GEMINI_REQUESTS_PER_MINUTE: int = 60
+    GEMINI_TOKENS_PER_MINUTE: int = 1_000_000
+    GEMINI_MAX_IN_FLIGHT: int = 8
+    GEMINI_RETRY_ATTEMPTS: int = 5
+    GEMINI_RETRY_BASE_SECONDS: float = 2.0
+    GEMINI_RETRY_MAX_WAIT_SECONDS: float = 60.0
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive upstream failures before failing fast
+    GEMINI_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Serialized GET /quizzes/{id} responses (ready quizzes only)
+    QUIZ_CACHE_ENABLED: bool = True
+    QUIZ_CACHE_TTL_SECONDS: int = 24 * 3600
+    QUIZ_CACHE_MAX_ENTRIES: int = 2048
+    QUIZ_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    QUIZ_CACHE_SQLITE_PATH: Optional[str] = None  # Shared on-disk tier, e.g. ".cache/quizzes.sqlite3"
+
+    # Short-answer grading (scores range from 0.0 to 1.0)
+    SHORT_ANSWER_ACCEPT_THRESHOLD: float = 0.85
+    SHORT_ANSWER_REJECT_THRESHOLD: float = 0.5  # Scores in between are borderline
+    SHORT_ANSWER_LLM_ADJUDICATION: bool = False  # Let Gemini decide borderline answers
+
+    # Chunked (map-reduce) summarization
+    SUMMARY_CHUNK_TOKENS: int = 12_000  # Larger documents are split into chunks of this size
+    SUMMARY_MAX_CONCURRENCY: int = 4  # Chunk summaries in flight per document
+    SUMMARY_TOKEN_BUDGET: int = 400_000  # Input tokens summarized per document
+
+    # Status push (SSE) for documents and quizzes
+    STATUS_NOTIFY_ENABLED: bool = False  # Fan status events out across processes with Postgres LISTEN/NOTIFY
+    STATUS_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    STATUS_STREAM_TIMEOUT_SECONDS: float = 600.0  # Clients reconnect after this
+    # LISTEN needs a connection of its own for the life of the process, which the
+    # transaction-mode pooler cannot give: point this at the direct database host or
+    # the session-mode pooler (port 5432). Defaults to DATABASE_URL only when
+    # DB_PGBOUNCER_TRANSACTION_MODE is off.
+    STATUS_LISTEN_DATABASE_URL: Optional[str] = None
+    STATUS_LISTEN_RECONNECT_MAX_SECONDS: float = 30.0  # Backoff cap between reconnect attempts
+    STATUS_LISTEN_HEALTHCHECK_SECONDS: float = 30.0  # Ping the LISTEN connection this often
+
+    # Text extraction process pool
+    EXTRACTION_MAX_WORKERS: Optional[int] = None  # Defaults to the number of CPUs
+    EXTRACTION_TIMEOUT_SECONDS: float = 120.0
+    EXTRACTION_MEMORY_LIMIT_MB: int = 1024  # Per worker process; 0 disables the cap
+    EXTRACTION_PAGES_PER_TASK: int = 25  # PDFs with more pages are split across workers
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
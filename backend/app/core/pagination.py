@@ -0,0 +1,33 @@
+# backend/app/core/pagination.py
+"""
+Opaque cursors for keyset pagination of feeds ordered by (timestamp DESC, id DESC).
+
+A cursor encodes the sort key of the last item on a page; the next page is the
+rows strictly after it, which an index on (owner, timestamp DESC, id DESC)
+serves at the same cost at any depth.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    payload = json.dumps({"t": created_at.isoformat(), "id": str(item_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), UUID(payload["id"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
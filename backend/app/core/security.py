@@ -0,0 +1,167 @@
+# backend/app/core/security.py
+"""
+In-process verification of Supabase access tokens.
+
+Tokens are checked locally for signature, expiry and audience instead of asking
+Supabase Auth on every request:
+
+- HS256 tokens (legacy projects) are verified with SUPABASE_JWT_SECRET.
+- RS256/ES256 tokens are verified with the project's public keys, fetched from
+  its JWKS endpoint and cached.
+
+Verified tokens are cached briefly (never past their expiry), so repeated
+requests with the same token skip the signature check as well.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import jwt
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HMAC_ALGORITHMS = frozenset({"HS256"})
+ASYMMETRIC_ALGORITHMS = frozenset({"RS256", "ES256"})
+
+# Unknown key ids trigger a JWKS refetch at most this often (key rotation without refetch storms)
+JWKS_MIN_REFETCH_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """The caller identified by a verified access token; `id` is the Supabase user id."""
+    id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
+    claims: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "AuthenticatedUser":
+        return cls(id=claims["sub"], email=claims.get("email"), role=claims.get("role"), claims=claims)
+
+
+class TokenVerifier:
+    """
+    Verifies access tokens and caches the results.
+
+    Raises jwt.InvalidTokenError (or a subclass) for any token that does not verify.
+    """
+
+    def __init__(
+        self,
+        secret: Optional[str],
+        audience: Optional[str],
+        jwks_url: Optional[str],
+        jwks_cache_seconds: float,
+        leeway_seconds: float,
+        cache: LRUCache,
+        cache_ttl_seconds: float,
+    ):
+        self.secret = secret
+        self.audience = audience
+        self.jwks_url = jwks_url
+        self.jwks_cache_seconds = jwks_cache_seconds
+        self.leeway_seconds = leeway_seconds
+        self.cache = cache
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._public_keys: Dict[str, Any] = {}
+        self._keys_fetched_at: Optional[float] = None
+
+    async def verify(self, token: str) -> AuthenticatedUser:
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        user = self.cache.get(cache_key)
+        if user is not None:
+            return user
+
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm in HMAC_ALGORITHMS:
+            if not self.secret:
+                raise jwt.InvalidKeyError("No JWT secret configured for HS256 tokens")
+            key = self.secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            key = await self._public_key(header.get("kid"))
+        else:
+            raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {algorithm}")
+
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            leeway=self.leeway_seconds,
+            options={"require": ["exp", "sub"], "verify_aud": self.audience is not None},
+        )
+        user = AuthenticatedUser.from_claims(claims)
+
+        ttl = min(self.cache_ttl_seconds, claims["exp"] - time.time())
+        if ttl > 0:
+            self.cache.set(cache_key, user, ttl_seconds=ttl)
+        return user
+
+    async def _public_key(self, key_id: Optional[str]):
+        if not self.jwks_url:
+            raise jwt.InvalidKeyError("No JWKS URL configured for asymmetric tokens")
+        if self._needs_fetch(key_id):
+            await self._fetch_public_keys()
+        key = self._public_keys.get(key_id)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown signing key: {key_id}")
+        return key
+
+    def _keys_expired(self) -> bool:
+        return self._keys_fetched_at is None or time.monotonic() - self._keys_fetched_at > self.jwks_cache_seconds
+
+    def _needs_fetch(self, key_id: Optional[str]) -> bool:
+        if self._keys_expired():
+            return True
+        return key_id not in self._public_keys and time.monotonic() - self._keys_fetched_at > JWKS_MIN_REFETCH_SECONDS
+
+    async def _fetch_public_keys(self) -> None:
+        client = jwt.PyJWKClient(self.jwks_url, cache_jwk_set=False)
+        try:
+            jwk_set = await asyncio.to_thread(client.get_jwk_set)
+        except jwt.PyJWKClientError as e:
+            # Keep serving the keys we have; an outage of the JWKS endpoint must not log everyone out
+            logger.warning(f"Failed to fetch JWKS from {self.jwks_url}: {e}")
+            if self._keys_fetched_at is None:
+                raise
+            return
+        self._public_keys = {jwk.key_id: jwk.key for jwk in jwk_set.keys}
+        self._keys_fetched_at = time.monotonic()
+        logger.info(f"Loaded {len(self._public_keys)} signing keys from {self.jwks_url}")
+
+
+def build_token_verifier() -> TokenVerifier:
+    return TokenVerifier(
+        secret=settings.SUPABASE_JWT_SECRET,
+        audience=settings.SUPABASE_JWT_AUDIENCE or None,
+        jwks_url=settings.SUPABASE_JWKS_URL or f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+        jwks_cache_seconds=settings.AUTH_JWKS_CACHE_SECONDS,
+        leeway_seconds=settings.AUTH_CLOCK_SKEW_SECONDS,
+        cache=LRUCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES),
+        cache_ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+    )
+
+
+_token_verifier: Optional[TokenVerifier] = None
+
+
+def get_token_verifier() -> TokenVerifier:
+    global _token_verifier
+    if _token_verifier is None:
+        _token_verifier = build_token_verifier()
+    return _token_verifier
+
+
+def set_token_verifier(verifier: Optional[TokenVerifier]) -> None:
+    global _token_verifier
+    _token_verifier = verifier
@@ -1,10 +1,18 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import Column, Text
+from sqlalchemy import JSON, Column, Index, LargeBinary, Text, column, desc
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
 
+# JSONB on Postgres (decoded by the driver), plain JSON elsewhere (e.g. SQLite in tests)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+# Characters kept in Summary.summary_preview: the 200 shown in history, plus one so
+# readers can tell whether the text was cut
+SUMMARY_PREVIEW_CHARS = 201
+
 
 class Profile(SQLModel, table=True):
     __tablename__ = "profiles"  # Match existing database table name
@@ -25,27 +33,53 @@ class Document(SQLModel, table=True):
     filename: str = Field(sa_column=Column(Text, nullable=False))
     file_type: str = Field(sa_column=Column(Text, nullable=False))
     storage_path: str = Field(sa_column=Column(Text, nullable=False))
-    raw_content: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # SHA-256 of the uploaded bytes; identical uploads share one stored blob
+    content_hash: Optional[str] = Field(default=None, sa_column=Column(Text, index=True))
     # Status can be: uploaded, processing, processed, failed, summarizing, summarized, summary-failed
     status: str = Field(default="uploaded", sa_column=Column(Text, nullable=False))
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class DocumentContent(SQLModel, table=True):
+    """Compressed extracted text of a document (see app/services/storage/content.py)."""
+    __tablename__ = "document_contents"
+
+    document_id: UUID = Field(foreign_key="documents.id", primary_key=True)
+    # Compression codec of data: "zstd" or "zlib"
+    codec: str = Field(sa_column=Column(Text, nullable=False))
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    # Length of the uncompressed text in characters
+    text_length: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Summary(SQLModel, table=True):
     __tablename__ = "summaries"
+    __table_args__ = (
+        # Keyset pagination of a user's summary history
+        Index("idx_summaries_user_history", "user_id", desc(column("generated_at")), desc(column("id"))),
+    )
 
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
     document_id: UUID = Field(foreign_key="documents.id")
     user_id: Optional[UUID] = Field(default=None)  # Optional for guest users, no foreign key
     summary_text: str = Field(sa_column=Column(Text, nullable=False))
+    # Start of summary_text, stored at write time so history lists never read the full text
+    summary_preview: Optional[str] = Field(default=None, sa_column=Column(Text))
     generated_at: datetime = Field(default_factory=datetime.utcnow)
     ai_model: str = Field(default="gemini-1.5-flash", sa_column=Column(Text, nullable=False))
+    # Version of the summary prompt; summaries are only reused across identical uploads with the same version
+    prompt_version: Optional[str] = Field(default=None, sa_column=Column(Text))
     feedback: Optional[str] = Field(default=None, sa_column=Column(Text))
 
 
 class Quiz(SQLModel, table=True):
     __tablename__ = "quizzes"
+    __table_args__ = (
+        # Keyset pagination of a user's quiz history
+        Index("idx_quizzes_user_history", "user_id", desc(column("created_at")), desc(column("id"))),
+    )
 
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
     document_id: UUID = Field(foreign_key="documents.id")
@@ -67,10 +101,12 @@ class Question(SQLModel, table=True):
     # Question type: multiple_choice, true_false, short_answer
     question_type: str = Field(sa_column=Column(Text, nullable=False))
     question_text: str = Field(sa_column=Column(Text, nullable=False))
-    # JSON string for options (for multiple choice: ["A", "B", "C", "D"])
-    options: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # Answer options (for multiple choice: ["A. ...", "B. ...", "C. ...", "D. ..."])
+    options: Optional[List[str]] = Field(default=None, sa_column=Column(JSONType))
     correct_answer: str = Field(sa_column=Column(Text, nullable=False))
     explanation: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # Precomputed short-answer key (see app/services/grading/matchers.py)
+    answer_key: Optional[dict] = Field(default=None, sa_column=Column(JSONType))
     order_index: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -98,3 +134,24 @@ class Feedback(SQLModel, table=True):
     rating: int = Field(ge=1, le=5)  # 1-5 star rating
     comment: Optional[str] = Field(default=None, sa_column=Column(Text))
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class Job(SQLModel, table=True):
+    """Durable background job processed by app.worker."""
+    __tablename__ = "jobs"
+
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    # Job type: extract_text, generate_summary, generate_quiz
+    job_type: str = Field(sa_column=Column(Text, nullable=False))
+    # JSON string with the handler arguments
+    payload: str = Field(sa_column=Column(Text, nullable=False))
+    # Status can be: queued, running, succeeded, dead
+    status: str = Field(default="queued", sa_column=Column(Text, nullable=False, index=True))
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    run_after: datetime = Field(default_factory=datetime.utcnow, index=True)
+    locked_by: Optional[str] = Field(default=None, sa_column=Column(Text))
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    last_error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,14 +1,21 @@
 # backend/app/db/session.py
 
 import os
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Callable, Optional
+from uuid import uuid4
 from dotenv import load_dotenv
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import urlparse, unquote
 
 load_dotenv()
 
-from sqlmodel import SQLModel, create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.core.metrics import metrics
 
 # Database URL from environment variables
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -16,38 +23,148 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set.")
 
-# Parse the DATABASE_URL to extract credentials for Supabase pooler
-parsed = urlparse(DATABASE_URL)
-username = unquote(parsed.username) if parsed.username else "postgres"
-password = unquote(parsed.password) if parsed.password else ""
-hostname = parsed.hostname
-port = parsed.port or 5432
-database = parsed.path.lstrip('/') if parsed.path else "postgres"
-
-# Build connection URL without credentials for asyncpg
-# Format: postgresql+asyncpg://host:port/database
-DATABASE_URL_NO_CREDS = f"postgresql+asyncpg://{hostname}:{port}/{database}"
-
-# Create an async engine for SQLModel with connection arguments
-# Pass credentials separately to handle special characters in username
-connect_args = {
-    "user": username,
-    "password": password,
-    "ssl": "require",
-    "server_settings": {"jit": "off"}
-}
-
-engine = AsyncEngine(create_engine(
-    DATABASE_URL_NO_CREDS, 
-    echo=True, 
-    future=True,
-    connect_args=connect_args
-))
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool that records how long checkouts wait (db.pool_checkout_wait_seconds,
+    including opening new connections) and how often they time out.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            metrics.increment("db.pool_checkout_errors")
+            raise
+        finally:
+            metrics.observe("db.pool_checkout_wait_seconds", time.perf_counter() - start)
+
+
+def _track_checkouts(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.add_gauge("db.pool_checked_out", 1)
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.add_gauge("db.pool_checked_out", -1)
+
+
+def _postgres_url_and_args(database_url: str, transaction_mode: Optional[bool] = None):
+    """
+    Splits the credentials out of a Postgres URL and builds the asyncpg connect args.
+
+    Credentials are passed separately to handle special characters in the
+    Supabase pooler username. transaction_mode (default
+    DB_PGBOUNCER_TRANSACTION_MODE) adds the options the transaction-mode pooler needs.
+    """
+    if transaction_mode is None:
+        transaction_mode = settings.DB_PGBOUNCER_TRANSACTION_MODE
+    parsed = urlparse(database_url)
+    username = unquote(parsed.username) if parsed.username else "postgres"
+    password = unquote(parsed.password) if parsed.password else ""
+    database = parsed.path.lstrip('/') if parsed.path else "postgres"
+    url = f"postgresql+asyncpg://{parsed.hostname}:{parsed.port or 5432}/{database}"
+
+    connect_args = {
+        "user": username,
+        "password": password,
+        "ssl": settings.DB_SSL,
+        "server_settings": {"jit": "off"},
+    }
+    if transaction_mode:
+        # Transactions may land on different server connections: no named
+        # statements that outlive a transaction, and unique names for the rest
+        url += "?prepared_statement_cache_size=0"
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return url, connect_args
+
+
+def build_engine(database_url: str) -> AsyncEngine:
+    """
+    Creates the async engine with the pool settings from Settings.
+
+    Postgres URLs get the asyncpg options for the Supabase pooler; other URLs
+    (e.g. SQLite for local tools) are used as given.
+    """
+    if database_url.startswith(("postgres://", "postgresql")):
+        url, connect_args = _postgres_url_and_args(database_url)
+    else:
+        url, connect_args = database_url, {}
+
+    engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    _track_checkouts(engine)
+    return engine
+
+
+def status_listen_url() -> Optional[str]:
+    """
+    URL for the status LISTEN connection, or None if there is no usable one.
+
+    LISTEN registrations belong to a server connection, which the transaction-mode
+    pooler hands to other clients after every transaction.
+    """
+    if settings.STATUS_LISTEN_DATABASE_URL:
+        return settings.STATUS_LISTEN_DATABASE_URL
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        return None
+    return DATABASE_URL
+
+
+def build_listen_engine(database_url: str) -> AsyncEngine:
+    """
+    Creates an engine for the long-lived LISTEN connection of StatusListener.
+
+    The URL must reach Postgres directly or through a session-mode pooler. Without a
+    pool, a connection lost by the listener is closed rather than handed out again.
+    """
+    if database_url.startswith(("postgres://", "postgresql")):
+        url, connect_args = _postgres_url_and_args(database_url, transaction_mode=False)
+    else:
+        url, connect_args = database_url, {}
+    return create_async_engine(url, echo=settings.DB_ECHO, poolclass=NullPool, connect_args=connect_args)
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    """Current occupancy of the engine's connection pool."""
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+    }
+
+
+engine = build_engine(DATABASE_URL)
 
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
 
+def new_session() -> AsyncSession:
+    """Create a session outside of a request (e.g. for background job workers)."""
+    return AsyncSession(engine)
+
+def get_session_factory() -> Callable[[], AsyncSession]:
+    """
+    Dependency for long-lived responses (event streams): they open a short-lived
+    session per query instead of holding a pooled connection until the stream ends.
+    """
+    return new_session
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSession(engine) as session:
         yield session
@@ -1,12 +1,21 @@
-from fastapi import Depends, HTTPException, status, Header
-from supabase import Client
-from app.supabase_client import get_supabase_client
+import asyncio
+
+import jwt
+from fastapi import Header
+from app.core.config import settings
+from app.core.security import get_token_verifier
+from app.supabase_client import get_supabase_anon_client
 from typing import Optional
 
 async def get_current_user(
-    supabase: Client = Depends(get_supabase_client),
     authorization: Optional[str] = Header(None)
 ):
+    """
+    Returns the authenticated user (with `.id`), or None for guests.
+
+    Tokens are verified in-process (see app/core/security.py); with
+    AUTH_LOCAL_JWT_VERIFICATION disabled, Supabase Auth is asked instead.
+    """
     if not authorization:
         # Allow unauthenticated (guest) users
         return None
@@ -15,9 +24,16 @@ async def get_current_user(
         scheme, token = authorization.split()
         if scheme.lower() != "bearer":
             return None  # Invalid scheme, treat as guest
-        
-        # Verify the JWT token with Supabase
-        user_response = supabase.auth.get_user(token)
+
+        if settings.AUTH_LOCAL_JWT_VERIFICATION:
+            try:
+                return await get_token_verifier().verify(token)
+            except jwt.InvalidTokenError:
+                # Invalid or expired token, treat as guest
+                return None
+
+        # Verify the JWT token with Supabase (blocking SDK call, kept off the event loop)
+        user_response = await asyncio.to_thread(get_supabase_anon_client().auth.get_user, token)
         if user_response.user:
             return user_response.user
         else:
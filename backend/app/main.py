@@ -4,7 +4,7 @@ load_dotenv()
 from fastapi import FastAPI, HTTPException, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
-from .supabase_client import check_supabase_connection
+from .supabase_client import check_supabase_connection, close_supabase_clients, init_supabase_clients
 from .api.auth import register as auth_register_router
 from .api.auth import login as auth_login_router
 from .api.auth import forgot_password as auth_forgot_password_router
@@ -13,16 +13,70 @@ from .api.summaries.main import router as summaries_router
 from .api.quizzes.main import router as quizzes_router
 from .api.feedback.main import router as feedback_router
 from .api.history import router as history_router
-from .db.session import get_session, create_db_and_tables
+from .db.session import (
+    build_listen_engine,
+    create_db_and_tables,
+    engine,
+    get_session,
+    new_session,
+    pool_status,
+    status_listen_url,
+)
 from .core.config import settings
+from .services.events.status_bus import StatusListener
+from .services.jobs.handlers import JOB_HANDLERS
+from .services.jobs.worker import JobWorker
+from .services.storage.backends import close_document_storage
+from .services.ai_generation.extraction_pool import shutdown_extraction_pool
+from .services.ai_generation.gemini_client import get_response_cache, shutdown_gemini_executor
+from .core.metrics import metrics
+import asyncio
+import logging
 import os
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database tables on startup."""
     await create_db_and_tables()
+    init_supabase_clients()
+    if settings.WORKER_IN_PROCESS:
+        # Single-process deployments run the job worker alongside the API
+        worker = JobWorker(session_factory=new_session, handlers=JOB_HANDLERS)
+        app.state.job_worker = worker
+        app.state.job_worker_task = asyncio.create_task(worker.run())
+    if settings.STATUS_NOTIFY_ENABLED:
+        # Receive status events published by job workers in other processes
+        listen_url = status_listen_url()
+        if listen_url is None:
+            logger.error(
+                "STATUS_NOTIFY_ENABLED needs STATUS_LISTEN_DATABASE_URL (a direct or session-mode "
+                "connection) behind the transaction-mode pooler; not listening for status events"
+            )
+        else:
+            listener = StatusListener(build_listen_engine(listen_url))
+            await listener.start()
+            app.state.status_listener = listener
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let the in-process job worker finish its running jobs."""
+    worker = getattr(app.state, "job_worker", None)
+    if worker:
+        worker.stop()
+        await app.state.job_worker_task
+    listener = getattr(app.state, "status_listener", None)
+    if listener:
+        await listener.stop()
+        await listener.engine.dispose()
+    shutdown_extraction_pool()
+    shutdown_gemini_executor()
+    close_supabase_clients()
+    await close_document_storage()
 
 app.add_middleware(
     CORSMiddleware,
@@ -52,6 +106,16 @@ def health_check():
             detail={"status": "error", "database_connection": message},
         )
 
+@app.get("/api/v1/metrics")
+def get_metrics():
+    """In-process counters, gauges and timings (per worker process)."""
+    snapshot = metrics.snapshot()
+    snapshot["db_pool"] = pool_status(engine)
+    cache = get_response_cache()
+    if cache:
+        snapshot["llm_cache"] = cache.stats()
+    return snapshot
+
 @app.get("/api/v1/db-test")
 async def test_database_connection(session: AsyncSession = Depends(get_session)):
     """Test database connectivity and configuration."""
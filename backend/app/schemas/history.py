@@ -51,6 +51,7 @@ class SummaryHistoryResponse(BaseModel):
     message: str = "Summaries retrieved successfully"
     status: str = "success"
     total: int = Field(..., description="Total number of summaries")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null on the last page")
 
 
 class QuizHistoryResponse(BaseModel):
@@ -59,6 +60,7 @@ class QuizHistoryResponse(BaseModel):
     message: str = "Quizzes retrieved successfully"
     status: str = "success"
     total: int = Field(..., description="Total number of quizzes")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null on the last page")
 
 
 class CombinedHistoryItem(BaseModel):
@@ -83,6 +85,7 @@ class CombinedHistoryResponse(BaseModel):
     message: str = "History retrieved successfully"
     status: str = "success"
     total: int = Field(..., description="Total number of history items")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null on the last page")
 
 
 # ============================================================================
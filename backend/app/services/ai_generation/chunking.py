@@ -0,0 +1,69 @@
+# backend/app/services/ai_generation/chunking.py
+"""
+Token-aware splitting of long documents for chunked (map-reduce) summarization.
+"""
+
+import re
+from typing import List
+
+# Rough average for English text with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for chunk sizing (no tokenizer round-trip)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_oversized(block: str, max_chars: int) -> List[str]:
+    """Split a block that does not fit in one chunk on line, then word, boundaries."""
+    pieces: List[str] = []
+    for line in block.split("\n"):
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip()
+        if line.strip():
+            pieces.append(line)
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens (estimated), keeping paragraphs
+    together where possible.
+
+    Page breaks (form feeds) and blank lines are preferred split points; lines and
+    then words are only split when a single paragraph is larger than a chunk.
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    blocks: List[str] = []
+    for page in text.split("\f"):
+        for paragraph in _PARAGRAPH_BREAK.split(page):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if len(paragraph) > max_chars:
+                blocks.extend(_split_oversized(paragraph, max_chars))
+            else:
+                blocks.append(paragraph)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    for block in blocks:
+        # +2 for the paragraph separator
+        added = len(block) + (2 if current else 0)
+        if current and current_len + added > max_chars:
+            chunks.append("\n\n".join(current))
+            current, current_len = [], 0
+            added = len(block)
+        current.append(block)
+        current_len += added
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
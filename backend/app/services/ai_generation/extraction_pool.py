@@ -0,0 +1,353 @@
+# backend/app/services/ai_generation/extraction_pool.py
+"""
+Runs CPU-bound text extraction in a bounded process pool so parsing large PDFs
+and DOCX files never blocks the event loop.
+
+Large PDFs are split into page ranges that are extracted in parallel and
+reassembled in page order. Each extraction has a timeout. Every job runs on a
+worker process of its own, so a job that times out or crashes its worker only
+costs that one process: it is killed and replaced on next use while the other
+workers keep running their jobs.
+"""
+
+import asyncio
+import logging
+import mimetypes
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.ai_generation.text_extractor import (
+    FILE_EXTRACTORS,
+    FileSource,
+    count_pdf_pages,
+    extract_text_from_file,
+    extract_text_from_pdf_pages,
+    limit_worker_memory,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORKER_STOP_TIMEOUT_SECONDS = 5.0
+
+
+class ExtractionTimeoutError(TimeoutError):
+    """Raised when text extraction exceeds EXTRACTION_TIMEOUT_SECONDS."""
+
+
+def _worker_main(conn, memory_limit: Optional[int]) -> None:
+    """Worker process loop: runs (fn, args) jobs received on conn until told to stop."""
+    limit_worker_memory(memory_limit)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        fn, args = job
+        try:
+            result = (True, fn(*args))
+        except Exception as e:
+            result = (False, e)
+        try:
+            conn.send(result)
+        except Exception as e:
+            # The result or exception could not be pickled
+            conn.send((False, RuntimeError(f"{fn.__name__} failed: {e!r}")))
+
+
+class _Worker:
+    """One extraction process, reused for job after job until it is killed."""
+
+    def __init__(self, context, memory_limit: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit),
+            name="extraction-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def call(self, fn: Callable, args: Tuple) -> Tuple[bool, Any]:
+        """
+        Runs fn(*args) in the process, blocking until it answers.
+
+        Raises:
+            EOFError: If the process died (or was killed) before answering.
+        """
+        self.conn.send((fn, args))
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        self.process.kill()
+
+    def close(self) -> None:
+        """Stops the process, asking it to exit before killing it, and releases its pipe."""
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(WORKER_STOP_TIMEOUT_SECONDS)
+            if self.process.is_alive():
+                self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class _Job:
+    def __init__(self, fn: Callable, args: Tuple):
+        self.fn = fn
+        self.args = args
+        self.worker: Optional[_Worker] = None  # Set while the job runs
+        self.cancelled = False
+
+
+class ExtractionPool:
+    """
+    Up to max_workers extraction processes, each running one job at a time.
+
+    ProcessPoolExecutor cannot stop a single running task; the only way to
+    abort one is to terminate the whole pool, failing every other extraction
+    with it. Here each job is dispatched from a thread to a worker it has to
+    itself, so cancelling a job (e.g. on timeout) kills exactly that worker.
+    Workers are started lazily and replaced the same way.
+    """
+
+    def __init__(self, max_workers: int, memory_limit: Optional[int] = None):
+        self.max_workers = max_workers
+        self._memory_limit = memory_limit
+        # spawn avoids forking a process that already runs threads (event loop executors, gRPC)
+        self._context = multiprocessing.get_context("spawn")
+        # One dispatch thread per worker; jobs beyond max_workers wait here in FIFO order
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extraction")
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._workers: Set[_Worker] = set()
+        self._closed = False
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Extraction pool is shut down")
+            if self._idle:
+                return self._idle.pop()
+        # At most max_workers dispatch threads run, so there is always room for a new worker
+        worker = _Worker(self._context, self._memory_limit)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _checkin(self, worker: _Worker) -> None:
+        with self._lock:
+            if not self._closed and worker in self._workers:
+                self._idle.append(worker)
+                return
+        self._discard(worker)
+
+    def _discard(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        worker.close()
+
+    def _dispatch(self, job: _Job) -> Any:
+        """Runs a job on a worker of its own (in a dispatch thread)."""
+        worker = self._checkout()
+        with self._lock:
+            cancelled = job.cancelled
+            if not cancelled:
+                job.worker = worker
+        if cancelled:
+            self._checkin(worker)
+            raise CancelledError()
+
+        try:
+            ok, value = worker.call(job.fn, job.args)
+        except (EOFError, OSError):
+            with self._lock:
+                job.worker = None
+            self._discard(worker)
+            if job.cancelled:
+                raise CancelledError()
+            # Killed from outside, e.g. by the kernel for exceeding its memory cap
+            raise BrokenProcessPool(
+                f"Extraction worker {worker.process.pid} died while running {job.fn.__name__}"
+            )
+
+        with self._lock:
+            job.worker = None
+            # A cancellation that raced with the answer has already killed the worker
+            killed = job.cancelled
+        if killed:
+            self._discard(worker)
+        else:
+            self._checkin(worker)
+        if not ok:
+            raise value
+        return value
+
+    def _cancel(self, job: _Job) -> None:
+        with self._lock:
+            job.cancelled = True
+            worker = job.worker
+            if worker is not None:
+                self._workers.discard(worker)
+                worker.kill()
+        if worker is not None:
+            logger.warning(f"Killed extraction worker {worker.process.pid} running {job.fn.__name__}")
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Runs fn(*args) in a worker process.
+
+        Cancelling the returned coroutine (e.g. through asyncio.wait_for) kills
+        the worker running it; jobs on other workers are not affected.
+
+        Raises:
+            BrokenProcessPool: If the worker died while running the job.
+        """
+        job = _Job(fn, args)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._threads, self._dispatch, job)
+        except asyncio.CancelledError:
+            self._cancel(job)
+            raise
+
+    def shutdown(self) -> None:
+        """Waits for running jobs, drops queued ones and stops the workers."""
+        with self._lock:
+            self._closed = True
+        self._threads.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        for worker in workers:
+            worker.close()
+
+
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Returns the shared extraction pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            max_workers = settings.EXTRACTION_MAX_WORKERS or os.cpu_count() or 1
+            memory_limit = settings.EXTRACTION_MEMORY_LIMIT_MB * 1024 * 1024
+            _pool = ExtractionPool(max_workers=max_workers, memory_limit=memory_limit)
+            logger.info(f"Started text extraction pool with up to {max_workers} workers")
+        return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Shuts down the shared pool after its running jobs finish."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+async def _extract_pdf_in_parallel(
+    pool: ExtractionPool,
+    file_content: FileSource,
+    on_part: Optional[Callable[[str], None]],
+) -> str:
+    page_count = await pool.run(count_pdf_pages, file_content)
+    pages_per_task = max(1, settings.EXTRACTION_PAGES_PER_TASK)
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+    if len(ranges) > 1:
+        logger.info(f"Extracting {page_count} PDF pages in {len(ranges)} parallel tasks")
+    tasks = [
+        asyncio.ensure_future(pool.run(extract_text_from_pdf_pages, file_content, start, end))
+        for start, end in ranges
+    ]
+    parts: List[str] = []
+    try:
+        # Ranges are collected in page order, so each one can be consumed while
+        # the later ones are still being extracted
+        for task in tasks:
+            part = await task
+            parts.append(part)
+            if on_part:
+                on_part(part)
+    finally:
+        # Cancelling a range still running kills its worker
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return "".join(parts)
+
+
+async def _extract_file(
+    pool: ExtractionPool,
+    file_content: FileSource,
+    filename: str,
+    on_part: Optional[Callable[[str], None]],
+) -> Optional[str]:
+    text = await pool.run(extract_text_from_file, file_content, filename)
+    if text and on_part:
+        on_part(text)
+    return text
+
+
+async def extract_text_in_pool(
+    file_content: FileSource,
+    filename: str,
+    timeout: Optional[float] = None,
+    on_part: Optional[Callable[[str], None]] = None,
+) -> Optional[str]:
+    """
+    Async counterpart of extract_text_from_file that runs in the extraction pool.
+
+    Args:
+        file_content: The content of the file in bytes, or the path of a local file.
+            Workers memory-map a path themselves, so the file is never copied
+            between processes.
+        filename: The name of the file, used to pick the extractor.
+        timeout: Seconds before extraction is aborted (defaults to EXTRACTION_TIMEOUT_SECONDS).
+        on_part: Called with each part of the text (a PDF page range, or the whole text of
+            other files) as soon as it and all parts before it are extracted; the parts
+            concatenate to the returned text.
+
+    Returns:
+        The extracted text, or None if the mime type is not supported.
+
+    Raises:
+        ExtractionTimeoutError: If extraction takes longer than the timeout.
+        BrokenProcessPool: If a worker died during extraction (e.g. killed for
+            exceeding its memory cap).
+    """
+    mime_type, _ = mimetypes.guess_type(filename)
+    if mime_type not in FILE_EXTRACTORS:
+        return None
+
+    pool = get_extraction_pool()
+    timeout = timeout if timeout is not None else settings.EXTRACTION_TIMEOUT_SECONDS
+
+    if mime_type == "application/pdf":
+        work = _extract_pdf_in_parallel(pool, file_content, on_part)
+    else:
+        work = _extract_file(pool, file_content, filename, on_part)
+
+    try:
+        return await asyncio.wait_for(work, timeout=timeout)
+    except asyncio.TimeoutError:
+        # wait_for cancelled the extraction, which killed the workers running it
+        logger.error(f"Text extraction for {filename} timed out after {timeout}s")
+        raise ExtractionTimeoutError(f"Text extraction timed out after {timeout} seconds")
+    except BrokenProcessPool:
+        logger.error(f"An extraction worker died while extracting {filename}")
+        raise
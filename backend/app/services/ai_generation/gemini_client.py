@@ -1,10 +1,20 @@
 # backend/app/services/ai_generation/gemini_client.py
 import google.generativeai as genai
 import asyncio
+import hashlib
+import json
 import logging
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Optional
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential, retry_if_exception_type
 
+from app.core.cache import LRUCache, SQLiteCache, TieredCache
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.ai_generation.chunking import estimate_tokens
+from app.services.ai_generation.rate_limiter import RETRYABLE_ERRORS, GeminiGovernor, build_governor
 
 # Configure the Gemini API client
 try:
@@ -20,50 +30,365 @@ except Exception as e:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Define specific exceptions to retry on, if the library provides them.
-# For this example, we'll use a generic Exception, but it's better to be specific.
-# from google.api_core import exceptions as google_exceptions
-# RetryableErrors = (
-#     google_exceptions.ResourceExhausted,  # Rate limits
-#     google_exceptions.ServiceUnavailable, # Temporary server issues
-# )
-
-@retry(
-    wait=wait_exponential(multiplier=1, min=4, max=60),
-    stop=stop_after_attempt(5),
-    # retry=retry_if_exception_type(RetryableErrors),
-    before_sleep=lambda retry_state: logger.info(f"Retrying Gemini API call: attempt {retry_state.attempt_number}...")
-)
-async def call_gemini_summarize(prompt: str, text: str) -> str:
+GEMINI_MODEL_NAME = 'models/gemini-2.5-flash'
+
+
+# --- Model registry and executor ---
+# Each model is built once per process; the SDK's client (and its gRPC channel) is created
+# on first use and shared by every call. Blocking SDK calls run on a dedicated, bounded
+# thread pool instead of the default executor, so a burst of requests queues for a slot
+# rather than spawning threads.
+
+_models: Dict[str, "genai.GenerativeModel"] = {}
+_models_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_model(model_name: str = GEMINI_MODEL_NAME) -> "genai.GenerativeModel":
+    """Returns the shared GenerativeModel for model_name, building it on first use."""
+    model = _models.get(model_name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                logger.info(f"Initializing Gemini model {model_name}...")
+                with metrics.timer("gemini.model_init_seconds"):
+                    model = genai.GenerativeModel(model_name)
+                _models[model_name] = model
+    return model
+
+
+def clear_model_registry() -> None:
+    """Drops the cached models (e.g. after reconfiguring the API key)."""
+    with _models_lock:
+        _models.clear()
+
+
+def get_gemini_executor() -> ThreadPoolExecutor:
+    """Returns the bounded executor for blocking Gemini SDK calls, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.GEMINI_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="gemini",
+                )
+    return _executor
+
+
+def shutdown_gemini_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_gemini_executor(func: Callable, *args, **kwargs):
+    """
+    Runs a blocking SDK call on the Gemini executor, recording how long it waited for
+    a thread (gemini.executor_wait_seconds) and how long it ran (gemini.call_seconds).
+    """
+    submitted = time.perf_counter()
+
+    def timed_call():
+        started = time.perf_counter()
+        metrics.observe("gemini.executor_wait_seconds", started - submitted)
+        metrics.add_gauge("gemini.executor_in_flight", 1)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.add_gauge("gemini.executor_in_flight", -1)
+            metrics.observe("gemini.call_seconds", time.perf_counter() - started)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_gemini_executor(), timed_call)
+
+
+# --- Response cache ---
+# Responses are keyed by a hash of (model, prompt template version, full prompt, generation
+# params), so byte-identical requests are served without calling the API.
+
+def _build_response_cache() -> Optional[TieredCache]:
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    memory = LRUCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        max_bytes=settings.LLM_CACHE_MAX_BYTES,
+    )
+    disk = None
+    if settings.LLM_CACHE_SQLITE_PATH:
+        disk = SQLiteCache(
+            settings.LLM_CACHE_SQLITE_PATH,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            max_entries=settings.LLM_CACHE_DISK_MAX_ENTRIES,
+        )
+    return TieredCache(memory, disk)
+
+
+_response_cache: Optional[TieredCache] = _build_response_cache()
+
+
+def get_response_cache() -> Optional[TieredCache]:
+    return _response_cache
+
+
+def set_response_cache(cache: Optional[TieredCache]) -> None:
+    """Replace the response cache (None disables caching)."""
+    global _response_cache
+    _response_cache = cache
+
+
+def build_cache_key(
+    model_name: str,
+    prompt_version: Optional[str],
+    full_prompt: str,
+    params: Optional[dict] = None,
+) -> str:
+    """Stable cache key for a generation request."""
+    material = json.dumps(
+        {
+            "model": model_name,
+            "prompt_version": prompt_version,
+            "prompt": full_prompt,
+            "params": params or {},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# --- Admission control ---
+# All Gemini calls in this process share one governor (rate budgets, in-flight cap,
+# circuit breaker). Retries are jittered and limited to RETRYABLE_ERRORS.
+
+_governor: GeminiGovernor = build_governor()
+
+
+def get_governor() -> GeminiGovernor:
+    return _governor
+
+
+def set_governor(governor: GeminiGovernor) -> None:
+    """Replace the shared governor (e.g. after changing the rate limits)."""
+    global _governor
+    _governor = governor
+
+
+def _log_retry(retry_state) -> None:
+    metrics.increment("gemini.retries")
+    logger.info(
+        f"Retrying Gemini API call after {retry_state.outcome.exception()!r}: "
+        f"attempt {retry_state.attempt_number}..."
+    )
+
+
+async def _call_gemini(func: Callable, full_prompt: str):
+    """
+    Runs a blocking SDK call for full_prompt through the governor, retrying retryable
+    upstream errors with jittered exponential backoff.
+    """
+    retrying = AsyncRetrying(
+        retry=retry_if_exception_type(RETRYABLE_ERRORS),
+        wait=wait_random_exponential(
+            multiplier=settings.GEMINI_RETRY_BASE_SECONDS,
+            max=settings.GEMINI_RETRY_MAX_WAIT_SECONDS,
+        ),
+        stop=stop_after_attempt(settings.GEMINI_RETRY_ATTEMPTS),
+        before_sleep=_log_retry,
+        reraise=True,
+    )
+    async for attempt in retrying:
+        with attempt:
+            async with _governor.slot(estimate_tokens(full_prompt)):
+                result = await run_in_gemini_executor(func, full_prompt)
+    return result
+
+
+async def _generate_content(
+    full_prompt: str,
+    prompt_version: Optional[str],
+    use_cache: bool,
+    purpose: str,
+) -> str:
+    """Generate content for a full prompt, going through the response cache when enabled."""
+    cache = _response_cache if use_cache else None
+    cache_key = build_cache_key(GEMINI_MODEL_NAME, prompt_version, full_prompt) if cache else None
+    if cache:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Serving {purpose} from the response cache.")
+            return cached.decode("utf-8")
+
+    model = get_model(GEMINI_MODEL_NAME)
+
+    logger.info(f"Generating {purpose} content from Gemini model...")
+    response = await _call_gemini(model.generate_content, full_prompt)
+
+    if response and response.text:
+        logger.info(f"Successfully received {purpose} from Gemini.")
+        if cache:
+            await cache.set(cache_key, response.text.encode("utf-8"))
+        return response.text
+
+    logger.warning(f"Gemini API returned an empty response for {purpose}.")
+    # Empty responses are not cached
+    return ""
+
+
+async def call_gemini_summarize(
+    prompt: str,
+    text: str,
+    prompt_version: Optional[str] = None,
+    use_cache: bool = True,
+) -> str:
     """
     Calls the Gemini API to generate a summary for the given text.
-    Includes retry logic for transient errors.
+    Rate limited, and retried on transient (RETRYABLE_ERRORS) failures.
+
+    Identical requests are served from the response cache unless use_cache is False.
     """
     if not genai:
         logger.error("Gemini API client is not configured.")
         raise ConnectionError("Gemini API client is not configured.")
 
     try:
-        logger.info("Initializing Gemini model...")
-        model = genai.GenerativeModel('models/gemini-2.5-flash')
-
-        logger.info("Generating content from Gemini model...")
         full_prompt = f"{prompt}\n\n{text}"
-        response = await asyncio.to_thread(model.generate_content, full_prompt)
-
-        if response and response.text:
-            logger.info("Successfully received summary from Gemini.")
-            return response.text
-        else:
-            logger.warning("Gemini API returned an empty response.")
-            # This might be a case to not retry, depending on the cause
-            return ""
+        return await _generate_content(full_prompt, prompt_version, use_cache, purpose="summary")
 
     except Exception as e:
         logger.error(f"An unexpected error occurred during Gemini API call: {e}")
-        # Re-raise the exception to trigger the retry mechanism
         raise
 
+
+async def call_gemini_quiz(
+    full_prompt: str,
+    prompt_version: Optional[str] = None,
+    use_cache: bool = True,
+) -> str:
+    """
+    Calls the Gemini API to generate quiz questions.
+    Expects a fully formatted prompt. Rate limited, and retried on transient failures.
+
+    Identical requests are served from the response cache unless use_cache is False.
+    """
+    if not genai:
+        logger.error("Gemini API client is not configured.")
+        raise ConnectionError("Gemini API client is not configured.")
+
+    try:
+        return await _generate_content(full_prompt, prompt_version, use_cache, purpose="quiz")
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during Gemini API call for quiz: {e}")
+        raise
+
+async def call_gemini_adjudicate(
+    full_prompt: str,
+    prompt_version: Optional[str] = None,
+    use_cache: bool = True,
+) -> str:
+    """
+    Calls the Gemini API to judge a borderline short answer.
+    Expects a fully formatted prompt. Rate limited, and retried on transient failures.
+    """
+    if not genai:
+        logger.error("Gemini API client is not configured.")
+        raise ConnectionError("Gemini API client is not configured.")
+
+    return await _generate_content(full_prompt, prompt_version, use_cache, purpose="grading")
+
+
+_STREAM_END = object()
+
+
+def _chunk_text(chunk) -> str:
+    try:
+        return chunk.text or ""
+    except ValueError:
+        # Chunks without text parts (e.g. a safety-blocked tail) have no .text
+        return ""
+
+
+async def stream_gemini_summarize(
+    prompt: str,
+    text: str,
+    prompt_version: Optional[str] = None,
+    use_cache: bool = True,
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of call_gemini_summarize: yields the summary text piece by
+    piece as Gemini generates it (generate_content(stream=True)).
+
+    A cached response is yielded as a single piece. The complete text is written to
+    the response cache once the stream finishes, so it is shared with call_gemini_summarize.
+    The stream holds one governor slot for its whole duration. There is no retry:
+    pieces already yielded cannot be taken back.
+    """
+    if not genai:
+        logger.error("Gemini API client is not configured.")
+        raise ConnectionError("Gemini API client is not configured.")
+
+    full_prompt = f"{prompt}\n\n{text}"
+    cache = _response_cache if use_cache else None
+    cache_key = build_cache_key(GEMINI_MODEL_NAME, prompt_version, full_prompt) if cache else None
+    if cache:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            logger.info("Serving streamed summary from the response cache.")
+            yield cached.decode("utf-8")
+            return
+
+    model = get_model(GEMINI_MODEL_NAME)
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def produce() -> None:
+        # The SDK's stream is a blocking iterator; drain it in a worker thread
+        try:
+            for chunk in model.generate_content(full_prompt, stream=True):
+                if stop.is_set():
+                    break
+                piece = _chunk_text(chunk)
+                if piece:
+                    loop.call_soon_threadsafe(queue.put_nowait, piece)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+
+    pieces = []
+    async with _governor.slot(estimate_tokens(full_prompt)):
+        producer = asyncio.ensure_future(run_in_gemini_executor(produce))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    logger.error(f"An unexpected error occurred during streamed Gemini API call: {item}")
+                    raise item
+                pieces.append(item)
+                yield item
+        finally:
+            # Stops the producer early if the consumer went away (e.g. client disconnected)
+            stop.set()
+            await asyncio.shield(producer)
+
+    full_text = "".join(pieces)
+    if full_text:
+        logger.info("Successfully streamed summary from Gemini.")
+        if cache:
+            await cache.set(cache_key, full_text.encode("utf-8"))
+    else:
+        logger.warning("Gemini API returned an empty response for streamed summary.")
+
+
 if __name__ == '__main__':
     # Example usage for direct testing
     async def main():
@@ -87,7 +412,5 @@ if __name__ == '__main__':
     # with a valid GEMINI_API_KEY.
     # You can run this file directly using `python -m app.services.ai_generation.gemini_client`
     # from the `backend` directory.
-    # Note: Tenacity is not in pyproject.toml yet.
-    #       `poetry add tenacity` would be needed.
     # For now, this `if __name__ == '__main__':` block is for documentation.
     pass
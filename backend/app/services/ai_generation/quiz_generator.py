@@ -2,22 +2,29 @@
 
 import json
 import logging
-import asyncio
 from typing import Optional, List
 from uuid import UUID
 
+from sqlalchemy import delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.db.models import Document, Quiz, Question
-from app.services.ai_generation.gemini_client import genai
+from app.services.ai_generation.gemini_client import call_gemini_quiz
+from app.services.events.status_bus import QUIZ, publish_status
+from app.services.grading.engine import grade_submission
+from app.services.grading.matchers import build_answer_key
+from app.services.read_models.quiz_cache import invalidate_quiz
+from app.services.storage.content import load_document_content
 from app.schemas.quiz import QuestionType
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Quiz generation prompt template
+# Quiz generation prompt template.
+# Bump QUIZ_PROMPT_VERSION whenever the template changes so cached responses are not reused.
+QUIZ_PROMPT_VERSION = "1"
 QUIZ_GENERATION_PROMPT = """You are an educational quiz generator. Based on the following lecture notes or document content, generate a quiz with {num_questions} questions.
 
 Include a mix of question types as specified: {question_types}
@@ -61,34 +68,6 @@ Document content:
 """
 
 
-async def call_gemini_quiz(full_prompt: str) -> str:
-    """
-    Calls the Gemini API to generate quiz questions.
-    Expects a fully formatted prompt.
-    """
-    if not genai:
-        logger.error("Gemini API client is not configured.")
-        raise ConnectionError("Gemini API client is not configured.")
-
-    try:
-        logger.info("Initializing Gemini model for quiz generation...")
-        model = genai.GenerativeModel('models/gemini-2.5-flash')
-
-        logger.info("Generating quiz content from Gemini model...")
-        response = await asyncio.to_thread(model.generate_content, full_prompt)
-
-        if response and response.text:
-            logger.info("Successfully received quiz data from Gemini.")
-            return response.text
-        else:
-            logger.warning("Gemini API returned an empty response for quiz generation.")
-            return ""
-
-    except Exception as e:
-        logger.error(f"An unexpected error occurred during Gemini API call for quiz: {e}")
-        raise
-
-
 def parse_quiz_response(response_text: str) -> List[dict]:
     """
     Parse the JSON response from Gemini into a list of question dictionaries.
@@ -123,7 +102,8 @@ async def generate_quiz(
     user_id: Optional[UUID],
     num_questions: int,
     question_types: Optional[List[QuestionType]],
-    session: AsyncSession
+    session: AsyncSession,
+    quiz_id: Optional[UUID] = None
 ) -> Quiz:
     """
     Generate a quiz for a document using Gemini AI.
@@ -134,6 +114,8 @@ async def generate_quiz(
         num_questions: Number of questions to generate
         question_types: Types of questions to include
         session: Database session
+        quiz_id: ID of an existing quiz record to fill in (e.g. created by the quiz endpoint).
+            If omitted, a new quiz record is created.
     
     Returns:
         The created Quiz object
@@ -143,11 +125,11 @@ async def generate_quiz(
     if not document:
         raise ValueError(f"Document with id {document_id} not found")
     
-    if not document.raw_content:
+    document_raw_content = await load_document_content(session, document_id)
+    if not document_raw_content:
         raise ValueError(f"Document {document_id} has no extracted text content")
     
     # Capture document attributes before any commits (to avoid lazy loading issues)
-    document_raw_content = document.raw_content
     document_filename = document.filename
     
     # Determine question types string for prompt
@@ -156,18 +138,32 @@ async def generate_quiz(
     else:
         types_str = "multiple_choice, true_false, short_answer"
     
-    # Create quiz record with "generating" status
-    quiz = Quiz(
-        document_id=document_id,
-        user_id=user_id,
-        title=f"Quiz for {document_filename}",
-        status="generating",
-        total_questions=0,
-        ai_model="gemini-2.5-flash"
-    )
-    session.add(quiz)
-    await session.commit()
-    await session.refresh(quiz)
+    if quiz_id:
+        # Reuse the quiz record created when the job was queued (also on retries)
+        quiz = await session.get(Quiz, quiz_id)
+        if not quiz:
+            raise ValueError(f"Quiz with id {quiz_id} not found")
+        if quiz.status != "generating":
+            quiz.status = "generating"
+            await session.commit()
+            await publish_status(session, QUIZ, quiz_id, "generating")
+        # Questions of an earlier attempt are replaced below; drop any cached response
+        await invalidate_quiz(quiz_id)
+    else:
+        # Create quiz record with "generating" status
+        quiz = Quiz(
+            document_id=document_id,
+            user_id=user_id,
+            title=f"Quiz for {document_filename}",
+            status="generating",
+            total_questions=0,
+            ai_model="gemini-2.5-flash"
+        )
+        # The id is assigned client-side, so no refresh is needed to use it
+        quiz_id = quiz.id
+        session.add(quiz)
+        await session.commit()
+        await publish_status(session, QUIZ, quiz_id, "generating")
     
     try:
         # Format the prompt completely with all values
@@ -178,39 +174,60 @@ async def generate_quiz(
         )
         
         # Call Gemini API with fully formatted prompt
-        response_text = await call_gemini_quiz(full_prompt)
+        response_text = await call_gemini_quiz(full_prompt, prompt_version=QUIZ_PROMPT_VERSION)
         
         # Parse the response
         questions_data = parse_quiz_response(response_text)
         
-        # Create question records
-        for idx, q_data in enumerate(questions_data):
-            question = Question(
-                quiz_id=quiz.id,
+        # Build question rows (Question applies the id and created_at defaults)
+        question_rows = [
+            Question(
+                quiz_id=quiz_id,
                 question_type=q_data.get("question_type", "multiple_choice"),
                 question_text=q_data.get("question_text", ""),
-                options=json.dumps(q_data.get("options")) if q_data.get("options") else None,
+                options=q_data.get("options") or None,
                 correct_answer=q_data.get("correct_answer", ""),
                 explanation=q_data.get("explanation"),
+                answer_key=(
+                    build_answer_key(q_data.get("correct_answer", ""))
+                    if q_data.get("question_type") == "short_answer" else None
+                ),
                 order_index=idx
-            )
-            session.add(question)
+            ).model_dump()
+            for idx, q_data in enumerate(questions_data)
+        ]
         
-        # Update quiz status
-        quiz.status = "ready"
-        quiz.total_questions = len(questions_data)
+        # Replace the questions of an earlier attempt (job retries reuse the quiz):
+        # the DELETE, one multi-row INSERT and the status UPDATE are committed together
+        await session.execute(delete(Question).where(Question.quiz_id == quiz_id))
+        if question_rows:
+            await session.execute(insert(Question).values(question_rows))
+        await session.execute(
+            update(Quiz)
+            .where(Quiz.id == quiz_id)
+            .values(status="ready", total_questions=len(question_rows))
+        )
         await session.commit()
-        await session.refresh(quiz)
-        
-        logger.info(f"Successfully generated quiz {quiz.id} with {len(questions_data)} questions")
-        return quiz
         
     except Exception as e:
         logger.error(f"Failed to generate quiz for document {document_id}: {e}")
-        quiz.status = "failed"
+        await session.rollback()
+        await session.execute(update(Quiz).where(Quiz.id == quiz_id).values(status="failed"))
         await session.commit()
+        await publish_status(session, QUIZ, quiz_id, "failed")
         raise
 
+    # The quiz is committed as ready: a failure from here on must not mark it failed
+    try:
+        await session.refresh(quiz)
+        await invalidate_quiz(quiz_id)
+        await publish_status(session, QUIZ, quiz_id, "ready")
+    except Exception as e:
+        logger.warning(f"Quiz {quiz_id} is ready, but a follow-up step failed: {e}")
+    
+    logger.info(f"Successfully generated quiz {quiz_id} with {len(question_rows)} questions")
+    return quiz
+
 
 async def grade_quiz(
     quiz_id: UUID,
@@ -230,63 +247,4 @@ async def grade_quiz(
     Returns:
         Dictionary with score, total, percentage, and detailed results
     """
-    from app.db.models import UserAnswer
-    
-    # Fetch the quiz
-    quiz = await session.get(Quiz, quiz_id)
-    if not quiz:
-        raise ValueError(f"Quiz with id {quiz_id} not found")
-    
-    # Fetch all questions for this quiz
-    result = await session.execute(
-        select(Question).where(Question.quiz_id == quiz_id).order_by(Question.order_index)
-    )
-    questions = result.scalars().all()
-    questions_map = {str(q.id): q for q in questions}
-    
-    results = []
-    correct_count = 0
-    
-    for answer in answers:
-        question_id = str(answer["question_id"])
-        user_answer = answer["user_answer"]
-        
-        question = questions_map.get(question_id)
-        if not question:
-            continue
-        
-        # Compare answers (case-insensitive for flexibility)
-        is_correct = user_answer.strip().lower() == question.correct_answer.strip().lower()
-        if is_correct:
-            correct_count += 1
-        
-        # Save user answer
-        user_answer_record = UserAnswer(
-            quiz_id=quiz_id,
-            question_id=question.id,
-            user_id=user_id,
-            user_answer=user_answer,
-            is_correct=is_correct
-        )
-        session.add(user_answer_record)
-        
-        results.append({
-            "question_id": question_id,
-            "is_correct": is_correct,
-            "user_answer": user_answer,
-            "correct_answer": question.correct_answer,
-            "explanation": question.explanation
-        })
-    
-    await session.commit()
-    
-    total = len(questions)
-    percentage = (correct_count / total * 100) if total > 0 else 0
-    
-    return {
-        "quiz_id": str(quiz_id),
-        "score": correct_count,
-        "total": total,
-        "percentage": round(percentage, 1),
-        "results": results
-    }
+    return await grade_submission(session, quiz_id, answers, user_id)
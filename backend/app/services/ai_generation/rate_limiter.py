@@ -0,0 +1,265 @@
+# backend/app/services/ai_generation/rate_limiter.py
+"""
+Client-side admission control for Gemini calls.
+
+Every Gemini call (summary, quiz, streamed summary) goes through one shared
+GeminiGovernor per process:
+
+- TokenBucket: requests/minute and tokens/minute budgets. Callers reserve
+  capacity up front and sleep until it is available, so waiters are served
+  in arrival order instead of retrying in lockstep.
+- InFlightLimiter: caps concurrent calls.
+- CircuitBreaker: after repeated upstream failures, calls fail fast for a
+  cool-down period instead of piling onto an API that is down.
+
+The primitives use threading locks and per-waiter futures rather than
+asyncio.Lock/Semaphore, so one instance can be shared by several event loops
+(API, worker, tests).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upstream errors worth retrying; everything else (bad request, auth, safety blocks) fails at once
+RETRYABLE_ERRORS: Tuple[type, ...] = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+)
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised when the Gemini circuit breaker is open and calls fail fast."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute, holding at most capacity.
+
+    acquire() reserves tokens immediately (the balance may go negative) and sleeps
+    for the time needed to pay the reservation back, which keeps waiters FIFO.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Reserves amount tokens and returns the seconds to wait before using them."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+    async def acquire(self, amount: float = 1) -> float:
+        wait = self.reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class InFlightLimiter:
+    """Caps the number of concurrent holders; waiters are woken in FIFO order."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_flight < self.limit and not self._waiters:
+                self._in_flight += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            # release() hands its slot over to us by resolving the future
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if loop.is_closed():
+                    continue
+                # The slot passes straight to the next waiter; _in_flight is unchanged
+                loop.call_soon_threadsafe(_resolve, future)
+                return
+            self._in_flight -= 1
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures. While open, allow() is False
+    until reset_seconds have passed; then one trial call is let through (half-open)
+    and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_abandoned(self) -> None:
+        """
+        A call let through by allow() ended without an outcome (e.g. it was cancelled).
+
+        An abandoned half-open trial re-opens the circuit for another reset_seconds,
+        after which allow() issues a new trial; otherwise the circuit would stay
+        half-open and reject every call.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Gemini circuit breaker opened after {self._failures} failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class GeminiGovernor:
+    """Shared rate limits, concurrency cap and circuit breaker for all Gemini calls."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_in_flight: int,
+        failure_threshold: int,
+        reset_seconds: float,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.in_flight = InFlightLimiter(max_in_flight)
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int) -> AsyncIterator[None]:
+        """
+        Waits for rate budget and a free in-flight slot, then runs the block.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+        """
+        if not self.breaker.allow():
+            metrics.increment("gemini.circuit_rejections")
+            raise CircuitOpenError("Gemini API is unavailable (circuit breaker open); try again later.")
+
+        started = time.perf_counter()
+        metrics.add_gauge("gemini.limiter_queue_depth", 1)
+        try:
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+            await self.in_flight.acquire()
+        except BaseException:
+            # Cancelled while waiting for capacity
+            self.breaker.record_abandoned()
+            raise
+        finally:
+            metrics.add_gauge("gemini.limiter_queue_depth", -1)
+        metrics.observe("gemini.limiter_wait_seconds", time.perf_counter() - started)
+
+        try:
+            yield
+        except RETRYABLE_ERRORS:
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            # Client-side errors say nothing about upstream health
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled (CancelledError, GeneratorExit) before the call had an outcome
+            self.breaker.record_abandoned()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            self.in_flight.release()
+
+
+def build_governor() -> GeminiGovernor:
+    return GeminiGovernor(
+        requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+        max_in_flight=settings.GEMINI_MAX_IN_FLIGHT,
+        failure_threshold=settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds=settings.GEMINI_CIRCUIT_RESET_SECONDS,
+    )
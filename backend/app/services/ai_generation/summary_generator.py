@@ -1,27 +1,226 @@
 # backend/app/services/ai_generation/summary_generator.py
 
+import asyncio
 import logging
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Document, Summary
-from app.services.ai_generation.gemini_client import call_gemini_summarize
+from app.core.config import settings
+from app.db.models import SUMMARY_PREVIEW_CHARS, Document, Summary
+from app.services.ai_generation.chunking import CHARS_PER_TOKEN, estimate_tokens, split_into_chunks
+from app.services.ai_generation.gemini_client import call_gemini_summarize, stream_gemini_summarize
+from app.services.events.status_bus import DOCUMENT, publish_status
+from app.services.storage.dedup import find_summary_for_duplicate
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# A simple, effective prompt for summarization.
+# Bump SUMMARY_PROMPT_VERSION whenever the prompt changes so stored summaries are not reused.
+SUMMARY_PROMPT = (
+    "You are an expert in creating concise and informative summaries. "
+    "Please summarize the following text, focusing on the key concepts and main points. "
+    "The summary should be easy to understand for someone new to the topic."
+)
+# Long documents are summarized chunk by chunk (map) and the partial summaries combined (reduce)
+SUMMARY_CHUNK_PROMPT = (
+    "You are an expert in creating concise and informative summaries. "
+    "The following text is one section of a longer document. "
+    "Summarize this section, keeping its key concepts, definitions and main points."
+)
+SUMMARY_REDUCE_PROMPT = (
+    "You are an expert in creating concise and informative summaries. "
+    "The following are summaries of consecutive sections of one document. "
+    "Combine them into a single summary, focusing on the key concepts and main points. "
+    "The summary should be easy to understand for someone new to the topic."
+)
+SUMMARY_PROMPT_VERSION = "2"
+SUMMARY_AI_MODEL = "gemini-1.5-flash"
+
+
+async def _summarize_one(prompt: str, text: str, semaphore: asyncio.Semaphore) -> str:
+    async with semaphore:
+        summary = await call_gemini_summarize(
+            prompt=prompt,
+            text=text,
+            prompt_version=SUMMARY_PROMPT_VERSION
+        )
+    if not summary:
+        raise ValueError("Gemini API returned an empty summary for a document section.")
+    return summary
+
+
+async def _summarize_all(prompt: str, texts: List[str], semaphore: asyncio.Semaphore) -> List[str]:
+    """Summarize texts concurrently (bounded by the semaphore), preserving order."""
+    return list(await asyncio.gather(*[_summarize_one(prompt, text, semaphore) for text in texts]))
+
+
+def _group_for_reduce(summaries: List[str], max_tokens: int) -> List[str]:
+    """Pack consecutive summaries into groups that fit in one reduce call."""
+    groups: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        groups.append("\n\n".join(current))
+    return groups
+
+
+async def _reduce(summaries: List[str], max_tokens: int, semaphore: asyncio.Semaphore) -> List[str]:
+    """Reduces partial summaries until they all fit in a single call."""
+    while len(summaries) > 1:
+        groups = _group_for_reduce(summaries, max_tokens)
+        if len(groups) == 1:
+            break
+        if len(groups) == len(summaries):
+            # Every summary fills a chunk on its own; pair them up to guarantee progress
+            groups = ["\n\n".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+        logger.info(f"Reducing {len(summaries)} partial summaries in {len(groups)} groups.")
+        summaries = await _summarize_all(SUMMARY_REDUCE_PROMPT, groups, semaphore)
+    return summaries
+
+
+class IncrementalSummarizer:
+    """
+    Chunked summarization of text that arrives in parts (e.g. PDF page ranges).
+
+    As soon as the text fed with add() holds more than one chunk, every complete
+    chunk is summarized in the background, so the map step overlaps extraction
+    of the later pages. The last chunk keeps growing until more text arrives or
+    the summary is requested. Feeding the whole text at once gives the same
+    chunks as split_into_chunks.
+    """
+
+    def __init__(self):
+        self.chunk_tokens = settings.SUMMARY_CHUNK_TOKENS
+        self.token_budget = settings.SUMMARY_TOKEN_BUDGET
+        self._semaphore = asyncio.Semaphore(max(1, settings.SUMMARY_MAX_CONCURRENCY))
+        self._buffer: List[str] = []
+        self._buffered_chars = 0
+        self._tasks: List[asyncio.Task] = []
+        self._used_tokens = 0
+        self._over_budget = False
+
+    def _start(self, chunk: str) -> bool:
+        """Starts summarizing a chunk; returns False once the token budget is exhausted."""
+        tokens = estimate_tokens(chunk)
+        # The first chunk is always summarized, even if it alone exceeds the budget
+        if self._tasks and self._used_tokens + tokens > self.token_budget:
+            logger.warning(
+                f"Document exceeds the summary token budget ({self.token_budget}); "
+                f"summarizing the first {len(self._tasks)} sections."
+            )
+            self._over_budget = True
+            return False
+        self._used_tokens += tokens
+        self._tasks.append(asyncio.ensure_future(_summarize_one(SUMMARY_CHUNK_PROMPT, chunk, self._semaphore)))
+        return True
+
+    def add(self, text: str) -> None:
+        """Appends text, starting the summaries of the chunks it completes."""
+        if self._over_budget or not text:
+            return
+        self._buffer.append(text)
+        self._buffered_chars += len(text)
+        if self._buffered_chars <= self.chunk_tokens * CHARS_PER_TOKEN:
+            return
+
+        buffered = "".join(self._buffer)
+        chunks = split_into_chunks(buffered, self.chunk_tokens)
+        # The last chunk may continue in the next part; keep it with the separator that followed it
+        tail = chunks.pop() + buffered[len(buffered.rstrip()):] if chunks else ""
+        for chunk in chunks:
+            if not self._start(chunk):
+                tail = ""
+                break
+        self._buffer = [tail] if tail else []
+        self._buffered_chars = len(tail)
+
+    async def prepare_final_call(self) -> Tuple[str, str]:
+        """
+        Summarizes the remaining text and runs the intermediate reduce steps.
+
+        Returns the (prompt, text) of the single call that produces the final summary:
+        the text itself when it fits in one chunk, otherwise the combined partial summaries.
+        """
+        text = "".join(self._buffer)
+        self._buffer, self._buffered_chars = [], 0
+        if not self._tasks and estimate_tokens(text) <= self.chunk_tokens:
+            return SUMMARY_PROMPT, text
+
+        if not self._over_budget:
+            for chunk in split_into_chunks(text, self.chunk_tokens):
+                if not self._start(chunk):
+                    break
+        logger.info(f"Summarizing {len(self._tasks)} sections concurrently.")
+        summaries = list(await asyncio.gather(*self._tasks))
+        summaries = await _reduce(summaries, self.chunk_tokens, self._semaphore)
+        return SUMMARY_REDUCE_PROMPT, "\n\n".join(summaries)
+
+    async def summarize(self) -> str:
+        """Produces the final summary of all text added so far."""
+        prompt, final_text = await self.prepare_final_call()
+        return await call_gemini_summarize(
+            prompt=prompt,
+            text=final_text,
+            prompt_version=SUMMARY_PROMPT_VERSION
+        )
+
+    def cancel(self) -> None:
+        """Stops the chunk summaries still running (e.g. when extraction fails)."""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Mark failures as retrieved; nobody will await them
+                task.exception()
+
+
+async def _prepare_final_call(text: str) -> Tuple[str, str]:
+    """Runs the map and intermediate reduce steps for text; see IncrementalSummarizer."""
+    summarizer = IncrementalSummarizer()
+    summarizer.add(text)
+    return await summarizer.prepare_final_call()
+
+
+async def summarize_text(text: str) -> str:
+    """
+    Summarize text of any length.
+
+    Text that fits in one chunk (SUMMARY_CHUNK_TOKENS) is summarized with a single call.
+    Longer text is split on page and paragraph boundaries, the chunks are summarized
+    concurrently (at most SUMMARY_MAX_CONCURRENCY calls in flight), and the partial
+    summaries are reduced hierarchically until a single summary remains. Input beyond
+    SUMMARY_TOKEN_BUDGET tokens is not summarized.
+    """
+    summarizer = IncrementalSummarizer()
+    summarizer.add(text)
+    return await summarizer.summarize()
+
+
 async def generate_summary(
     document_id: UUID,
     user_id: Optional[UUID],
     extracted_text: str,
-    session: AsyncSession
+    session: AsyncSession,
+    summarizer: Optional[IncrementalSummarizer] = None,
 ):
     """
     Generates a summary for a given document, updates its status,
     and stores the summary in the database.
+
+    summarizer, if given, has already been fed extracted_text while it was being
+    extracted (and has started summarizing its first chunks); it is consumed or
+    cancelled.
     """
     logger.info(f"Starting summary generation for document_id: {document_id}")
 
@@ -33,29 +232,36 @@ async def generate_summary(
 
         if not document:
             logger.error(f"Document with id {document_id} not found.")
+            if summarizer:
+                summarizer.cancel()
             return
 
         document.status = "summarizing"
         session.add(document)
         await session.commit()
+        await publish_status(session, DOCUMENT, document_id, "summarizing")
         await session.refresh(document)
         logger.info(f"Document {document_id} status updated to 'summarizing'.")
 
     except Exception as e:
         logger.error(f"Error updating document status to 'summarizing': {e}")
+        if summarizer:
+            summarizer.cancel()
         # Decide if we should proceed or return
         return
 
-    # 2. Construct prompt and call Gemini client
+    # 2. Reuse the summary of an identical upload, or call Gemini client
     try:
-        # A simple, effective prompt for summarization
-        prompt = (
-            "You are an expert in creating concise and informative summaries. "
-            "Please summarize the following text, focusing on the key concepts and main points. "
-            "The summary should be easy to understand for someone new to the topic."
-        )
-
-        summary_text = await call_gemini_summarize(prompt=prompt, text=extracted_text)
+        reusable_summary = await find_summary_for_duplicate(session, document_id, SUMMARY_PROMPT_VERSION)
+        if reusable_summary:
+            logger.info(f"Reusing summary {reusable_summary.id} of an identical upload for document {document_id}.")
+            summary_text = reusable_summary.summary_text
+            if summarizer:
+                summarizer.cancel()
+        elif summarizer:
+            summary_text = await summarizer.summarize()
+        else:
+            summary_text = await summarize_text(extracted_text)
 
         if not summary_text:
             raise ValueError("Gemini API returned an empty summary.")
@@ -65,7 +271,9 @@ async def generate_summary(
             document_id=document_id,
             user_id=user_id,
             summary_text=summary_text,
-            ai_model="gemini-1.5-flash"
+            summary_preview=summary_text[:SUMMARY_PREVIEW_CHARS],
+            ai_model=SUMMARY_AI_MODEL,
+            prompt_version=SUMMARY_PROMPT_VERSION
         )
         session.add(new_summary)
 
@@ -74,10 +282,13 @@ async def generate_summary(
         session.add(document)
 
         await session.commit()
+        await publish_status(session, DOCUMENT, document_id, "summarized")
         logger.info(f"Successfully generated and stored summary for document {document_id}.")
 
     except Exception as e:
         logger.error(f"An error occurred during summary generation or storage: {e}")
+        if summarizer:
+            summarizer.cancel()
         # 5. Update document status to 'summary-failed' on error
         try:
             # We need to ensure 'document' is available or re-fetch it
@@ -90,9 +301,87 @@ async def generate_summary(
                 document.status = "summary-failed"
                 session.add(document)
                 await session.commit()
+                await publish_status(session, DOCUMENT, document_id, "summary-failed")
                 logger.warning(f"Document {document_id} status updated to 'summary-failed'.")
 
         except Exception as db_error:
             logger.error(f"CRITICAL: Failed to update document status to 'summary-failed' after an error: {db_error}")
             # The session might be in a bad state, so we might need to rollback
             await session.rollback()
+
+
+async def stream_summary(
+    document_id: UUID,
+    user_id: Optional[UUID],
+    extracted_text: str,
+    session: AsyncSession
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of generate_summary: yields the summary text as it is
+    generated and stores the Summary once the stream completes.
+
+    Long documents run their map and intermediate reduce steps first; only the
+    final summary is streamed. On failure the document is marked 'summary-failed'
+    and the error is re-raised.
+    """
+    logger.info(f"Starting streamed summary generation for document_id: {document_id}")
+
+    document = await session.get(Document, document_id)
+    if not document:
+        raise ValueError(f"Document with id {document_id} not found.")
+
+    document.status = "summarizing"
+    session.add(document)
+    await session.commit()
+    await publish_status(session, DOCUMENT, document_id, "summarizing")
+
+    try:
+        reusable_summary = await find_summary_for_duplicate(session, document_id, SUMMARY_PROMPT_VERSION)
+        if reusable_summary:
+            logger.info(f"Reusing summary {reusable_summary.id} of an identical upload for document {document_id}.")
+            summary_text = reusable_summary.summary_text
+            yield summary_text
+        else:
+            prompt, final_text = await _prepare_final_call(extracted_text)
+            pieces: List[str] = []
+            async for piece in stream_gemini_summarize(
+                prompt=prompt,
+                text=final_text,
+                prompt_version=SUMMARY_PROMPT_VERSION
+            ):
+                pieces.append(piece)
+                yield piece
+            summary_text = "".join(pieces)
+
+        if not summary_text:
+            raise ValueError("Gemini API returned an empty summary.")
+
+        session.add(Summary(
+            document_id=document_id,
+            user_id=user_id,
+            summary_text=summary_text,
+            summary_preview=summary_text[:SUMMARY_PREVIEW_CHARS],
+            ai_model=SUMMARY_AI_MODEL,
+            prompt_version=SUMMARY_PROMPT_VERSION
+        ))
+        document.status = "summarized"
+        session.add(document)
+        await session.commit()
+        await publish_status(session, DOCUMENT, document_id, "summarized")
+        logger.info(f"Successfully streamed and stored summary for document {document_id}.")
+
+    except BaseException as e:
+        # BaseException: a client disconnect cancels the stream mid-way
+        logger.error(f"An error occurred during streamed summary generation: {e!r}")
+        try:
+            await session.rollback()
+            document = await session.get(Document, document_id)
+            if document:
+                document.status = "summary-failed"
+                session.add(document)
+                await session.commit()
+                await publish_status(session, DOCUMENT, document_id, "summary-failed")
+                logger.warning(f"Document {document_id} status updated to 'summary-failed'.")
+        except Exception as db_error:
+            logger.error(f"CRITICAL: Failed to update document status to 'summary-failed' after an error: {db_error}")
+        raise
@@ -1,14 +1,51 @@
 import io
 import mimetypes
-from typing import Callable, Dict, Union
+import mmap
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Union
 
 import docx
 from pypdf import PdfReader
 
 
+# What the extractors read: the file content, or the path of a local file, which is
+# memory-mapped so its pages come straight from the OS page cache without a copy
+FileSource = Union[bytes, str]
+
+
+class _MappedFile(mmap.mmap):
+    """Read-only memory map with the file-object methods the parsers (zipfile, pypdf) check for."""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+
+@contextmanager
+def open_source(source: FileSource) -> Iterator[BinaryIO]:
+    """Opens a FileSource as a seekable binary stream."""
+    if not isinstance(source, str):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield io.BytesIO(b"")
+            return
+        with _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
 def extract_text_from_txt(file_stream: io.BytesIO) -> str:
-    """Extracts text from a .txt file stream."""
-    return file_stream.read().decode("utf-8")
+    """Extracts text from a .txt file stream (UTF-8, falling back to Windows-1252 for legacy files)."""
+    content = file_stream.read()
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return content.decode("cp1252", errors="replace")
 
 
 def extract_text_from_docx(file_stream: io.BytesIO) -> str:
@@ -17,16 +54,58 @@ def extract_text_from_docx(file_stream: io.BytesIO) -> str:
     return "\n".join([paragraph.text for paragraph in doc.paragraphs])
 
 
+def iter_pdf_pages(reader: PdfReader, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields the text of pages [start, end) one at a time, each followed by a newline.
+
+    Every page after the first is preceded by a form feed, so chunking can split on
+    page breaks. The separator depends only on the page number, which keeps
+    consecutive ranges concatenating to the text of the whole document.
+    """
+    for page_number in range(start, min(len(reader.pages), end if end is not None else len(reader.pages))):
+        page_break = "\f" if page_number else ""
+        yield page_break + reader.pages[page_number].extract_text() + "\n"
+
+
 def extract_text_from_pdf(file_stream: io.BytesIO) -> str:
     """Extracts text from a .pdf file stream."""
-    reader = PdfReader(file_stream)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+    return "".join(iter_pdf_pages(PdfReader(file_stream)))
+
+
+def count_pdf_pages(file_content: FileSource) -> int:
+    """Returns the number of pages in a .pdf file."""
+    with open_source(file_content) as file_stream:
+        return len(PdfReader(file_stream).pages)
+
+
+def extract_text_from_pdf_pages(file_content: FileSource, start: int, end: int) -> str:
+    """
+    Extracts text from pages [start, end) of a .pdf file.
+
+    Used by the extraction pool to split large PDFs across worker processes;
+    concatenating the results of consecutive ranges gives the same text as
+    extract_text_from_pdf.
+    """
+    with open_source(file_content) as file_stream:
+        return "".join(iter_pdf_pages(PdfReader(file_stream), start, end))
+
+
+def limit_worker_memory(max_bytes: Optional[int]) -> None:
+    """
+    Caps the address space of the current process (extraction pool initializer).
+    Parsers that exceed the cap fail with MemoryError instead of exhausting the host.
+    """
+    if not max_bytes:
+        return
+    try:
+        import resource
+    except ImportError:
+        # The resource module is not available on Windows
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
 
 
-FILE_EXTRACTORS: Dict[str, Callable[[io.BytesIO], str]] = {
+FILE_EXTRACTORS: Dict[str, Callable[[BinaryIO], str]] = {
     "text/plain": extract_text_from_txt,
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document": extract_text_from_docx,
     "application/pdf": extract_text_from_pdf,
@@ -34,14 +113,14 @@ FILE_EXTRACTORS: Dict[str, Callable[[io.BytesIO], str]] = {
 
 
 def extract_text_from_file(
-    file_content: bytes,
+    file_content: FileSource,
     filename: str
 ) -> Union[str, None]:
     """
     Extracts text from a file based on its mime type.
 
     Args:
-        file_content: The content of the file in bytes.
+        file_content: The content of the file in bytes, or the path of a local file.
         filename: The name of the file.
 
     Returns:
@@ -54,8 +133,8 @@ def extract_text_from_file(
         return None
 
     try:
-        file_stream = io.BytesIO(file_content)
-        return extractor(file_stream)
+        with open_source(file_content) as file_stream:
+            return extractor(file_stream)
     except Exception as e:
         # Log the exception for debugging purposes
         print(f"Error extracting text from file with mime type {mime_type}: {e}")
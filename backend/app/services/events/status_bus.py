@@ -0,0 +1,247 @@
+# backend/app/services/events/status_bus.py
+"""
+In-process pub/sub of document and quiz status transitions.
+
+The pipeline (text extraction, summary and quiz generation) publishes every
+status it commits; the SSE status endpoints subscribe per document or quiz and
+push transitions to the client instead of the client polling.
+
+Jobs often run in a separate worker process. With STATUS_NOTIFY_ENABLED the
+publisher also sends each event with Postgres NOTIFY, and every API process runs
+a StatusListener that LISTENs on the channel and republishes events from other
+processes into its local bus. LISTEN needs a session of its own, so the listener
+connects through STATUS_LISTEN_DATABASE_URL (directly or via the session-mode
+pooler) rather than the transaction-mode pooler of the main engine.
+Notifications sent while it reconnects are lost; streams catch up by re-reading
+the status on every keep-alive (see sse.py).
+
+Like the Gemini rate limiter, the bus uses a threading lock and hands events to
+each subscriber's own event loop, so one instance can serve several loops.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DOCUMENT = "document"
+QUIZ = "quiz"
+
+# Statuses after which an entity no longer changes (until regenerated)
+TERMINAL_STATUSES = {
+    DOCUMENT: frozenset({"summarized", "summary-failed", "extraction-failed"}),
+    QUIZ: frozenset({"ready", "failed"}),
+}
+
+
+def is_terminal(kind: str, status: Optional[str]) -> bool:
+    return status in TERMINAL_STATUSES[kind]
+
+
+NOTIFY_CHANNEL = "status_events"
+
+# Identifies this process in NOTIFY payloads, so it skips its own events
+PROCESS_ID = uuid4().hex
+
+# First StatusListener reconnect waits up to this; doubles per failed attempt
+RECONNECT_BASE_SECONDS = 0.5
+
+# Events buffered per subscriber; a subscriber that falls this far behind drops the oldest
+SUBSCRIBER_QUEUE_SIZE = 64
+
+Topic = Tuple[str, str]
+
+
+def _deliver(queue: asyncio.Queue, event: dict) -> None:
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class StatusBus:
+    """Fan-out of status events to the subscribers of each (kind, id) topic."""
+
+    def __init__(self):
+        self._subscribers: Dict[Topic, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    @asynccontextmanager
+    async def subscribe(self, kind: str, entity_id: UUID) -> AsyncIterator[asyncio.Queue]:
+        """Yields a queue that receives the events of one document or quiz."""
+        topic = (kind, str(entity_id))
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(entry)
+        metrics.add_gauge("status_events.subscribers", 1)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(entry)
+                    if not subscribers:
+                        del self._subscribers[topic]
+            metrics.add_gauge("status_events.subscribers", -1)
+
+    def publish(self, event: dict) -> None:
+        """Delivers an event ({"type", "id", "status"}) to its subscribers; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get((event["type"], event["id"]), ()))
+        for loop, queue in subscribers:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_deliver, queue, event)
+
+
+_status_bus = StatusBus()
+
+
+def get_status_bus() -> StatusBus:
+    return _status_bus
+
+
+def set_status_bus(bus: StatusBus) -> None:
+    global _status_bus
+    _status_bus = bus
+
+
+def status_event(kind: str, entity_id: UUID, status: str) -> dict:
+    return {"type": kind, "id": str(entity_id), "status": status}
+
+
+async def publish_status(session: AsyncSession, kind: str, entity_id: UUID, status: str) -> None:
+    """
+    Announces a status that has just been committed.
+
+    Never raises: a lost notification must not fail the pipeline step that
+    committed the status (clients still see it when they reconnect).
+    """
+    event = status_event(kind, entity_id, status)
+    get_status_bus().publish(event)
+    metrics.increment("status_events.published")
+
+    if not settings.STATUS_NOTIFY_ENABLED or session.bind.dialect.name != "postgresql":
+        return
+    try:
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": NOTIFY_CHANNEL, "payload": json.dumps({**event, "origin": PROCESS_ID})},
+        )
+        await session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to NOTIFY status event {event}: {e}")
+        await session.rollback()
+
+
+class StatusListener:
+    """
+    Republishes status events NOTIFYed by other processes into the local bus.
+
+    Holds one connection of a listen engine (see build_listen_engine) and
+    reconnects with jittered exponential backoff whenever it is lost. Idle
+    connections are pinged every STATUS_LISTEN_HEALTHCHECK_SECONDS, since a
+    silently dropped TCP connection is never reported as terminated.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self._stopping = False
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed status notification: {payload!r}")
+            return
+        if event.pop("origin", None) == PROCESS_ID:
+            return
+        get_status_bus().publish(event)
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        # Also checked by _run: asyncio.wait_for may swallow a cancellation that
+        # races with the awaited call completing
+        self._stopping = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _reconnect_delay(self) -> float:
+        ceiling = min(settings.STATUS_LISTEN_RECONNECT_MAX_SECONDS, RECONNECT_BASE_SECONDS * 2 ** self._failures)
+        return random.uniform(0, ceiling)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self._listen_once()
+                if self._stopping:
+                    return
+                logger.warning("Status listener connection lost, reconnecting")
+            except Exception as e:
+                logger.warning(f"Status listener connection failed: {e!r}")
+            metrics.increment("status_events.listener_reconnects")
+            await asyncio.sleep(self._reconnect_delay())
+            self._failures += 1
+
+    async def _listen_once(self) -> None:
+        """LISTENs on one connection until it is lost."""
+        lost = asyncio.Event()
+        lost_waiter = asyncio.ensure_future(lost.wait())
+
+        def on_lost(connection) -> None:
+            lost.set()
+
+        async with self.engine.connect() as connection:
+            raw = await connection.get_raw_connection()
+            driver_connection = raw.driver_connection
+            driver_connection.add_termination_listener(on_lost)
+            await driver_connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            self._failures = 0
+            self.connected.set()
+            logger.info(f"Listening for status events on channel '{NOTIFY_CHANNEL}'")
+            try:
+                while not self._stopping:
+                    await asyncio.wait({lost_waiter}, timeout=settings.STATUS_LISTEN_HEALTHCHECK_SECONDS)
+                    if lost.is_set():
+                        return
+                    # On the driver connection: a transaction would hold back notifications
+                    await asyncio.wait_for(
+                        driver_connection.fetchval("SELECT 1"), timeout=settings.STATUS_LISTEN_HEALTHCHECK_SECONDS
+                    )
+            finally:
+                lost_waiter.cancel()
+                self.connected.clear()
+                driver_connection.remove_termination_listener(on_lost)
+                if not driver_connection.is_closed():
+                    try:
+                        await driver_connection.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+                    except Exception:
+                        pass
@@ -0,0 +1,260 @@
+# backend/app/services/grading/engine.py
+"""
+Set-based quiz grading.
+
+A quiz's answer key is loaded with one query and normalized once; every answer
+in a submission (or in a batch of submissions for the same quiz) is graded
+against it in memory, and all UserAnswer rows are written with multi-row
+INSERTs in a single transaction.
+
+Answers are scored by the matcher for their question type (see matchers.py).
+Short answers scoring between SHORT_ANSWER_REJECT_THRESHOLD and
+SHORT_ANSWER_ACCEPT_THRESHOLD are borderline; they are marked incorrect unless
+SHORT_ANSWER_LLM_ADJUDICATION is enabled, in which case Gemini decides.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.db.models import Question, Quiz, UserAnswer
+from app.services.ai_generation.gemini_client import call_gemini_adjudicate
+from app.services.grading.matchers import (
+    ANSWER_MATCHERS,
+    load_short_answer_key,
+    match_exact,
+    normalize_answer,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement; keeps bind parameters well under the driver limits
+INSERT_BATCH_ROWS = 1000
+
+ADJUDICATION_PROMPT_VERSION = "1"
+ADJUDICATION_PROMPT = """You are grading a short-answer quiz question.
+
+Question: {question_text}
+Expected answer: {correct_answer}
+Student answer: {user_answer}
+
+Does the student answer mean the same as the expected answer? Minor spelling mistakes and different wording are acceptable; missing or wrong facts are not.
+Reply with exactly one word: CORRECT or INCORRECT."""
+
+
+@dataclass
+class AnswerKeyEntry:
+    question_id: UUID
+    question_type: str
+    question_text: str
+    correct_answer: str
+    explanation: Optional[str]
+    # Precomputed short-answer key (None for other question types)
+    key: Optional[dict] = None
+
+
+@dataclass
+class GradedAnswer:
+    entry: AnswerKeyEntry
+    user_answer: str
+    score: float
+    is_correct: bool
+    borderline: bool = False
+
+    def to_result(self) -> dict:
+        return {
+            "question_id": str(self.entry.question_id),
+            "is_correct": self.is_correct,
+            "user_answer": self.user_answer,
+            "correct_answer": self.entry.correct_answer,
+            "explanation": self.entry.explanation,
+        }
+
+
+@dataclass
+class Submission:
+    """One user's answers to a quiz: a list of {"question_id": UUID, "user_answer": str}."""
+    user_id: Optional[UUID]
+    answers: List[dict] = field(default_factory=list)
+
+
+async def load_answer_key(session: AsyncSession, quiz_id: UUID) -> Dict[str, AnswerKeyEntry]:
+    """
+    Loads the normalized answer key for a quiz, keyed by question id string.
+
+    Raises:
+        ValueError: If the quiz does not exist.
+    """
+    result = await session.execute(
+        select(
+            Question.id,
+            Question.question_type,
+            Question.question_text,
+            Question.correct_answer,
+            Question.explanation,
+            Question.answer_key,
+        )
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.order_index)
+    )
+    key = {
+        str(row.id): AnswerKeyEntry(
+            question_id=row.id,
+            question_type=row.question_type,
+            question_text=row.question_text,
+            correct_answer=row.correct_answer,
+            explanation=row.explanation,
+            key=(
+                load_short_answer_key(row.answer_key, row.correct_answer)
+                if row.question_type == "short_answer" else None
+            ),
+        )
+        for row in result.all()
+    }
+    if not key and not await session.get(Quiz, quiz_id):
+        raise ValueError(f"Quiz with id {quiz_id} not found")
+    return key
+
+
+def grade_answers(answer_key: Dict[str, AnswerKeyEntry], answers: List[dict]) -> List[GradedAnswer]:
+    """
+    Grades answers against an answer key locally, without touching the database.
+
+    Answers to questions that are not part of the quiz are skipped. Borderline
+    short answers are returned as incorrect with borderline=True.
+
+    Returns:
+        One GradedAnswer per graded answer, in submission order.
+    """
+    accept = settings.SHORT_ANSWER_ACCEPT_THRESHOLD
+    reject = settings.SHORT_ANSWER_REJECT_THRESHOLD
+    graded = []
+    for answer in answers:
+        question_id = str(answer["question_id"])
+        entry = answer_key.get(question_id)
+        if entry is None:
+            logger.warning(f"Skipping answer for question {question_id}, which is not part of the quiz")
+            continue
+        user_answer = answer["user_answer"]
+        matcher = ANSWER_MATCHERS.get(entry.question_type, match_exact)
+        score = matcher(user_answer, entry.correct_answer, entry.key)
+        graded.append(GradedAnswer(
+            entry=entry,
+            user_answer=user_answer,
+            score=score,
+            is_correct=score >= accept,
+            borderline=entry.question_type == "short_answer" and reject <= score < accept,
+        ))
+    return graded
+
+
+async def adjudicate_short_answer(entry: AnswerKeyEntry, user_answer: str) -> bool:
+    """Asks Gemini whether a borderline short answer is correct."""
+    response = await call_gemini_adjudicate(
+        ADJUDICATION_PROMPT.format(
+            question_text=entry.question_text,
+            correct_answer=entry.correct_answer,
+            user_answer=user_answer,
+        ),
+        prompt_version=ADJUDICATION_PROMPT_VERSION,
+    )
+    return response.strip().upper().startswith("CORRECT")
+
+
+async def _adjudicate_borderline(graded: List[GradedAnswer]) -> None:
+    """Resolves borderline answers with Gemini, once per distinct (question, answer)."""
+    pending: Dict[Tuple[str, str], List[GradedAnswer]] = {}
+    for answer in graded:
+        if answer.borderline:
+            key = (str(answer.entry.question_id), normalize_answer(answer.user_answer))
+            pending.setdefault(key, []).append(answer)
+    if not pending:
+        return
+
+    logger.info(f"Adjudicating {len(pending)} borderline short answers with Gemini")
+    groups = list(pending.values())
+    verdicts = await asyncio.gather(
+        *[adjudicate_short_answer(group[0].entry, group[0].user_answer) for group in groups],
+        return_exceptions=True,
+    )
+    for group, verdict in zip(groups, verdicts):
+        if isinstance(verdict, Exception):
+            # Keep the local verdict; grading must not fail because the LLM is unavailable
+            logger.warning(f"Adjudication failed, keeping local grade: {verdict}")
+            continue
+        for answer in group:
+            answer.is_correct = verdict
+
+
+def _summarize(quiz_id: UUID, total: int, graded: List[GradedAnswer]) -> dict:
+    score = sum(1 for answer in graded if answer.is_correct)
+    percentage = (score / total * 100) if total > 0 else 0
+    return {
+        "quiz_id": str(quiz_id),
+        "score": score,
+        "total": total,
+        "percentage": round(percentage, 1),
+        "results": [answer.to_result() for answer in graded],
+    }
+
+
+async def grade_submissions(
+    session: AsyncSession,
+    quiz_id: UUID,
+    submissions: List[Submission],
+) -> List[dict]:
+    """
+    Grades many submissions of the same quiz (e.g. a whole class) in one transaction.
+
+    Args:
+        session: Database session
+        quiz_id: The ID of the quiz
+        submissions: The submissions to grade
+
+    Returns:
+        One result dictionary (score, total, percentage, results) per submission, in order.
+
+    Raises:
+        ValueError: If the quiz does not exist.
+    """
+    answer_key = await load_answer_key(session, quiz_id)
+
+    graded = [grade_answers(answer_key, submission.answers) for submission in submissions]
+    if settings.SHORT_ANSWER_LLM_ADJUDICATION:
+        await _adjudicate_borderline([answer for answers in graded for answer in answers])
+
+    rows = [
+        UserAnswer(
+            quiz_id=quiz_id,
+            question_id=answer.entry.question_id,
+            user_id=submission.user_id,
+            user_answer=answer.user_answer,
+            is_correct=answer.is_correct,
+        ).model_dump()
+        for submission, answers in zip(submissions, graded)
+        for answer in answers
+    ]
+    for start in range(0, len(rows), INSERT_BATCH_ROWS):
+        await session.execute(insert(UserAnswer).values(rows[start:start + INSERT_BATCH_ROWS]))
+    await session.commit()
+
+    logger.info(f"Graded {len(submissions)} submissions for quiz {quiz_id} ({len(rows)} answers)")
+    return [_summarize(quiz_id, len(answer_key), answers) for answers in graded]
+
+
+async def grade_submission(
+    session: AsyncSession,
+    quiz_id: UUID,
+    answers: List[dict],
+    user_id: Optional[UUID],
+) -> dict:
+    """Grades a single submission; see grade_submissions."""
+    return (await grade_submissions(session, quiz_id, [Submission(user_id=user_id, answers=answers)]))[0]
@@ -0,0 +1,246 @@
+# backend/app/services/grading/matchers.py
+"""
+Answer matchers used by the grading engine.
+
+Multiple-choice and true/false answers are compared exactly (after
+normalization). Short answers are scored against a precomputed answer key
+(normalized text, stemmed content words and canonical numbers) so that a
+correct answer worded differently, or with a typo, is still accepted. The key
+is built once when the quiz is generated and stored on the question.
+
+Words that look alike are not always the same answer: possible/impossible,
+hyperthyroidism/hypothyroidism and mitosis/meiosis differ by a prefix or a
+couple of letters. Answers that only match through such near misses score at
+SHORT_ANSWER_REJECT_THRESHOLD, the bottom of the borderline band, so they are
+marked incorrect or adjudicated (see engine.py) instead of being accepted.
+The same holds for numeric answers that list extra numbers or negate the
+number ("1944 1945 1946", "not 1945").
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+# Bump when the key format or the normalization changes; older keys are rebuilt on read
+ANSWER_KEY_VERSION = 1
+
+# Two stemmed words are treated as the same word above this similarity (absorbs typos)
+TOKEN_SIMILARITY = 0.85
+
+# Shorter words must match exactly: one or two letters often change their meaning
+# (mitosis/meiosis, chloride/chlorite)
+MIN_FUZZY_WORD_LENGTH = 9
+
+# Prefixes that turn a word into its opposite or a related but different term;
+# words that differ only in one of them must match exactly
+CONTRAST_PREFIXES = ("hyper", "hypo", "endo", "exo", "non", "dis", "un", "in", "im", "il", "ir")
+
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+_NUMBER = re.compile(r"^-?[0-9]+(?:,[0-9]{3})*(?:\.[0-9]+)?$")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the their "
+    "there these this those to was were which with".split()
+)
+
+NUMBER_WORDS = {
+    word: index
+    for index, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+        "fourteen fifteen sixteen seventeen eighteen nineteen twenty".split()
+    )
+}
+NUMBER_WORDS.update({"thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70,
+                     "eighty": 80, "ninety": 90, "hundred": 100, "thousand": 1000})
+
+# (suffix, replacement), longest first; a light stemmer, not a full Porter implementation
+_SUFFIXES = (
+    ("ational", "ate"), ("ization", "ize"), ("fulness", "ful"), ("iveness", "ive"),
+    ("ations", "ate"), ("ation", "ate"), ("ments", ""), ("ment", ""), ("ingly", ""),
+    ("edly", ""), ("ies", "y"), ("ing", ""), ("ers", ""), ("er", ""), ("ed", ""),
+    ("ly", ""), ("es", ""), ("s", ""),
+)
+
+
+def normalize_answer(answer: str) -> str:
+    """Case- and whitespace-insensitive form of an answer used for comparison."""
+    return _WHITESPACE.sub(" ", answer.strip().lower())
+
+
+def stem(word: str) -> str:
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+# Stemmed words that turn an answer around ("not 1945")
+NEGATION_STEMS = frozenset(stem(word) for word in ("no", "not", "never", "none", "neither", "nor"))
+
+
+def canonical_number(token: str) -> Optional[str]:
+    """Canonical string for a numeric token ("1,000.50" -> "1000.5", "seven" -> "7"), else None."""
+    if token in NUMBER_WORDS:
+        return str(NUMBER_WORDS[token])
+    if not _NUMBER.match(token):
+        return None
+    try:
+        value = Decimal(token.replace(",", ""))
+    except InvalidOperation:
+        return None
+    return format(value.normalize(), "f")
+
+
+def _analyze(text: str) -> Dict[str, List[str]]:
+    stems: List[str] = []
+    numbers: List[str] = []
+    for token in _WORD.findall(normalize_answer(text)):
+        number = canonical_number(token)
+        if number is not None:
+            numbers.append(number)
+        elif token not in STOP_WORDS:
+            stems.append(stem(token))
+    return {"stems": sorted(set(stems)), "numbers": sorted(set(numbers))}
+
+
+def build_answer_key(correct_answer: str) -> dict:
+    """Precomputes the forms a short answer is matched against."""
+    return {"v": ANSWER_KEY_VERSION, "normalized": normalize_answer(correct_answer), **_analyze(correct_answer)}
+
+
+def load_short_answer_key(stored: Optional[dict], correct_answer: str) -> dict:
+    """Returns the stored key, rebuilding it if missing (older questions) or outdated."""
+    if stored and stored.get("v") == ANSWER_KEY_VERSION:
+        return stored
+    return build_answer_key(correct_answer)
+
+
+def _strip_contrast_prefix(word: str) -> str:
+    for prefix in CONTRAST_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 3:
+            return word[len(prefix):]
+    return word
+
+
+def _differ_by_prefix(a: str, b: str) -> bool:
+    return a != b and _strip_contrast_prefix(a) == _strip_contrast_prefix(b)
+
+
+def _word_similarity(a: str, b: str, strict: bool = True) -> float:
+    """
+    How closely two stemmed words match, from 0.0 to 1.0.
+
+    Equal words score 1.0 and likely typos their character similarity. With
+    strict=True, words that differ only in a contrast prefix or are shorter than
+    MIN_FUZZY_WORD_LENGTH score 0.0 unless equal; strict=False scores these near
+    misses too.
+    """
+    if a == b:
+        return 1.0
+    prefix_variant = _differ_by_prefix(a, b)
+    if strict and (prefix_variant or min(len(a), len(b)) < MIN_FUZZY_WORD_LENGTH):
+        return 0.0
+    ratio = SequenceMatcher(None, a, b).ratio()
+    return ratio if ratio >= TOKEN_SIMILARITY or prefix_variant else 0.0
+
+
+def _token_score(key_stems: List[str], user_stems: List[str], strict: bool) -> float:
+    """Recall-weighted (F2) overlap of content words, each match weighted by its similarity."""
+    if not key_stems or not user_stems:
+        return 0.0
+    recall = sum(max(_word_similarity(k, u, strict) for u in user_stems) for k in key_stems) / len(key_stems)
+    precision = sum(max(_word_similarity(u, k, strict) for k in key_stems) for u in user_stems) / len(user_stems)
+    if not recall or not precision:
+        return 0.0
+    return 5 * precision * recall / (4 * precision + recall)
+
+
+def _is_near_miss(a: str, b: str) -> bool:
+    return a != b and (_differ_by_prefix(a, b) or min(len(a), len(b)) < MIN_FUZZY_WORD_LENGTH)
+
+
+def _char_similarity(a: str, b: str, strict: bool) -> float:
+    """
+    Whole-answer character similarity.
+
+    With strict=True, answers score 0.0 when a pair of words at the same position
+    is a near miss ("dna polymerase"/"rna polymerase"), or when the word counts
+    differ other than by spacing, so the words cannot be paired up.
+    """
+    if strict and a.replace(" ", "") != b.replace(" ", ""):
+        a_words, b_words = a.split(" "), b.split(" ")
+        if len(a_words) != len(b_words) or any(_is_near_miss(x, y) for x, y in zip(a_words, b_words)):
+            return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _numbers_hedged(analyzed: Dict[str, List[str]], key: dict) -> bool:
+    """True if the answer has numbers the key lacks, or a negation the key lacks ("not 1945")."""
+    if set(analyzed["numbers"]) != set(key["numbers"]):
+        return True
+    return any(word in NEGATION_STEMS and word not in key["stems"] for word in analyzed["stems"])
+
+
+def score_short_answer(user_answer: str, key: dict) -> float:
+    """
+    Scores a short answer against a precomputed key, from 0.0 (wrong) to 1.0 (match).
+
+    - Numbers in the key must all appear in the answer (in any notation), otherwise 0.
+      Extra numbers or a negation the key lacks make the answer borderline at best.
+    - Content words are compared after stemming, tolerating typos in longer words;
+      the score is recall-weighted (F2), so extra words cost less than missing ones.
+    - Whole-answer character similarity catches misspelled single-word answers.
+    - An answer that only scores higher when near misses count as matches is
+      capped at SHORT_ANSWER_REJECT_THRESHOLD (borderline) rather than accepted.
+    """
+    normalized = normalize_answer(user_answer)
+    if not normalized:
+        return 0.0
+    if normalized == key["normalized"]:
+        return 1.0
+
+    analyzed = _analyze(user_answer)
+    hedged = False
+    if key["numbers"]:
+        if not set(key["numbers"]) <= set(analyzed["numbers"]):
+            return 0.0
+        # Listing candidates ("1944 1945 1946") or negating the number is not the answer
+        hedged = _numbers_hedged(analyzed, key)
+        if not key["stems"]:
+            return settings.SHORT_ANSWER_REJECT_THRESHOLD if hedged else 1.0
+
+    key_stems, user_stems = key["stems"], analyzed["stems"]
+    score = max(
+        _token_score(key_stems, user_stems, strict=True),
+        _char_similarity(normalized, key["normalized"], strict=True),
+    )
+    lenient_score = max(
+        _token_score(key_stems, user_stems, strict=False),
+        _char_similarity(normalized, key["normalized"], strict=False),
+    )
+    if lenient_score > score:
+        # The answer resembles the key only through words that may mean something else
+        return min(lenient_score, settings.SHORT_ANSWER_REJECT_THRESHOLD)
+    if hedged:
+        return min(score, settings.SHORT_ANSWER_REJECT_THRESHOLD)
+    return score
+
+
+def match_exact(user_answer: str, correct_answer: str, key: Optional[dict]) -> float:
+    return 1.0 if normalize_answer(user_answer) == normalize_answer(correct_answer) else 0.0
+
+
+def match_short_answer(user_answer: str, correct_answer: str, key: Optional[dict]) -> float:
+    return score_short_answer(user_answer, key or build_answer_key(correct_answer))
+
+
+# Scoring function per question type; unknown types fall back to exact matching
+ANSWER_MATCHERS: Dict[str, Callable[[str, str, Optional[dict]], float]] = {
+    "multiple_choice": match_exact,
+    "true_false": match_exact,
+    "short_answer": match_short_answer,
+}
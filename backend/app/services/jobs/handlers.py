@@ -0,0 +1,85 @@
+# backend/app/services/jobs/handlers.py
+"""
+Job handlers run by the worker. Each handler receives the decoded job payload and a
+database session owned by the worker (never a request's session).
+"""
+
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.summaries.main import run_text_extraction
+from app.db.models import Document
+from app.schemas.quiz import QuestionType
+from app.services.ai_generation.quiz_generator import generate_quiz
+from app.services.ai_generation.summary_generator import generate_summary
+from app.services.jobs.queue import JOB_EXTRACT_TEXT, JOB_GENERATE_SUMMARY, JOB_GENERATE_QUIZ
+from app.services.storage.content import load_document_content
+from app.services.storage.backends import get_document_storage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _optional_uuid(value: Optional[str]) -> Optional[UUID]:
+    return UUID(value) if value else None
+
+
+async def handle_extract_text(payload: dict, session: AsyncSession) -> None:
+    """Download an uploaded file, extract its text and optionally summarize it."""
+    await run_text_extraction(
+        document_id=UUID(payload["document_id"]),
+        storage_path=payload["storage_path"],
+        filename=payload["filename"],
+        user_id=_optional_uuid(payload.get("user_id")),
+        storage=get_document_storage(),
+        db_session=session,
+        auto_generate_summary=payload.get("auto_generate_summary", True),
+    )
+
+
+async def handle_generate_summary(payload: dict, session: AsyncSession) -> None:
+    """Generate a summary for a document whose text has already been extracted."""
+    document_id = UUID(payload["document_id"])
+    document = await session.get(Document, document_id)
+    if not document:
+        logger.error(f"Document {document_id} not found for summary job; skipping")
+        return
+    extracted_text = await load_document_content(session, document_id)
+    if not extracted_text:
+        raise ValueError(f"Document {document_id} has no extracted text content")
+
+    await generate_summary(
+        document_id=document_id,
+        user_id=_optional_uuid(payload.get("user_id")),
+        extracted_text=extracted_text,
+        session=session,
+    )
+
+    # generate_summary records failures on the document instead of raising;
+    # surface them so the queue can retry
+    await session.refresh(document)
+    if document.status == "summary-failed":
+        raise RuntimeError(f"Summary generation failed for document {document_id}")
+
+
+async def handle_generate_quiz(payload: dict, session: AsyncSession) -> None:
+    """Generate the questions for a quiz created by the quiz endpoint."""
+    question_types = payload.get("question_types")
+    await generate_quiz(
+        document_id=UUID(payload["document_id"]),
+        user_id=_optional_uuid(payload.get("user_id")),
+        num_questions=payload["num_questions"],
+        question_types=[QuestionType(qt) for qt in question_types] if question_types else None,
+        session=session,
+        quiz_id=UUID(payload["quiz_id"]),
+    )
+
+
+JOB_HANDLERS: Dict[str, Callable[[dict, AsyncSession], Awaitable[None]]] = {
+    JOB_EXTRACT_TEXT: handle_extract_text,
+    JOB_GENERATE_SUMMARY: handle_generate_summary,
+    JOB_GENERATE_QUIZ: handle_generate_quiz,
+}
@@ -0,0 +1,175 @@
+# backend/app/services/jobs/queue.py
+"""
+Postgres-backed durable job queue.
+
+Jobs are rows in the `jobs` table. Producers add a job inside their own transaction,
+so a job exists if and only if the row that triggered it was committed. Workers claim
+jobs with `FOR UPDATE SKIP LOCKED` and hold a lease while running; a job whose lease
+expires (e.g. the worker crashed) becomes claimable again. Failed jobs are retried
+with exponential backoff and dead-lettered once max_attempts is reached.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.config import settings
+from app.db.models import Job
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Job types
+JOB_EXTRACT_TEXT = "extract_text"
+JOB_GENERATE_SUMMARY = "generate_summary"
+JOB_GENERATE_QUIZ = "generate_quiz"
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_DEAD = "dead"
+
+
+def enqueue_job(
+    session: AsyncSession,
+    job_type: str,
+    payload: dict,
+    max_attempts: Optional[int] = None,
+    run_after: Optional[datetime] = None,
+) -> Job:
+    """
+    Add a job to the session. The job is persisted by the caller's next commit,
+    so it is enqueued atomically with whatever else the caller is writing.
+    """
+    job = Job(
+        job_type=job_type,
+        payload=json.dumps(payload, default=str),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=run_after or datetime.utcnow(),
+    )
+    session.add(job)
+    logger.info(f"Enqueued {job_type} job {job.id}")
+    return job
+
+
+async def claim_jobs(
+    session: AsyncSession,
+    worker_id: str,
+    limit: int,
+    lease_seconds: Optional[int] = None,
+) -> List[Job]:
+    """
+    Claim up to `limit` runnable jobs for this worker and commit the lease.
+
+    Runnable jobs are queued jobs whose run_after has passed, and running jobs whose
+    lease has expired. Expired jobs that have used all their attempts are dead-lettered.
+    """
+    now = datetime.utcnow()
+    lease = timedelta(seconds=lease_seconds or settings.JOB_LEASE_SECONDS)
+
+    statement = (
+        select(Job)
+        .where(
+            or_(
+                and_(Job.status == JOB_QUEUED, Job.run_after <= now),
+                and_(Job.status == JOB_RUNNING, Job.lease_expires_at < now),
+            )
+        )
+        .order_by(Job.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(statement)
+    candidates = result.scalars().all()
+
+    claimed: List[Job] = []
+    for job in candidates:
+        if job.status == JOB_RUNNING and job.attempts >= job.max_attempts:
+            logger.error(f"Job {job.id} lease expired after {job.attempts} attempts; dead-lettering")
+            job.status = JOB_DEAD
+            job.last_error = f"Lease expired while held by {job.locked_by}"
+            job.locked_by = None
+            job.lease_expires_at = None
+            job.updated_at = now
+            continue
+
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.lease_expires_at = now + lease
+        job.updated_at = now
+        claimed.append(job)
+
+    await session.commit()
+    return claimed
+
+
+async def extend_lease(
+    session: AsyncSession,
+    job_id: UUID,
+    worker_id: str,
+    lease_seconds: Optional[int] = None,
+) -> bool:
+    """Extend the lease of a running job. Returns False if the worker no longer holds it."""
+    now = datetime.utcnow()
+    lease = timedelta(seconds=lease_seconds or settings.JOB_LEASE_SECONDS)
+    result = await session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == JOB_RUNNING)
+        .values(lease_expires_at=now + lease, updated_at=now)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+async def complete_job(session: AsyncSession, job_id: UUID, worker_id: str) -> None:
+    """Mark a job as succeeded and release its lease."""
+    now = datetime.utcnow()
+    await session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id)
+        .values(status=JOB_SUCCEEDED, locked_by=None, lease_expires_at=None, last_error=None, updated_at=now)
+    )
+    await session.commit()
+
+
+async def fail_job(
+    session: AsyncSession,
+    job_id: UUID,
+    worker_id: str,
+    error: str,
+    backoff_seconds: Optional[float] = None,
+) -> str:
+    """
+    Record a failed attempt. The job is re-queued with exponential backoff, or
+    dead-lettered if it has used all its attempts. Returns the new status.
+    """
+    job = await session.get(Job, job_id)
+    if not job or job.locked_by != worker_id:
+        logger.warning(f"Job {job_id} is no longer held by {worker_id}; not recording failure")
+        await session.rollback()
+        return job.status if job else JOB_DEAD
+
+    now = datetime.utcnow()
+    backoff = backoff_seconds if backoff_seconds is not None else settings.JOB_RETRY_BACKOFF_SECONDS
+    job.last_error = error[:2000]
+    job.locked_by = None
+    job.lease_expires_at = None
+    job.updated_at = now
+    if job.attempts >= job.max_attempts:
+        job.status = JOB_DEAD
+        logger.error(f"Job {job_id} ({job.job_type}) dead-lettered after {job.attempts} attempts: {error}")
+    else:
+        job.status = JOB_QUEUED
+        job.run_after = now + timedelta(seconds=backoff * (2 ** (job.attempts - 1)))
+        logger.warning(f"Job {job_id} ({job.job_type}) failed attempt {job.attempts}; retrying after {job.run_after}")
+    new_status = job.status
+    await session.commit()
+    return new_status
@@ -0,0 +1,135 @@
+# backend/app/services/jobs/worker.py
+"""
+Job worker: polls the jobs table, runs claimed jobs concurrently and keeps their
+leases alive while they run.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import traceback
+from typing import Awaitable, Callable, Dict, Optional, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.jobs.queue import claim_jobs, complete_job, extend_lease, fail_job
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict, AsyncSession], Awaitable[None]]
+
+
+class JobWorker:
+    """
+    Runs jobs from the durable queue with bounded concurrency.
+
+    Args:
+        session_factory: Callable returning a new AsyncSession (one per job and per poll).
+        handlers: Mapping of job_type to handler coroutine.
+        concurrency: Maximum number of jobs running at once.
+        lease_seconds: Lease length; renewed every third of the lease while a job runs.
+        poll_interval: Seconds to sleep when no job is available.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        handlers: Dict[str, JobHandler],
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOB_POLL_INTERVAL_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._running: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._slot_freed = asyncio.Event()
+
+    def stop(self) -> None:
+        """Ask the worker to stop claiming jobs; running jobs are allowed to finish."""
+        self._stopping.set()
+        self._slot_freed.set()
+
+    async def run(self) -> None:
+        """Poll and run jobs until stop() is called."""
+        logger.info(f"Job worker {self.worker_id} started with concurrency {self.concurrency}")
+        while not self._stopping.is_set():
+            free_slots = self.concurrency - len(self._running)
+            claimed = 0
+            if free_slots > 0:
+                try:
+                    claimed = await self.run_once(free_slots)
+                except Exception as e:
+                    logger.error(f"Job worker {self.worker_id} failed to claim jobs: {e}", exc_info=True)
+
+            # Poll again immediately if we filled every slot, otherwise wait for a free
+            # slot or the poll interval, whichever comes first
+            if claimed == 0 or len(self._running) >= self.concurrency:
+                self._slot_freed.clear()
+                try:
+                    await asyncio.wait_for(self._slot_freed.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        if self._running:
+            logger.info(f"Job worker {self.worker_id} waiting for {len(self._running)} running jobs")
+            await asyncio.gather(*self._running, return_exceptions=True)
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def run_once(self, limit: int) -> int:
+        """Claim up to `limit` jobs and start them. Returns the number of jobs started."""
+        async with self.session_factory() as session:
+            jobs = await claim_jobs(session, self.worker_id, limit, self.lease_seconds)
+            claimed = [(job.id, job.job_type, job.payload) for job in jobs]
+
+        for job_id, job_type, payload in claimed:
+            task = asyncio.create_task(self._execute(job_id, job_type, payload))
+            self._running.add(task)
+            task.add_done_callback(self._on_task_done)
+        return len(claimed)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._slot_freed.set()
+
+    async def _execute(self, job_id: UUID, job_type: str, payload: str) -> None:
+        handler = self.handlers.get(job_type)
+        heartbeat = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            if not handler:
+                raise LookupError(f"No handler registered for job type '{job_type}'")
+            logger.info(f"Running {job_type} job {job_id}")
+            async with self.session_factory() as session:
+                await handler(json.loads(payload), session)
+        except Exception as e:
+            logger.error(f"{job_type} job {job_id} failed: {e}", exc_info=True)
+            heartbeat.cancel()
+            async with self.session_factory() as session:
+                await fail_job(session, job_id, self.worker_id, f"{e}\n{traceback.format_exc()}")
+            return
+        finally:
+            heartbeat.cancel()
+
+        async with self.session_factory() as session:
+            await complete_job(session, job_id, self.worker_id)
+        logger.info(f"{job_type} job {job_id} succeeded")
+
+    async def _keep_lease(self, job_id: UUID) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as session:
+                    if not await extend_lease(session, job_id, self.worker_id, self.lease_seconds):
+                        logger.warning(f"Job worker {self.worker_id} lost the lease on job {job_id}")
+                        return
+            except Exception as e:
+                logger.error(f"Failed to extend lease on job {job_id}: {e}")
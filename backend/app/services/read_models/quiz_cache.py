@@ -0,0 +1,78 @@
+# backend/app/services/read_models/quiz_cache.py
+"""
+Read-through cache of serialized quiz responses for GET /quizzes/{quiz_id}.
+
+Quizzes do not change once they are "ready", so the fully serialized
+QuizWithQuestionsResponse JSON is cached by quiz id (in-process LRU plus an
+optional shared SQLite tier) together with the quiz owner, which the endpoint
+still checks on every request. Entries are invalidated when a quiz is
+(re)generated.
+"""
+
+import logging
+from typing import Optional, Tuple
+from uuid import UUID
+
+from app.core.cache import LRUCache, SQLiteCache, TieredCache
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Separates the owner id from the JSON body in a cached entry
+_OWNER_SEPARATOR = b"\n"
+
+
+def _build_quiz_cache() -> Optional[TieredCache]:
+    if not settings.QUIZ_CACHE_ENABLED:
+        return None
+    memory = LRUCache(
+        max_entries=settings.QUIZ_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.QUIZ_CACHE_TTL_SECONDS,
+        max_bytes=settings.QUIZ_CACHE_MAX_BYTES,
+    )
+    disk = None
+    if settings.QUIZ_CACHE_SQLITE_PATH:
+        disk = SQLiteCache(settings.QUIZ_CACHE_SQLITE_PATH, ttl_seconds=settings.QUIZ_CACHE_TTL_SECONDS)
+    return TieredCache(memory, disk)
+
+
+_quiz_cache: Optional[TieredCache] = _build_quiz_cache()
+
+
+def get_quiz_cache() -> Optional[TieredCache]:
+    return _quiz_cache
+
+
+def set_quiz_cache(cache: Optional[TieredCache]) -> None:
+    """Replace the quiz cache (None disables caching)."""
+    global _quiz_cache
+    _quiz_cache = cache
+
+
+def _cache_key(quiz_id: UUID) -> str:
+    return f"quiz:{quiz_id}"
+
+
+async def get_cached_quiz(quiz_id: UUID) -> Optional[Tuple[Optional[UUID], bytes]]:
+    """Returns (owner user id, serialized response) for a cached quiz, or None."""
+    if _quiz_cache is None:
+        return None
+    entry = await _quiz_cache.get(_cache_key(quiz_id))
+    if entry is None:
+        return None
+    owner, _, body = entry.partition(_OWNER_SEPARATOR)
+    return (UUID(owner.decode()) if owner else None), body
+
+
+async def cache_quiz(quiz_id: UUID, owner_id: Optional[UUID], body: bytes) -> None:
+    if _quiz_cache is None:
+        return
+    owner = str(owner_id).encode() if owner_id else b""
+    await _quiz_cache.set(_cache_key(quiz_id), owner + _OWNER_SEPARATOR + body)
+
+
+async def invalidate_quiz(quiz_id: UUID) -> None:
+    if _quiz_cache is None:
+        return
+    await _quiz_cache.delete(_cache_key(quiz_id))
@@ -0,0 +1,61 @@
+# backend/app/services/storage/backends.py
+"""
+Selects the storage backend for uploaded documents.
+
+STORAGE_BACKEND names an entry of STORAGE_BACKENDS. Handlers get the
+process-wide instance through the get_document_storage dependency, which
+tests override.
+"""
+
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+from app.services.storage.base import StorageBackend
+from app.services.storage.local_storage import build_local_storage
+from app.services.storage.supabase_storage import build_supabase_storage
+
+# Factory per STORAGE_BACKEND value
+STORAGE_BACKENDS: Dict[str, Callable[[], StorageBackend]] = {
+    "supabase": build_supabase_storage,
+    "local": build_local_storage,
+}
+
+
+def build_document_storage() -> StorageBackend:
+    """
+    Creates the backend configured by STORAGE_BACKEND.
+
+    Raises:
+        ValueError: If STORAGE_BACKEND is not a known backend.
+    """
+    factory = STORAGE_BACKENDS.get(settings.STORAGE_BACKEND)
+    if factory is None:
+        raise ValueError(
+            f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}'; "
+            f"expected one of: {', '.join(STORAGE_BACKENDS)}"
+        )
+    return factory()
+
+
+_document_storage: Optional[StorageBackend] = None
+
+
+def get_document_storage() -> StorageBackend:
+    """The process-wide storage backend for uploaded documents (a FastAPI dependency)."""
+    global _document_storage
+    if _document_storage is None:
+        _document_storage = build_document_storage()
+    return _document_storage
+
+
+def set_document_storage(storage: Optional[StorageBackend]) -> None:
+    global _document_storage
+    _document_storage = storage
+
+
+async def close_document_storage() -> None:
+    """Releases the resources of the shared storage backend."""
+    global _document_storage
+    storage, _document_storage = _document_storage, None
+    if storage is not None:
+        await storage.aclose()
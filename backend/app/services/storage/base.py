@@ -0,0 +1,73 @@
+# backend/app/services/storage/base.py
+"""
+Interface of the stores that hold uploaded document blobs.
+
+Implementations:
+- SupabaseStorage (supabase_storage.py): a Supabase Storage bucket over HTTP.
+- LocalStorage (local_storage.py): a directory on local disk, for self-hosted
+  single-node deployments and CI, with no network involved.
+
+The backend of a process is chosen with STORAGE_BACKEND (see backends.py).
+"""
+
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, BinaryIO, Optional
+
+
+class StorageError(Exception):
+    """Raised when the storage backend rejects a request."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StorageObjectNotFoundError(StorageError):
+    """Raised when the requested object does not exist."""
+
+
+class StorageBackend(ABC):
+    """Async blob store addressed by object path (e.g. "blobs/ab/abc123.pdf")."""
+
+    @abstractmethod
+    async def upload(self, path: str, file: BinaryIO, content_type: str, upsert: bool = True) -> None:
+        """
+        Stores the content of a seekable file at path.
+
+        Raises:
+            StorageError: If the object exists and upsert is False, or the write fails.
+        """
+
+    @abstractmethod
+    def iter_download(
+        self,
+        path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams an object (or the inclusive byte range start..end) in chunks.
+
+        Raises:
+            StorageObjectNotFoundError: If the object does not exist.
+        """
+
+    async def download(self, path: str) -> bytes:
+        """Reads a whole object into memory."""
+        return b"".join([chunk async for chunk in self.iter_download(path)])
+
+    async def read_range(self, path: str, start: int, end: int) -> bytes:
+        """Reads the inclusive byte range start..end of an object."""
+        return b"".join([chunk async for chunk in self.iter_download(path, start, end)])
+
+    def local_path(self, path: str) -> Optional[str]:
+        """
+        Filesystem path of an object, if this backend keeps it on local disk.
+
+        Lets text extraction memory-map the file instead of reading it into memory.
+        Returns None for remote backends or objects that do not exist.
+        """
+        return None
+
+    async def aclose(self) -> None:
+        """Releases connections or other resources held by the backend."""
@@ -0,0 +1,158 @@
+# backend/app/services/storage/content.py
+"""
+Compressed storage of extracted document text.
+
+Extracted text lives in the document_contents table, one compressed row per
+document, instead of on the documents row: status polling and ownership checks
+read a few hundred bytes, and only the generators that need the text load and
+decompress it.
+
+Text is compressed with zstd. The codec is stored per row, so rows written with
+zlib by earlier versions stay readable. Rows copied over by the migration are
+uncompressed (codec "none") until compressed by running this module:
+
+    python -m app.services.storage.content
+"""
+
+import asyncio
+import logging
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+import zstandard
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.db.models import DocumentContent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+
+# Texts larger than this are (de)compressed in a worker thread to keep the event loop responsive
+THREAD_THRESHOLD_BYTES = 1024 * 1024
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _zlib_compress(data: bytes) -> bytes:
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+# codec name -> (compress, decompress)
+CONTENT_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "none": (bytes, bytes),
+    "zlib": (_zlib_compress, zlib.decompress),
+    "zstd": (_zstd_compress, _zstd_decompress),
+}
+
+DEFAULT_CODEC = "zstd"
+
+
+def compress_text(text: str, codec: str = DEFAULT_CODEC) -> bytes:
+    compress, _ = CONTENT_CODECS[codec]
+    return compress(text.encode("utf-8"))
+
+
+def decompress_text(data: bytes, codec: str) -> str:
+    """
+    Raises:
+        ValueError: If the codec is not available in this process.
+    """
+    if codec not in CONTENT_CODECS:
+        raise ValueError(f"Unsupported content codec: {codec}")
+    _, decompress = CONTENT_CODECS[codec]
+    return decompress(data).decode("utf-8")
+
+
+async def _run(func, *args):
+    if sum(len(arg) for arg in args if isinstance(arg, (str, bytes))) > THREAD_THRESHOLD_BYTES:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+async def save_document_content(session: AsyncSession, document_id: UUID, text: str) -> DocumentContent:
+    """
+    Stores (or replaces) the extracted text of a document. The caller commits.
+    """
+    data = await _run(compress_text, text)
+    content = await session.get(DocumentContent, document_id)
+    if content is None:
+        content = DocumentContent(document_id=document_id, codec=DEFAULT_CODEC, data=data, text_length=len(text))
+    else:
+        content.codec = DEFAULT_CODEC
+        content.data = data
+        content.text_length = len(text)
+    session.add(content)
+    logger.info(
+        f"Stored extracted text for document {document_id}: "
+        f"{len(text)} characters in {len(data)} bytes ({DEFAULT_CODEC})"
+    )
+    return content
+
+
+async def load_document_content(session: AsyncSession, document_id: UUID) -> Optional[str]:
+    """Returns the extracted text of a document, or None if none has been stored."""
+    row = (
+        await session.execute(
+            select(DocumentContent.codec, DocumentContent.data).where(DocumentContent.document_id == document_id)
+        )
+    ).first()
+    if row is None:
+        return None
+    return await _run(decompress_text, row.data, row.codec)
+
+
+async def has_document_content(session: AsyncSession, document_id: UUID) -> bool:
+    """True if non-empty extracted text is stored for the document, without loading it."""
+    result = await session.execute(
+        select(DocumentContent.document_id).where(
+            DocumentContent.document_id == document_id,
+            DocumentContent.text_length > 0,
+        )
+    )
+    return result.first() is not None
+
+
+async def compress_stored_contents(session: AsyncSession, batch_size: int = 100) -> int:
+    """
+    Compresses up to batch_size rows stored uncompressed (codec "none") with the
+    default codec and commits.
+
+    Returns:
+        The number of rows compressed.
+    """
+    rows = (
+        await session.execute(
+            select(DocumentContent).where(DocumentContent.codec == "none").limit(batch_size)
+        )
+    ).scalars().all()
+    for row in rows:
+        row.data = await _run(compress_text, decompress_text(row.data, "none"))
+        row.codec = DEFAULT_CODEC
+        session.add(row)
+    await session.commit()
+    return len(rows)
+
+
+async def _compress_all() -> None:
+    from app.db.session import new_session
+
+    total = 0
+    async with new_session() as session:
+        while count := await compress_stored_contents(session):
+            total += count
+            logger.info(f"Compressed {total} document contents")
+
+
+if __name__ == "__main__":
+    asyncio.run(_compress_all())
@@ -0,0 +1,80 @@
+# backend/app/services/storage/dedup.py
+"""
+Content-addressed deduplication of uploads.
+
+Uploads are identified by the SHA-256 of their bytes (computed during ingest).
+Identical uploads share one stored blob, and the text extracted from it and the
+summary generated for it are reused instead of being produced again.
+"""
+
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.db.models import Document, DocumentContent, Summary
+from app.services.storage.content import decompress_text
+
+
+def blob_storage_path(content_hash: str, file_extension: str = "") -> str:
+    """Storage path of a content-addressed blob, sharded by the first two hash characters."""
+    return f"blobs/{content_hash[:2]}/{content_hash}{file_extension}"
+
+
+async def find_blob_path(session: AsyncSession, content_hash: str) -> Optional[str]:
+    """Returns the storage path of an already stored blob with this hash, if any."""
+    result = await session.execute(
+        select(Document.storage_path).where(Document.content_hash == content_hash).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def find_extracted_text_for_duplicate(session: AsyncSession, document_id: UUID) -> Optional[str]:
+    """Returns text already extracted from another document with the same content, if any."""
+    content_hash = (
+        await session.execute(select(Document.content_hash).where(Document.id == document_id))
+    ).scalar_one_or_none()
+    if not content_hash:
+        return None
+
+    row = (
+        await session.execute(
+            select(DocumentContent.codec, DocumentContent.data)
+            .join(Document, DocumentContent.document_id == Document.id)
+            .where(
+                Document.content_hash == content_hash,
+                Document.id != document_id,
+            )
+            .limit(1)
+        )
+    ).first()
+    if row is None:
+        return None
+    return decompress_text(row.data, row.codec)
+
+
+async def find_summary_for_duplicate(
+    session: AsyncSession,
+    document_id: UUID,
+    prompt_version: str,
+) -> Optional[Summary]:
+    """Returns a summary generated for another document with the same content and prompt version, if any."""
+    content_hash = (
+        await session.execute(select(Document.content_hash).where(Document.id == document_id))
+    ).scalar_one_or_none()
+    if not content_hash:
+        return None
+
+    result = await session.execute(
+        select(Summary)
+        .join(Document, Summary.document_id == Document.id)
+        .where(
+            Document.content_hash == content_hash,
+            Summary.document_id != document_id,
+            Summary.prompt_version == prompt_version,
+        )
+        .order_by(Summary.generated_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
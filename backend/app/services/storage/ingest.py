@@ -0,0 +1,147 @@
+# backend/app/services/storage/ingest.py
+"""
+Streaming ingest for uploaded files.
+
+Reads an UploadFile in bounded chunks, enforcing the size limit as bytes arrive,
+hashing and sniffing the content on the fly, and spooling the chunks to a temporary
+file that can be handed to storage as a stream. Per-request memory stays at roughly
+one chunk regardless of the file size.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024  # 64 KiB per read
+SNIFF_BYTES = 4096  # Bytes inspected to guess the real content type
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT_MIME = "text/plain"
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class IngestedUpload:
+    """Result of streaming an upload to a temporary spool file."""
+    spool_path: str
+    size: int
+    sha256: str
+    sniffed_content_type: Optional[str]
+
+    def open(self) -> BinaryIO:
+        """Open the spooled content for streaming reads."""
+        return open(self.spool_path, "rb")
+
+    def cleanup(self) -> None:
+        """Remove the temporary spool file."""
+        try:
+            os.remove(self.spool_path)
+        except FileNotFoundError:
+            pass
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """
+    Guess the content type from the first bytes of a file.
+
+    Anything that is neither a PDF nor a zip container and contains no NUL bytes
+    counts as text, whatever its encoding (legacy .txt files are often not UTF-8).
+    Returns None if the content does not look like any supported type.
+    """
+    if head.startswith(b"%PDF-"):
+        return PDF_MIME
+    if head.startswith(b"PK\x03\x04"):
+        # .docx files are zip containers
+        return DOCX_MIME
+    if b"\x00" in head:
+        return None
+    return TEXT_MIME
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """Media type of a Content-Type value without parameters ("text/plain; charset=utf-8" -> "text/plain")."""
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def matches_declared_type(declared_media_type: str, ingested: IngestedUpload) -> bool:
+    """
+    Whether the ingested content fits the media type the client declared.
+
+    PDF and DOCX uploads must start with their magic bytes; text is accepted
+    unless it looks binary, and an empty text file is accepted as is.
+    """
+    if declared_media_type == TEXT_MIME:
+        return ingested.size == 0 or ingested.sniffed_content_type == TEXT_MIME
+    return ingested.sniffed_content_type == declared_media_type
+
+
+async def ingest_upload(
+    file: UploadFile,
+    max_bytes: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> IngestedUpload:
+    """
+    Stream an uploaded file to a temporary spool file in bounded chunks.
+
+    Chunks are written to the spool file in a worker thread, so a slow disk
+    never blocks the event loop.
+
+    Args:
+        file: The incoming upload.
+        max_bytes: Maximum accepted size; checked after every chunk.
+        chunk_size: Number of bytes read per iteration.
+
+    Returns:
+        An IngestedUpload describing the spooled content. The caller must call cleanup().
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+
+    fd, spool_path = tempfile.mkstemp(prefix="upload-")
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                digest.update(chunk)
+                await asyncio.to_thread(spool.write, chunk)
+    except BaseException:
+        try:
+            os.remove(spool_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return IngestedUpload(
+        spool_path=spool_path,
+        size=size,
+        sha256=digest.hexdigest(),
+        sniffed_content_type=sniff_content_type(head) if size else None,
+    )
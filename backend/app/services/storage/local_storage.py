@@ -0,0 +1,113 @@
+# backend/app/services/storage/local_storage.py
+"""
+Document blobs on local disk.
+
+Objects live under STORAGE_LOCAL_ROOT at their object path. Blob paths are
+already sharded by hash prefix (blobs/ab/abc123.pdf, see dedup.py), so no single
+directory grows unbounded.
+
+Writes are atomic: content goes to a temporary file in the target directory,
+is fsynced and then renamed over the final name, so readers never see a
+partial blob and concurrent uploads of the same content are harmless.
+local_path() exposes the file so text extraction can memory-map it instead of
+copying it through the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator, BinaryIO, Optional
+
+from app.core.config import settings
+from app.services.storage.base import StorageBackend, StorageError, StorageObjectNotFoundError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB per read; local reads are cheap
+
+
+class LocalStorage(StorageBackend):
+    """Stores objects as files below a root directory."""
+
+    def __init__(self, root: str, chunk_size: int = CHUNK_SIZE):
+        self.root = os.path.abspath(root)
+        self.chunk_size = chunk_size
+
+    def resolve(self, path: str) -> str:
+        """
+        Filesystem path of an object.
+
+        Raises:
+            StorageError: If the path escapes the storage root.
+        """
+        full_path = os.path.abspath(os.path.join(self.root, path.lstrip("/")))
+        if os.path.commonpath([self.root, full_path]) != self.root or full_path == self.root:
+            raise StorageError(f"Invalid storage path: {path}", 400)
+        return full_path
+
+    def _write(self, full_path: str, file: BinaryIO, upsert: bool) -> None:
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                file.seek(0)
+                shutil.copyfileobj(file, tmp, self.chunk_size)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            if upsert:
+                os.replace(tmp_path, full_path)
+            else:
+                # link() fails if the target exists, unlike rename()
+                try:
+                    os.link(tmp_path, full_path)
+                except FileExistsError:
+                    raise StorageError(f"Storage object already exists: {full_path}", 409)
+                os.remove(tmp_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    async def upload(self, path: str, file: BinaryIO, content_type: str, upsert: bool = True) -> None:
+        """Atomically writes the file to path; see StorageBackend.upload."""
+        await asyncio.to_thread(self._write, self.resolve(path), file, upsert)
+
+    def _read(self, full_path: str, offset: int, size: int) -> bytes:
+        with open(full_path, "rb") as f:
+            f.seek(offset)
+            return f.read(size)
+
+    async def iter_download(
+        self,
+        path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Streams an object (or the inclusive byte range start..end) in chunks."""
+        full_path = self.resolve(path)
+        try:
+            file_size = os.path.getsize(full_path)
+        except FileNotFoundError:
+            raise StorageObjectNotFoundError(f"Storage object not found: {path}", 404)
+        offset = start or 0
+        stop = file_size if end is None else min(end + 1, file_size)
+        while offset < stop:
+            chunk = await asyncio.to_thread(self._read, full_path, offset, min(self.chunk_size, stop - offset))
+            if not chunk:
+                return
+            offset += len(chunk)
+            yield chunk
+
+    def local_path(self, path: str) -> Optional[str]:
+        full_path = self.resolve(path)
+        return full_path if os.path.isfile(full_path) else None
+
+
+def build_local_storage() -> LocalStorage:
+    return LocalStorage(settings.STORAGE_LOCAL_ROOT)
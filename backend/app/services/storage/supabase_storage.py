@@ -0,0 +1,206 @@
+# backend/app/services/storage/supabase_storage.py
+"""
+Async client for Supabase Storage.
+
+The supabase-py storage API is synchronous, so calling it from a request handler
+blocks the event loop for the whole transfer. SupabaseStorage talks to the
+Storage REST API with a pooled httpx.AsyncClient instead:
+
+- upload() streams a file in chunks (the file is read off the event loop);
+- iter_download() streams an object, optionally only a byte range;
+- transient failures (connection errors, 429 and 5xx responses) are retried
+  with jittered exponential backoff before any data reaches the caller.
+
+It is the default StorageBackend (see backends.py).
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, BinaryIO, Optional
+from urllib.parse import quote
+
+import httpx
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.storage.base import StorageBackend, StorageError, StorageObjectNotFoundError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024  # 64 KiB per read, matching the upload ingest
+
+
+class RetryableStorageError(StorageError):
+    """A response worth retrying (rate limited or a server-side failure)."""
+
+
+RETRYABLE_ERRORS = (httpx.TransportError, RetryableStorageError)
+
+
+def _is_not_found(response: httpx.Response) -> bool:
+    if response.status_code == 404:
+        return True
+    # Older Storage API versions answer 400 with the real status in the body
+    if response.status_code == 400:
+        try:
+            return str(response.json().get("statusCode")) == "404"
+        except ValueError:
+            return False
+    return False
+
+
+def _log_retry(retry_state) -> None:
+    metrics.increment("storage.retries")
+    logger.info(
+        f"Retrying storage request after {retry_state.outcome.exception()!r}: "
+        f"attempt {retry_state.attempt_number}..."
+    )
+
+
+class SupabaseStorage(StorageBackend):
+    """Streaming uploads and downloads against one Supabase Storage bucket."""
+
+    def __init__(
+        self,
+        base_url: str,
+        service_key: str,
+        bucket: str,
+        client: Optional[httpx.AsyncClient] = None,
+        chunk_size: int = CHUNK_SIZE,
+        retry_attempts: int = 3,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.retry_attempts = retry_attempts
+        self._headers = {"Authorization": f"Bearer {service_key}", "apikey": service_key}
+        self._client = client or httpx.AsyncClient()
+
+    def object_url(self, path: str) -> str:
+        return f"{self.base_url}/storage/v1/object/{quote(self.bucket)}/{quote(path.lstrip('/'))}"
+
+    def _retrying(self) -> AsyncRetrying:
+        return AsyncRetrying(
+            retry=retry_if_exception_type(RETRYABLE_ERRORS),
+            wait=wait_random_exponential(
+                multiplier=settings.STORAGE_RETRY_BASE_SECONDS,
+                max=settings.STORAGE_RETRY_MAX_WAIT_SECONDS,
+            ),
+            stop=stop_after_attempt(self.retry_attempts),
+            before_sleep=_log_retry,
+            reraise=True,
+        )
+
+    @staticmethod
+    async def _raise_for_status(response: httpx.Response, path: str) -> None:
+        if response.status_code < 400:
+            return
+        await response.aread()
+        await response.aclose()
+        if _is_not_found(response):
+            raise StorageObjectNotFoundError(f"Storage object not found: {path}", 404)
+        error = RetryableStorageError if response.status_code == 429 or response.status_code >= 500 else StorageError
+        raise error(f"Storage request for {path} failed ({response.status_code}): {response.text}", response.status_code)
+
+    async def _read_chunks(self, file: BinaryIO) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await asyncio.to_thread(file.read, self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    async def upload(self, path: str, file: BinaryIO, content_type: str, upsert: bool = True) -> None:
+        """
+        Streams a seekable file to path in the bucket.
+
+        Args:
+            path: Object path within the bucket.
+            file: Binary file positioned anywhere; it is rewound for every attempt.
+            content_type: MIME type stored with the object.
+            upsert: Overwrite an existing object instead of failing.
+
+        Raises:
+            StorageError: If the upload is rejected or keeps failing.
+        """
+        headers = {**self._headers, "Content-Type": content_type, "x-upsert": "true" if upsert else "false"}
+        started = time.perf_counter()
+        async for attempt in self._retrying():
+            with attempt:
+                await asyncio.to_thread(file.seek, 0)
+                response = await self._client.send(
+                    self._client.build_request("POST", self.object_url(path), headers=headers, content=self._read_chunks(file)),
+                    stream=True,
+                )
+                await self._raise_for_status(response, path)
+                await response.aclose()
+        metrics.observe("storage.upload_seconds", time.perf_counter() - started)
+
+    async def _open(self, path: str, start: Optional[int], end: Optional[int]) -> httpx.Response:
+        headers = dict(self._headers)
+        if start is not None or end is not None:
+            headers["Range"] = f"bytes={start or 0}-{'' if end is None else end}"
+        async for attempt in self._retrying():
+            with attempt:
+                response = await self._client.send(
+                    self._client.build_request("GET", self.object_url(path), headers=headers),
+                    stream=True,
+                )
+                await self._raise_for_status(response, path)
+        return response
+
+    async def iter_download(
+        self,
+        path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams an object (or the inclusive byte range start..end) in chunks.
+
+        Opening the stream is retried; a connection lost mid-stream is raised to the caller.
+
+        Raises:
+            StorageObjectNotFoundError: If the object does not exist.
+            StorageError: If the download is rejected or keeps failing.
+        """
+        response = await self._open(path, start, end)
+        try:
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                metrics.increment("storage.bytes_downloaded", len(chunk))
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def download(self, path: str) -> bytes:
+        """Downloads a whole object into memory; see iter_download."""
+        started = time.perf_counter()
+        content = await super().download(path)
+        metrics.observe("storage.download_seconds", time.perf_counter() - started)
+        return content
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def build_supabase_storage() -> SupabaseStorage:
+    client = httpx.AsyncClient(
+        http2=True,
+        timeout=settings.STORAGE_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.STORAGE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.STORAGE_MAX_CONNECTIONS,
+            keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+    return SupabaseStorage(
+        base_url=settings.SUPABASE_URL,
+        # Strip whitespace that might be in .env
+        service_key=settings.SUPABASE_SERVICE_ROLE_KEY.strip(),
+        bucket=settings.STORAGE_BUCKET,
+        client=client,
+        retry_attempts=settings.STORAGE_RETRY_ATTEMPTS,
+    )
+
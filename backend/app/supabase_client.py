@@ -1,23 +1,91 @@
+# backend/app/supabase_client.py
+"""
+Supabase clients.
+
+All clients of a process share one pooled, keep-alive HTTP connection pool.
+
+- get_supabase_admin_client(): process-wide service-role client (storage, admin
+  table access). It never signs in, so it holds no per-user state.
+- get_supabase_anon_client(): process-wide anon client for stateless calls
+  (health checks, looking up a user by token).
+- get_supabase_client(): a new anon client per request, for auth flows (sign-up,
+  sign-in, password reset) that store a user session on the client. Only the
+  session state is per request; connections come from the shared pool.
+"""
+
+import threading
+from typing import Optional
+
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
+
 from app.core.config import settings
 
-def get_supabase_client() -> Client:
-    # Use settings from config.py
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_admin_client: Optional[Client] = None
+_anon_client: Optional[Client] = None
+
+
+def get_http_client() -> httpx.Client:
+    """The process-wide HTTP connection pool used by every Supabase client."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                http2=True,
+                follow_redirects=True,
+                timeout=settings.SUPABASE_HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+        return _http_client
+
+
+def _create_client(key: str) -> Client:
     url: str = settings.SUPABASE_URL
-    key: str = settings.SUPABASE_ANON_KEY
-    
     if not url or not key:
         # This check is redundant if settings are properly loaded via Pydantic,
         # but kept as a safeguard. Pydantic's BaseSettings would raise an error
         # during initialization if these were missing.
         raise ValueError("Supabase credentials not found in environment variables.")
-        
-    return create_client(url, key)
+    options = SyncClientOptions(
+        # Sessions live on the client only for the duration of one request
+        auto_refresh_token=False,
+        persist_session=False,
+        httpx_client=get_http_client(),
+    )
+    return create_client(url, key, options=options)
+
+
+def get_supabase_client() -> Client:
+    """
+    Get a new anon Supabase client for one request.
+
+    Use it for auth flows that sign a user in; anything else should use the
+    shared clients.
+    """
+    return _create_client(settings.SUPABASE_ANON_KEY)
+
+
+def get_supabase_anon_client() -> Client:
+    """Get the shared anon Supabase client (stateless calls only; never sign in with it)."""
+    global _anon_client
+    if _anon_client is None:
+        client = _create_client(settings.SUPABASE_ANON_KEY)
+        with _lock:
+            if _anon_client is None:
+                _anon_client = client
+    return _anon_client
 
 
 def get_supabase_admin_client() -> Client:
     """
-    Get a Supabase client with admin (service role) credentials.
+    Get the shared Supabase client with admin (service role) credentials.
     Used for operations that require elevated privileges (like file uploads to storage).
     
     Uses the SERVICE_ROLE_KEY which has full permissions regardless of RLS policies.
@@ -25,19 +93,35 @@ def get_supabase_admin_client() -> Client:
     Note: This returns a synchronous client which is fine for FastAPI dependencies.
     The Supabase Python SDK's storage operations will work with async endpoints.
     """
-    url: str = settings.SUPABASE_URL
-    # Use SERVICE_ROLE_KEY for admin operations (bypasses RLS)
-    key: str = settings.SUPABASE_SERVICE_ROLE_KEY.strip()  # Strip whitespace that might be in .env
-    
-    if not url or not key:
-        raise ValueError("Supabase admin credentials not found in environment variables.")
-    
-    return create_client(url, key)
+    global _admin_client
+    if _admin_client is None:
+        # Strip whitespace that might be in .env
+        client = _create_client(settings.SUPABASE_SERVICE_ROLE_KEY.strip())
+        with _lock:
+            if _admin_client is None:
+                _admin_client = client
+    return _admin_client
+
+
+def init_supabase_clients() -> None:
+    """Creates the shared clients up front (at startup) instead of on the first request."""
+    get_supabase_admin_client()
+    get_supabase_anon_client()
+
+
+def close_supabase_clients() -> None:
+    """Drops the shared clients and closes the pooled connections."""
+    global _http_client, _admin_client, _anon_client
+    with _lock:
+        http_client, _http_client = _http_client, None
+        _admin_client = _anon_client = None
+    if http_client is not None:
+        http_client.close()
 
 
 def check_supabase_connection():
     try:
-        client = get_supabase_client()
+        client = get_supabase_anon_client()
         # The client is created, but to truly check the connection,
         # we need to make a request. We can try to list tables.
         # This will fail if the credentials are wrong.
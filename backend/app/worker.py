@@ -0,0 +1,62 @@
+# backend/app/worker.py
+"""
+Standalone job worker entry point.
+
+Run from the `backend` directory:
+
+    python -m app.worker --concurrency 4
+
+Set WORKER_IN_PROCESS=false on the web processes when dedicated workers are running.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.core.config import settings
+from app.db.session import new_session
+from app.services.jobs.handlers import JOB_HANDLERS
+from app.services.jobs.worker import JobWorker
+from app.services.ai_generation.extraction_pool import shutdown_extraction_pool
+from app.services.ai_generation.gemini_client import shutdown_gemini_executor
+from app.services.storage.backends import close_document_storage
+from app.supabase_client import close_supabase_clients
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def main(concurrency: int) -> None:
+    worker = JobWorker(session_factory=new_session, handlers=JOB_HANDLERS, concurrency=concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Signal handlers are not available on Windows event loops
+            pass
+
+    try:
+        await worker.run()
+    finally:
+        shutdown_extraction_pool()
+        shutdown_gemini_executor()
+        close_supabase_clients()
+        await close_document_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the background job worker.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.WORKER_CONCURRENCY,
+        help="Maximum number of jobs processed at once",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
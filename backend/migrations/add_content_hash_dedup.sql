@@ -0,0 +1,8 @@
+-- Migration: Content-addressed deduplication of uploads
+-- Identical uploads share one stored blob (blobs/<sha256 prefix>/<sha256>) and
+-- reuse extracted text and summaries generated with the same prompt version.
+
+ALTER TABLE public.documents ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE public.summaries ADD COLUMN IF NOT EXISTS prompt_version TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON public.documents(content_hash);
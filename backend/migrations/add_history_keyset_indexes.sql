@@ -0,0 +1,9 @@
+-- Migration: Indexes for keyset (cursor) pagination of history feeds
+-- History pages are read as "rows of this user after (timestamp, id), newest first";
+-- these indexes serve each page with a bounded index range scan at any depth.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_summaries_user_history
+    ON public.summaries (user_id, generated_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quizzes_user_history
+    ON public.quizzes (user_id, created_at DESC, id DESC);
@@ -0,0 +1,5 @@
+-- Migration: Precomputed short-answer keys
+-- Stores the normalized forms (text, stemmed content words, canonical numbers) a
+-- short answer is graded against. NULL keys are rebuilt when grading.
+
+ALTER TABLE public.questions ADD COLUMN IF NOT EXISTS answer_key TEXT;
@@ -0,0 +1,25 @@
+-- Migration: Stored summary previews for history lists
+-- History pages show the first 200 characters of each summary. Storing them (plus
+-- one character, to tell whether the text was cut) lets list queries skip the
+-- full summary text. Rows left NULL fall back to left(summary_text, 201) on read.
+
+ALTER TABLE public.summaries ADD COLUMN IF NOT EXISTS summary_preview TEXT;
+
+-- Backfill in batches to keep locks and WAL bursts short
+DO $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    LOOP
+        UPDATE public.summaries
+        SET summary_preview = left(summary_text, 201)
+        WHERE id IN (
+            SELECT id FROM public.summaries
+            WHERE summary_preview IS NULL
+            LIMIT 5000
+        );
+        GET DIAGNOSTICS updated = ROW_COUNT;
+        EXIT WHEN updated = 0;
+        COMMIT;
+    END LOOP;
+END $$;
@@ -0,0 +1,29 @@
+-- Migration: Create jobs table for the durable background job queue
+-- Replaces FastAPI BackgroundTasks for text extraction, summary and quiz generation
+
+CREATE TABLE IF NOT EXISTS public.jobs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT now(),
+    locked_by TEXT,
+    lease_expires_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Workers claim with: WHERE status = 'queued' AND run_after <= now() ... FOR UPDATE SKIP LOCKED
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON public.jobs(status, run_after);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease_expires_at ON public.jobs(lease_expires_at) WHERE status = 'running';
+
+-- Jobs are only touched by the backend (service role)
+ALTER TABLE public.jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role can manage jobs" ON public.jobs;
+CREATE POLICY "Service role can manage jobs" ON public.jobs
+    FOR ALL
+    USING (auth.role() = 'service_role');
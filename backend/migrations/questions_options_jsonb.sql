@@ -0,0 +1,63 @@
+-- Migration: Store question options and answer keys as JSONB
+-- questions.options and questions.answer_key held json.dumps() output in TEXT
+-- columns. They become JSONB so the driver returns decoded values and
+-- Postgres can index and query them.
+--
+-- Run the steps in order. Steps 1-3 are safe while the previous release is
+-- serving traffic. Step 4 renames the columns and must be run together with the
+-- deploy of the release that reads JSONB.
+
+-- 1. Shadow columns, kept in sync with writes from the previous release
+ALTER TABLE public.questions ADD COLUMN IF NOT EXISTS options_jsonb JSONB;
+ALTER TABLE public.questions ADD COLUMN IF NOT EXISTS answer_key_jsonb JSONB;
+
+CREATE OR REPLACE FUNCTION public.questions_sync_jsonb() RETURNS trigger AS $$
+BEGIN
+    NEW.options_jsonb := NEW.options::jsonb;
+    NEW.answer_key_jsonb := NEW.answer_key::jsonb;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS questions_sync_jsonb ON public.questions;
+CREATE TRIGGER questions_sync_jsonb
+    BEFORE INSERT OR UPDATE OF options, answer_key ON public.questions
+    FOR EACH ROW EXECUTE FUNCTION public.questions_sync_jsonb();
+
+-- 2. Backfill existing rows in batches, committing after each batch so locks stay short
+--    (run outside an explicit transaction block)
+DO $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    LOOP
+        UPDATE public.questions
+        SET options_jsonb = options::jsonb,
+            answer_key_jsonb = answer_key::jsonb
+        WHERE id IN (
+            SELECT id FROM public.questions
+            WHERE (options IS NOT NULL AND options_jsonb IS NULL)
+               OR (answer_key IS NOT NULL AND answer_key_jsonb IS NULL)
+            LIMIT 5000
+        );
+        GET DIAGNOSTICS updated = ROW_COUNT;
+        EXIT WHEN updated = 0;
+        COMMIT;
+    END LOOP;
+END;
+$$;
+
+-- 3. Verify: must return 0
+SELECT COUNT(*) FROM public.questions
+WHERE (options IS NOT NULL AND options_jsonb IS NULL)
+   OR (answer_key IS NOT NULL AND answer_key_jsonb IS NULL);
+
+-- 4. Swap the columns (brief lock; deploy the JSONB release at the same time)
+BEGIN;
+DROP TRIGGER IF EXISTS questions_sync_jsonb ON public.questions;
+DROP FUNCTION IF EXISTS public.questions_sync_jsonb();
+ALTER TABLE public.questions DROP COLUMN options;
+ALTER TABLE public.questions DROP COLUMN answer_key;
+ALTER TABLE public.questions RENAME COLUMN options_jsonb TO options;
+ALTER TABLE public.questions RENAME COLUMN answer_key_jsonb TO answer_key;
+COMMIT;
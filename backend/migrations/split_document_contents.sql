@@ -0,0 +1,28 @@
+-- Migration: Move extracted text out of the documents table
+-- Extracted text is stored compressed (zstd) in document_contents and only
+-- loaded by the generators, so reads of documents (status polling, ownership
+-- checks) no longer carry the full text.
+--
+-- 1. Create the table and copy existing text uncompressed (codec 'none').
+-- 2. Deploy the application.
+-- 3. Compress the copied rows: python -m app.services.storage.content
+-- 4. Drop documents.raw_content (last statement below, run separately).
+
+CREATE TABLE IF NOT EXISTS public.document_contents (
+    document_id UUID PRIMARY KEY REFERENCES public.documents(id) ON DELETE CASCADE,
+    codec TEXT NOT NULL,
+    data BYTEA NOT NULL,
+    text_length INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.document_contents ENABLE ROW LEVEL SECURITY;
+
+INSERT INTO public.document_contents (document_id, codec, data, text_length)
+SELECT id, 'none', convert_to(raw_content, 'UTF8'), char_length(raw_content)
+FROM public.documents
+WHERE raw_content IS NOT NULL
+ON CONFLICT (document_id) DO NOTHING;
+
+-- After step 3:
+-- ALTER TABLE public.documents DROP COLUMN raw_content;
@@ -1,16 +1,33 @@
 # backend/tests/services/test_ai_generation.py
 
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
-import tenacity
-from tenacity import RetryError
+from google.api_core import exceptions as google_exceptions
 
-from app.services.ai_generation.gemini_client import call_gemini_summarize
+from app.services.ai_generation.gemini_client import (
+    call_gemini_summarize, call_gemini_quiz, get_response_cache, clear_model_registry, set_governor,
+)
+from app.services.ai_generation.rate_limiter import GeminiGovernor, CircuitOpenError, build_governor
 from app.core.config import settings
 
 # Mark all tests in this file as async
 pytestmark = pytest.mark.asyncio
 
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Each test starts with an empty LLM response cache and model registry."""
+    cache = get_response_cache()
+    if cache:
+        cache.clear()
+    clear_model_registry()
+    set_governor(build_governor())
+    yield
+    if cache:
+        cache.clear()
+    clear_model_registry()
+
 @patch('app.services.ai_generation.gemini_client.genai')
 async def test_call_gemini_summarize_success(mock_genai):
     """
@@ -37,7 +54,7 @@ async def test_call_gemini_summarize_success(mock_genai):
 @patch('app.services.ai_generation.gemini_client.genai')
 async def test_call_gemini_summarize_api_error(mock_genai):
     """
-    Test that the retry mechanism is triggered on API error.
+    Test that non-retryable API errors fail at once instead of being retried.
     """
     # Arrange
     mock_model = MagicMock()
@@ -46,8 +63,81 @@ async def test_call_gemini_summarize_api_error(mock_genai):
     mock_genai.GenerativeModel.return_value = mock_model
     
     # Act & Assert
-    with pytest.raises(tenacity.RetryError):
+    with pytest.raises(Exception, match="API Error"):
         await call_gemini_summarize("prompt", "text")
+    assert mock_model.generate_content.call_count == 1
+
+@patch('app.services.ai_generation.gemini_client.genai')
+async def test_call_gemini_summarize_retries_retryable_errors(mock_genai, monkeypatch):
+    """
+    Test that rate limit and availability errors are retried.
+    """
+    monkeypatch.setattr(settings, "GEMINI_RETRY_BASE_SECONDS", 0)
+    mock_model = MagicMock()
+    mock_model.generate_content.side_effect = [
+        google_exceptions.TooManyRequests("quota"),
+        google_exceptions.ServiceUnavailable("down"),
+        MagicMock(text="Recovered summary."),
+    ]
+    mock_genai.GenerativeModel.return_value = mock_model
+
+    assert await call_gemini_summarize("prompt", "text") == "Recovered summary."
+    assert mock_model.generate_content.call_count == 3
+
+@patch('app.services.ai_generation.gemini_client.genai')
+async def test_circuit_breaker_fails_fast_when_upstream_is_down(mock_genai, monkeypatch):
+    """
+    Test that repeated upstream failures open the circuit and later calls skip the API.
+    """
+    monkeypatch.setattr(settings, "GEMINI_RETRY_ATTEMPTS", 1)
+    set_governor(GeminiGovernor(
+        requests_per_minute=600, tokens_per_minute=10_000_000, max_in_flight=4,
+        failure_threshold=2, reset_seconds=60,
+    ))
+    mock_model = MagicMock()
+    mock_model.generate_content.side_effect = google_exceptions.ServiceUnavailable("down")
+    mock_genai.GenerativeModel.return_value = mock_model
+
+    for _ in range(2):
+        with pytest.raises(google_exceptions.ServiceUnavailable):
+            await call_gemini_summarize("prompt", "text")
+    with pytest.raises(CircuitOpenError):
+        await call_gemini_quiz("quiz prompt")
+    assert mock_model.generate_content.call_count == 2
+
+@patch('app.services.ai_generation.gemini_client.genai')
+async def test_call_gemini_summarize_uses_response_cache(mock_genai):
+    """
+    Test that identical requests are served from the response cache.
+    """
+    mock_model = MagicMock()
+    mock_model.generate_content = MagicMock(return_value=MagicMock(text="Cached summary."))
+    mock_genai.GenerativeModel.return_value = mock_model
+
+    first = await call_gemini_summarize("prompt", "text", prompt_version="1")
+    second = await call_gemini_summarize("prompt", "text", prompt_version="1")
+
+    assert first == second == "Cached summary."
+    assert mock_model.generate_content.call_count == 1
+    assert get_response_cache().stats()["memory"]["hits"] == 1
+
+    # A different prompt version, or opting out, goes to the API again
+    await call_gemini_summarize("prompt", "text", prompt_version="2")
+    await call_gemini_summarize("prompt", "text", prompt_version="1", use_cache=False)
+    assert mock_model.generate_content.call_count == 3
+
+@patch('app.services.ai_generation.gemini_client.genai')
+async def test_call_gemini_quiz_does_not_cache_empty_responses(mock_genai):
+    """
+    Test that empty responses are not cached.
+    """
+    mock_model = MagicMock()
+    mock_model.generate_content = MagicMock(return_value=MagicMock(text=""))
+    mock_genai.GenerativeModel.return_value = mock_model
+
+    assert await call_gemini_quiz("quiz prompt") == ""
+    assert await call_gemini_quiz("quiz prompt") == ""
+    assert mock_model.generate_content.call_count == 2
 
 @patch('app.services.ai_generation.gemini_client.genai', None)
 async def test_call_gemini_summarize_no_client():
@@ -55,10 +145,8 @@ async def test_call_gemini_summarize_no_client():
     Test behavior when Gemini client is not configured.
     """
     # Act & Assert
-    with pytest.raises(tenacity.RetryError) as excinfo:
+    with pytest.raises(ConnectionError, match="Gemini API client is not configured"):
         await call_gemini_summarize("prompt", "text")
-    assert "ConnectionError" in str(excinfo.value)
-    assert "Gemini API client is not configured" in str(excinfo.value.last_attempt.exception())
 
 from uuid import uuid4
 from app.db.models import Document, Summary
@@ -119,3 +207,140 @@ async def test_generate_summary_gemini_fails(mock_call_gemini):
     assert mock_doc.status == "summary-failed"
     mock_session.add.call_count == 2 # one for summarizing, one for summary-failed
     mock_session.commit.call_count == 2 # one for summarizing, one for summary-failed
+
+from app.services.ai_generation.summary_generator import IncrementalSummarizer, summarize_text, SUMMARY_CHUNK_PROMPT, SUMMARY_REDUCE_PROMPT
+
+@patch('app.services.ai_generation.summary_generator.call_gemini_summarize', new_callable=AsyncMock)
+async def test_summarize_text_short_text_single_call(mock_call_gemini):
+    """
+    Test that text fitting in one chunk is summarized with a single call.
+    """
+    mock_call_gemini.return_value = "Short summary."
+
+    assert await summarize_text("A short document.") == "Short summary."
+    assert mock_call_gemini.await_count == 1
+
+@patch('app.services.ai_generation.summary_generator.call_gemini_summarize', new_callable=AsyncMock)
+async def test_summarize_text_map_reduce(mock_call_gemini, monkeypatch):
+    """
+    Test that long text is summarized per chunk and the partial summaries combined in order.
+    """
+    monkeypatch.setattr(settings, "SUMMARY_CHUNK_TOKENS", 10)
+    monkeypatch.setattr(settings, "SUMMARY_TOKEN_BUDGET", 1000)
+
+    async def fake_summarize(prompt, text, prompt_version=None):
+        if prompt == SUMMARY_CHUNK_PROMPT:
+            return text.split()[0]
+        return "final: " + " ".join(text.split())
+    mock_call_gemini.side_effect = fake_summarize
+
+    pages = [f"page{i} " + "word " * 6 for i in range(3)]
+    summary = await summarize_text("\f".join(pages))
+
+    assert summary == "final: page0 page1 page2"
+    prompts = [call.kwargs["prompt"] for call in mock_call_gemini.await_args_list]
+    assert prompts.count(SUMMARY_CHUNK_PROMPT) == 3
+    assert prompts[-1] == SUMMARY_REDUCE_PROMPT
+
+@patch('app.services.ai_generation.summary_generator.call_gemini_summarize', new_callable=AsyncMock)
+async def test_summarize_text_respects_token_budget(mock_call_gemini, monkeypatch):
+    """
+    Test that sections beyond the token budget are not sent to the API.
+    """
+    monkeypatch.setattr(settings, "SUMMARY_CHUNK_TOKENS", 10)
+    monkeypatch.setattr(settings, "SUMMARY_TOKEN_BUDGET", 20)
+    mock_call_gemini.return_value = "partial"
+
+    pages = ["x" * 36 for _ in range(5)]
+    await summarize_text("\f".join(pages))
+
+    prompts = [call.kwargs["prompt"] for call in mock_call_gemini.await_args_list]
+    assert prompts.count(SUMMARY_CHUNK_PROMPT) == 2
+
+@patch('app.services.ai_generation.summary_generator.call_gemini_summarize', new_callable=AsyncMock)
+async def test_incremental_summarizer_starts_before_the_text_is_complete(mock_call_gemini, monkeypatch):
+    """
+    Test that chunks are summarized as parts arrive, with the same chunks as summarizing the whole text.
+    """
+    monkeypatch.setattr(settings, "SUMMARY_CHUNK_TOKENS", 10)
+    monkeypatch.setattr(settings, "SUMMARY_TOKEN_BUDGET", 1000)
+
+    async def fake_summarize(prompt, text, prompt_version=None):
+        if prompt == SUMMARY_CHUNK_PROMPT:
+            return text.split()[0]
+        return "final: " + " ".join(text.split())
+    mock_call_gemini.side_effect = fake_summarize
+
+    pages = [f"page{i} " + "word " * 6 + "\n" for i in range(4)]
+    summarizer = IncrementalSummarizer()
+    summarizer.add(pages[0])
+    summarizer.add(pages[1])
+    await asyncio.sleep(0)
+    # The first page is being summarized while the rest is still to come
+    assert [call.kwargs["text"].split() for call in mock_call_gemini.await_args_list] == [pages[0].split()]
+
+    summarizer.add(pages[2])
+    summarizer.add(pages[3])
+    assert await summarizer.summarize() == "final: page0 page1 page2 page3"
+    incremental_chunks = [call.kwargs["text"] for call in mock_call_gemini.await_args_list]
+
+    mock_call_gemini.reset_mock()
+    await summarize_text("".join(pages))
+    assert [call.kwargs["text"] for call in mock_call_gemini.await_args_list] == incremental_chunks
+
+from app.services.ai_generation.gemini_client import stream_gemini_summarize
+
+@patch('app.services.ai_generation.gemini_client.genai')
+async def test_stream_gemini_summarize_yields_pieces_and_caches(mock_genai):
+    """
+    Test that streamed pieces are yielded in order and the full text is cached.
+    """
+    mock_model = MagicMock()
+    mock_model.generate_content = MagicMock(return_value=iter([MagicMock(text="Hello "), MagicMock(text="world.")]))
+    mock_genai.GenerativeModel.return_value = mock_model
+
+    pieces = [piece async for piece in stream_gemini_summarize("prompt", "text", prompt_version="1")]
+
+    assert pieces == ["Hello ", "world."]
+    mock_model.generate_content.assert_called_once_with("prompt\n\ntext", stream=True)
+    # The non-streaming call is now served from the cache
+    assert await call_gemini_summarize("prompt", "text", prompt_version="1") == "Hello world."
+    assert mock_model.generate_content.call_count == 1
+
+@patch('app.services.ai_generation.gemini_client.genai')
+async def test_stream_gemini_summarize_propagates_errors(mock_genai):
+    """
+    Test that an error raised by the SDK stream reaches the consumer.
+    """
+    def failing_stream(*args, **kwargs):
+        yield MagicMock(text="partial")
+        raise RuntimeError("stream broke")
+    mock_model = MagicMock()
+    mock_model.generate_content = MagicMock(side_effect=failing_stream)
+    mock_genai.GenerativeModel.return_value = mock_model
+
+    pieces = []
+    with pytest.raises(RuntimeError, match="stream broke"):
+        async for piece in stream_gemini_summarize("prompt", "text"):
+            pieces.append(piece)
+    assert pieces == ["partial"]
+
+from app.core.metrics import metrics
+
+@patch('app.services.ai_generation.gemini_client.genai')
+async def test_gemini_model_is_built_once_and_calls_are_timed(mock_genai):
+    """
+    Test that the model is reused across calls and per-call timings are recorded.
+    """
+    metrics.reset()
+    mock_model = MagicMock()
+    mock_model.generate_content = MagicMock(return_value=MagicMock(text="ok"))
+    mock_genai.GenerativeModel.return_value = mock_model
+
+    await call_gemini_summarize("prompt", "one", use_cache=False)
+    await call_gemini_quiz("quiz prompt", use_cache=False)
+
+    mock_genai.GenerativeModel.assert_called_once_with('models/gemini-2.5-flash')
+    timings = metrics.snapshot()["timings"]
+    assert timings["gemini.call_seconds"]["count"] == 2
+    assert timings["gemini.executor_wait_seconds"]["count"] == 2
@@ -0,0 +1,29 @@
+# backend/tests/services/test_chunking.py
+
+from app.services.ai_generation.chunking import CHARS_PER_TOKEN, estimate_tokens, split_into_chunks
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a") == 1
+    assert estimate_tokens("a" * CHARS_PER_TOKEN * 3) == 3
+
+
+def test_split_into_chunks_keeps_small_text_whole():
+    text = "First paragraph.\n\nSecond paragraph."
+    assert split_into_chunks(text, max_tokens=100) == [text]
+
+
+def test_split_into_chunks_prefers_page_and_paragraph_boundaries():
+    pages = ["a" * 30 + "\n\n" + "b" * 30, "c" * 30]
+    chunks = split_into_chunks("\f".join(pages), max_tokens=10)
+
+    assert chunks == ["a" * 30, "b" * 30, "c" * 30]
+
+
+def test_split_into_chunks_splits_oversized_paragraphs():
+    text = " ".join(["word"] * 100)
+    chunks = split_into_chunks(text, max_tokens=5)
+
+    assert all(len(chunk) <= 5 * CHARS_PER_TOKEN for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
@@ -0,0 +1,102 @@
+# backend/tests/services/test_content.py
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlmodel import SQLModel
+from typing import AsyncGenerator
+
+from app.db.models import Document, DocumentContent
+from app.services.storage import content
+from app.services.storage.content import (
+    compress_stored_contents,
+    compress_text,
+    decompress_text,
+    has_document_content,
+    load_document_content,
+    save_document_content,
+)
+
+engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+
+LECTURE_TEXT = "Photosynthesis converts light energy into chemical energy.\n\n" * 500
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+
+
+@pytest_asyncio.fixture
+async def document(db_session: AsyncSession) -> Document:
+    document = Document(filename="notes.txt", file_type="text/plain", storage_path="notes.txt")
+    db_session.add(document)
+    await db_session.commit()
+    return document
+
+
+@pytest.mark.parametrize("codec", ["zstd", "zlib"])
+def test_compress_round_trip_shrinks_text(codec):
+    data = compress_text(LECTURE_TEXT, codec)
+
+    assert len(data) < len(LECTURE_TEXT) / 5
+    assert decompress_text(data, codec) == LECTURE_TEXT
+
+
+def test_decompress_rejects_unknown_codec():
+    with pytest.raises(ValueError):
+        decompress_text(b"", "lz4")
+
+
+@pytest.mark.asyncio
+async def test_save_and_load_document_content(db_session: AsyncSession, document: Document):
+    assert await load_document_content(db_session, document.id) is None
+    assert not await has_document_content(db_session, document.id)
+
+    await save_document_content(db_session, document.id, LECTURE_TEXT)
+    await db_session.commit()
+
+    stored = await db_session.get(DocumentContent, document.id)
+    assert stored.codec == content.DEFAULT_CODEC
+    assert stored.text_length == len(LECTURE_TEXT)
+    assert len(stored.data) < len(LECTURE_TEXT) / 5
+    assert await has_document_content(db_session, document.id)
+    assert await load_document_content(db_session, document.id) == LECTURE_TEXT
+
+    # Saving again replaces the text
+    await save_document_content(db_session, document.id, "")
+    await db_session.commit()
+    assert await load_document_content(db_session, document.id) == ""
+    assert not await has_document_content(db_session, document.id)
+
+
+@pytest.mark.asyncio
+async def test_rows_written_with_another_codec_stay_readable(db_session: AsyncSession, document: Document):
+    db_session.add(DocumentContent(
+        document_id=document.id, codec="zlib", data=compress_text("old text", "zlib"), text_length=8,
+    ))
+    await db_session.commit()
+
+    assert await load_document_content(db_session, document.id) == "old text"
+
+
+@pytest.mark.asyncio
+async def test_compress_stored_contents_compresses_migrated_rows(db_session: AsyncSession, document: Document):
+    db_session.add(DocumentContent(
+        document_id=document.id, codec="none", data=LECTURE_TEXT.encode("utf-8"), text_length=len(LECTURE_TEXT),
+    ))
+    await db_session.commit()
+
+    assert await compress_stored_contents(db_session) == 1
+    assert await compress_stored_contents(db_session) == 0
+
+    stored = await db_session.get(DocumentContent, document.id)
+    assert stored.codec == content.DEFAULT_CODEC
+    assert await load_document_content(db_session, document.id) == LECTURE_TEXT
@@ -0,0 +1,215 @@
+# backend/tests/services/test_grading.py
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlmodel import SQLModel, select
+from typing import AsyncGenerator
+from uuid import uuid4
+
+from app.db.models import Document, Quiz, Question, UserAnswer
+from app.services.grading.engine import (
+    Submission,
+    grade_submission,
+    grade_submissions,
+    normalize_answer,
+)
+from app.services.storage.content import save_document_content
+
+pytestmark = pytest.mark.asyncio
+
+engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+
+
+@pytest_asyncio.fixture
+async def quiz(db_session: AsyncSession) -> Quiz:
+    document = Document(filename="notes.txt", file_type="text/plain", storage_path="notes.txt")
+    quiz = Quiz(document_id=document.id, title="Quiz", status="ready", total_questions=2)
+    db_session.add_all([
+        document,
+        quiz,
+        Question(quiz_id=quiz.id, question_type="multiple_choice", question_text="Q1", correct_answer="B", order_index=0),
+        Question(quiz_id=quiz.id, question_type="short_answer", question_text="Q2", correct_answer="World  War II", order_index=1),
+    ])
+    await save_document_content(db_session, document.id, "text")
+    await db_session.commit()
+    return quiz
+
+
+async def question_ids(session: AsyncSession, quiz: Quiz):
+    result = await session.execute(select(Question.id).where(Question.quiz_id == quiz.id).order_by(Question.order_index))
+    return result.scalars().all()
+
+
+async def test_normalize_answer():
+    assert normalize_answer("  World   War\tII ") == "world war ii"
+
+
+async def test_grade_submission_scores_and_skips_unknown_questions(db_session: AsyncSession, quiz: Quiz):
+    q1, q2 = await question_ids(db_session, quiz)
+
+    result = await grade_submission(
+        db_session,
+        quiz.id,
+        [
+            {"question_id": q1, "user_answer": " b "},
+            {"question_id": q2, "user_answer": "world war ii"},
+            {"question_id": uuid4(), "user_answer": "ignored"},
+        ],
+        user_id=None,
+    )
+
+    assert result["score"] == 2
+    assert result["total"] == 2
+    assert result["percentage"] == 100.0
+    assert [r["question_id"] for r in result["results"]] == [str(q1), str(q2)]
+    stored = (await db_session.execute(select(func.count()).select_from(UserAnswer))).scalar_one()
+    assert stored == 2
+
+
+async def test_grade_submission_unknown_quiz(db_session: AsyncSession):
+    with pytest.raises(ValueError, match="not found"):
+        await grade_submission(db_session, uuid4(), [], user_id=None)
+
+
+async def test_grade_submissions_batch_uses_one_transaction(db_session: AsyncSession, quiz: Quiz):
+    q1, q2 = await question_ids(db_session, quiz)
+    submissions = [
+        Submission(user_id=uuid4(), answers=[
+            {"question_id": q1, "user_answer": "B" if i % 2 == 0 else "C"},
+            {"question_id": q2, "user_answer": "World War II"},
+        ])
+        for i in range(300)
+    ]
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        results = await grade_submissions(db_session, quiz.id, submissions)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert [r["score"] for r in results[:2]] == [2, 1]
+    # 600 answers: one answer-key query and a single multi-row INSERT
+    assert sum(stmt.startswith("INSERT INTO user_answers") for stmt in statements) == 1
+    assert sum(stmt.startswith("SELECT") for stmt in statements) == 1
+    stored = (await db_session.execute(select(func.count()).select_from(UserAnswer))).scalar_one()
+    assert stored == 600
+
+
+from unittest.mock import AsyncMock, patch
+
+from app.core.config import settings
+from app.services.grading.matchers import build_answer_key, canonical_number, score_short_answer
+
+
+async def test_canonical_number():
+    assert canonical_number("1,000.50") == "1000.5"
+    assert canonical_number("seven") == "7"
+    assert canonical_number("photosynthesis") is None
+
+
+@pytest.mark.parametrize("correct, answer, expected", [
+    ("Photosynthesis", "photosynthsis", True),               # typo
+    ("1945", "In 1945", True),                               # number in a sentence
+    ("1945", "1944", False),                                 # wrong number
+    ("7 continents", "seven continents", True),              # number words
+    ("The mitochondria", "mitochondrion", True),             # stop words, stemming
+    ("Increased blood pressure", "blood pressure increases", True),  # word order, inflection
+    ("Increased blood pressure", "decreased heart rate", False),
+    ("Paris", "London", False),
+])
+async def test_score_short_answer(correct, answer, expected):
+    score = score_short_answer(answer, build_answer_key(correct))
+    assert (score >= settings.SHORT_ANSWER_ACCEPT_THRESHOLD) is expected
+
+
+@pytest.mark.parametrize("correct, answer", [
+    ("possible", "impossible"),
+    ("Visible light", "invisible light"),
+    ("Exothermic", "endothermic"),
+    ("Hyperthyroidism", "hypothyroidism"),
+    ("Chloride", "chlorite"),
+    ("Mitosis", "meiosis"),
+    ("DNA polymerase", "RNA polymerase"),
+    ("Carbon dioxide", "carbon monoxide"),
+])
+async def test_near_miss_short_answers_are_borderline(correct, answer):
+    """Look-alike words with a different meaning are never auto-accepted, only adjudicated."""
+    score = score_short_answer(answer, build_answer_key(correct))
+    assert settings.SHORT_ANSWER_REJECT_THRESHOLD <= score < settings.SHORT_ANSWER_ACCEPT_THRESHOLD
+
+
+@pytest.mark.parametrize("answer", ["1944 1945 1946", "not 1945", "1939 to 1945"])
+async def test_hedged_numeric_answers_are_not_accepted(answer):
+    """Extra numbers or a negation are never auto-accepted, whatever numbers they include."""
+    score = score_short_answer(answer, build_answer_key("1945"))
+    assert score <= settings.SHORT_ANSWER_REJECT_THRESHOLD
+
+
+async def test_near_miss_short_answer_goes_to_adjudication(db_session: AsyncSession, quiz: Quiz, monkeypatch):
+    monkeypatch.setattr(settings, "SHORT_ANSWER_LLM_ADJUDICATION", True)
+    question = Question(quiz_id=quiz.id, question_type="short_answer", question_text="Q3",
+                        correct_answer="Endothermic", order_index=2)
+    db_session.add(question)
+    await db_session.commit()
+
+    with patch('app.services.grading.engine.call_gemini_adjudicate', new_callable=AsyncMock) as mock_adjudicate:
+        mock_adjudicate.return_value = "INCORRECT"
+        result = await grade_submission(
+            db_session, quiz.id, [{"question_id": question.id, "user_answer": "exothermic"}], user_id=None
+        )
+
+    assert mock_adjudicate.await_count == 1
+    assert result["results"][0]["is_correct"] is False
+
+
+async def test_short_answer_key_is_precomputed_at_generation(db_session: AsyncSession, quiz: Quiz):
+    from app.services.ai_generation.quiz_generator import generate_quiz
+    import json
+
+    with patch('app.services.ai_generation.quiz_generator.call_gemini_quiz', new_callable=AsyncMock) as mock_gemini:
+        mock_gemini.return_value = json.dumps([
+            {"question_type": "short_answer", "question_text": "When?", "options": None, "correct_answer": "In 1945"},
+            {"question_type": "true_false", "question_text": "True?", "options": ["True", "False"], "correct_answer": "True"},
+        ])
+        generated = await generate_quiz(quiz.document_id, None, 2, None, db_session)
+
+    questions = (await db_session.execute(
+        select(Question).where(Question.quiz_id == generated.id).order_by(Question.order_index)
+    )).scalars().all()
+    assert questions[0].answer_key["numbers"] == ["1945"]
+    assert questions[1].answer_key is None
+
+
+async def test_borderline_answers_are_adjudicated_once(db_session: AsyncSession, quiz: Quiz, monkeypatch):
+    monkeypatch.setattr(settings, "SHORT_ANSWER_LLM_ADJUDICATION", True)
+    monkeypatch.setattr(settings, "SHORT_ANSWER_ACCEPT_THRESHOLD", 0.99)
+    monkeypatch.setattr(settings, "SHORT_ANSWER_REJECT_THRESHOLD", 0.1)
+    q1, q2 = await question_ids(db_session, quiz)
+    submissions = [
+        Submission(user_id=uuid4(), answers=[{"question_id": q2, "user_answer": "the second world war"}])
+        for _ in range(3)
+    ]
+
+    with patch('app.services.grading.engine.call_gemini_adjudicate', new_callable=AsyncMock) as mock_adjudicate:
+        mock_adjudicate.return_value = "CORRECT"
+        results = await grade_submissions(db_session, quiz.id, submissions)
+
+    assert mock_adjudicate.await_count == 1
+    assert all(r["score"] == 1 for r in results)
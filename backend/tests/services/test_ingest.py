@@ -0,0 +1,71 @@
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.storage.ingest import (
+    IngestedUpload,
+    ingest_upload,
+    matches_declared_type,
+    media_type,
+    sniff_content_type,
+    UploadTooLargeError,
+    PDF_MIME,
+    DOCX_MIME,
+    TEXT_MIME,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_ingest_upload_hashes_and_spools_in_chunks():
+    """Tests that the spooled content and hash match the uploaded bytes."""
+    content = b"lecture notes\n" * 10_000
+    upload = UploadFile(file=io.BytesIO(content), filename="notes.txt")
+
+    ingested = await ingest_upload(upload, max_bytes=len(content), chunk_size=1024)
+    try:
+        assert ingested.size == len(content)
+        assert ingested.sha256 == hashlib.sha256(content).hexdigest()
+        assert ingested.sniffed_content_type == TEXT_MIME
+        with ingested.open() as f:
+            assert f.read() == content
+    finally:
+        ingested.cleanup()
+    assert not os.path.exists(ingested.spool_path)
+
+
+async def test_ingest_upload_rejects_oversized_file():
+    """Tests that the size limit is enforced while streaming."""
+    upload = UploadFile(file=io.BytesIO(b"a" * 5000), filename="big.txt")
+
+    with pytest.raises(UploadTooLargeError):
+        await ingest_upload(upload, max_bytes=4096, chunk_size=1024)
+
+
+async def test_sniff_content_type():
+    """Tests content type detection from magic bytes."""
+    assert sniff_content_type(b"%PDF-1.7\n...") == PDF_MIME
+    assert sniff_content_type(b"PK\x03\x04rest-of-zip") == DOCX_MIME
+    assert sniff_content_type("plain text åäø".encode("utf-8")) == TEXT_MIME
+    assert sniff_content_type(b"\x89PNG\r\n\x1a\n\x00\x00") is None
+    # Legacy (non-UTF-8) text is still text
+    assert sniff_content_type("café".encode("cp1252")) == TEXT_MIME
+
+
+async def test_declared_type_matching_ignores_parameters_and_accepts_any_text():
+    """Tests that the declared media type is compared without parameters and text is permissive."""
+    def ingested(size, sniffed):
+        return IngestedUpload(spool_path="unused", size=size, sha256="", sniffed_content_type=sniffed)
+
+    assert media_type("text/plain; charset=utf-8") == TEXT_MIME
+    assert media_type("Application/PDF") == PDF_MIME
+    assert matches_declared_type(TEXT_MIME, ingested(0, None))
+    assert matches_declared_type(TEXT_MIME, ingested(10, TEXT_MIME))
+    assert not matches_declared_type(TEXT_MIME, ingested(10, PDF_MIME))
+    assert not matches_declared_type(TEXT_MIME, ingested(10, None))
+    assert matches_declared_type(PDF_MIME, ingested(10, PDF_MIME))
+    assert not matches_declared_type(PDF_MIME, ingested(0, None))
+    assert not matches_declared_type(DOCX_MIME, ingested(10, TEXT_MIME))
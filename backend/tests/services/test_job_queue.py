@@ -0,0 +1,120 @@
+# backend/tests/services/test_job_queue.py
+
+import json
+from datetime import datetime, timedelta
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlmodel import SQLModel
+
+from app.db.models import Job
+from app.services.jobs.queue import enqueue_job, claim_jobs, fail_job, complete_job
+from app.services.jobs.worker import JobWorker
+
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+engine = create_async_engine(DATABASE_URL, echo=False)
+
+
+def new_test_session() -> AsyncSession:
+    return AsyncSession(engine, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with new_test_session() as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+
+
+@pytest.mark.asyncio
+async def test_claim_sets_lease_and_skips_future_jobs(db_session: AsyncSession):
+    """Test that only runnable jobs are claimed and that claiming takes a lease."""
+    ready = enqueue_job(db_session, "extract_text", {"document_id": "a"})
+    enqueue_job(db_session, "extract_text", {"document_id": "b"}, run_after=datetime.utcnow() + timedelta(hours=1))
+    await db_session.commit()
+
+    claimed = await claim_jobs(db_session, "worker-1", limit=10, lease_seconds=60)
+
+    assert [job.id for job in claimed] == [ready.id]
+    assert claimed[0].status == "running"
+    assert claimed[0].attempts == 1
+    assert claimed[0].locked_by == "worker-1"
+    assert claimed[0].lease_expires_at > datetime.utcnow()
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(db_session: AsyncSession):
+    """Test that a job held by a crashed worker becomes claimable when its lease expires."""
+    job = enqueue_job(db_session, "extract_text", {})
+    await db_session.commit()
+    await claim_jobs(db_session, "crashed-worker", limit=1, lease_seconds=60)
+
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    await db_session.commit()
+
+    claimed = await claim_jobs(db_session, "worker-2", limit=1, lease_seconds=60)
+    assert [j.id for j in claimed] == [job.id]
+    assert claimed[0].locked_by == "worker-2"
+    assert claimed[0].attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_then_dead_lettered(db_session: AsyncSession):
+    """Test retry with backoff and dead-lettering after max_attempts."""
+    job = enqueue_job(db_session, "generate_summary", {}, max_attempts=2)
+    await db_session.commit()
+
+    await claim_jobs(db_session, "worker-1", limit=1)
+    status = await fail_job(db_session, job.id, "worker-1", "boom", backoff_seconds=0)
+    assert status == "queued"
+
+    await claim_jobs(db_session, "worker-1", limit=1)
+    status = await fail_job(db_session, job.id, "worker-1", "boom again", backoff_seconds=0)
+    assert status == "dead"
+
+    await db_session.refresh(job)
+    assert job.attempts == 2
+    assert job.last_error == "boom again"
+    assert await claim_jobs(db_session, "worker-1", limit=1) == []
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_handlers_and_records_outcome(db_session: AsyncSession):
+    """Test that the worker dispatches jobs to handlers and completes or fails them."""
+    handled = []
+
+    async def ok_handler(payload: dict, session: AsyncSession) -> None:
+        handled.append(payload["n"])
+
+    async def failing_handler(payload: dict, session: AsyncSession) -> None:
+        raise RuntimeError("handler failed")
+
+    ok_job = enqueue_job(db_session, "ok", {"n": 1})
+    bad_job = enqueue_job(db_session, "bad", {}, max_attempts=1)
+    await db_session.commit()
+
+    worker = JobWorker(
+        session_factory=new_test_session,
+        handlers={"ok": ok_handler, "bad": failing_handler},
+        concurrency=2,
+        lease_seconds=60,
+    )
+    assert await worker.run_once(limit=2) == 2
+    for task in list(worker._running):
+        await task
+
+    await db_session.refresh(ok_job)
+    await db_session.refresh(bad_job)
+    assert handled == [1]
+    assert ok_job.status == "succeeded"
+    assert bad_job.status == "dead"
+    assert "handler failed" in bad_job.last_error
+    assert json.loads(ok_job.payload) == {"n": 1}
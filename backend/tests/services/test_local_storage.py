@@ -0,0 +1,92 @@
+# backend/tests/services/test_local_storage.py
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from app.services.ai_generation.text_extractor import (
+    count_pdf_pages,
+    extract_text_from_file,
+    extract_text_from_pdf_pages,
+)
+from app.services.storage.base import StorageError, StorageObjectNotFoundError
+from app.services.storage.local_storage import LocalStorage
+
+TEST_FILES_DIR = Path(__file__).parent.parent / "test_files"
+BLOB_PATH = "blobs/ab/abc123.pdf"
+
+
+@pytest.fixture
+def storage(tmp_path) -> LocalStorage:
+    return LocalStorage(str(tmp_path / "documents"), chunk_size=1024)
+
+
+@pytest.mark.asyncio
+async def test_upload_writes_atomically_into_shard_directories(storage: LocalStorage):
+    content = os.urandom(10_000)
+    await storage.upload(BLOB_PATH, io.BytesIO(content), content_type="application/pdf")
+    await storage.upload(BLOB_PATH, io.BytesIO(content), content_type="application/pdf")
+
+    shard = Path(storage.root) / "blobs" / "ab"
+    # No temporary files are left behind
+    assert os.listdir(shard) == ["abc123.pdf"]
+    assert await storage.download(BLOB_PATH) == content
+    assert storage.local_path(BLOB_PATH) == str(shard / "abc123.pdf")
+
+
+@pytest.mark.asyncio
+async def test_upload_without_upsert_keeps_existing_object(storage: LocalStorage):
+    await storage.upload("notes.txt", io.BytesIO(b"first"), content_type="text/plain")
+
+    with pytest.raises(StorageError) as excinfo:
+        await storage.upload("notes.txt", io.BytesIO(b"second"), content_type="text/plain", upsert=False)
+
+    assert excinfo.value.status_code == 409
+    assert await storage.download("notes.txt") == b"first"
+    assert os.listdir(storage.root) == ["notes.txt"]
+
+
+@pytest.mark.asyncio
+async def test_ranged_and_chunked_reads(storage: LocalStorage):
+    content = bytes(range(256)) * 20
+    await storage.upload(BLOB_PATH, io.BytesIO(content), content_type="application/pdf")
+
+    assert await storage.read_range(BLOB_PATH, 1000, 2999) == content[1000:3000]
+    assert await storage.read_range(BLOB_PATH, 5000, 9999) == content[5000:]
+    chunks = [chunk async for chunk in storage.iter_download(BLOB_PATH)]
+    assert [len(chunk) for chunk in chunks] == [1024] * 5
+
+
+@pytest.mark.asyncio
+async def test_missing_objects_and_invalid_paths(storage: LocalStorage):
+    with pytest.raises(StorageObjectNotFoundError):
+        await storage.download("blobs/zz/missing.pdf")
+    assert storage.local_path("blobs/zz/missing.pdf") is None
+
+    with pytest.raises(StorageError):
+        storage.resolve("../outside.txt")
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("test.txt", "This is a test text file."),
+    ("test.docx", "This is a test docx file."),
+    ("test.pdf", "This is a test pdf file."),
+])
+def test_extract_text_from_memory_mapped_file(filename, expected):
+    path = str(TEST_FILES_DIR / filename)
+    with open(path, "rb") as f:
+        content = f.read()
+
+    assert expected in extract_text_from_file(path, filename)
+    assert extract_text_from_file(path, filename) == extract_text_from_file(content, filename)
+
+
+def test_extract_pdf_pages_from_memory_mapped_file():
+    path = str(TEST_FILES_DIR / "test.pdf")
+    with open(path, "rb") as f:
+        content = f.read()
+
+    assert count_pdf_pages(path) == count_pdf_pages(content)
+    assert extract_text_from_pdf_pages(path, 0, 1) == extract_text_from_pdf_pages(content, 0, 1)
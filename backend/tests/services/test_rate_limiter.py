@@ -0,0 +1,129 @@
+# backend/tests/services/test_rate_limiter.py
+
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.metrics import metrics
+from app.services.ai_generation.rate_limiter import (
+    CircuitBreaker,
+    CircuitOpenError,
+    GeminiGovernor,
+    InFlightLimiter,
+    TokenBucket,
+)
+
+
+def test_token_bucket_reserves_ahead():
+    bucket = TokenBucket(rate_per_minute=60)  # 1 token/second, capacity 60
+
+    assert bucket.reserve(60) == 0
+    # The bucket is empty; the next token is a second away, the one after two seconds
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2, abs=0.05)
+
+
+def test_token_bucket_clamps_requests_above_capacity():
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+    assert bucket.reserve(1000) == 0
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limiter_caps_concurrency():
+    limiter = InFlightLimiter(limit=2)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        await limiter.acquire()
+        try:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+        finally:
+            limiter.release()
+
+    await asyncio.gather(*[work() for _ in range(6)])
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # reset_seconds elapsed: one trial call is let through
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_governor_counts_only_upstream_errors_as_failures():
+    metrics.reset()
+    governor = GeminiGovernor(
+        requests_per_minute=600, tokens_per_minute=100_000, max_in_flight=1,
+        failure_threshold=1, reset_seconds=60,
+    )
+
+    with pytest.raises(ValueError):
+        async with governor.slot(10):
+            raise ValueError("bad request")
+    assert governor.breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        async with governor.slot(10):
+            raise google_exceptions.ServiceUnavailable("down")
+    with pytest.raises(CircuitOpenError):
+        async with governor.slot(10):
+            pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["timings"]["gemini.limiter_wait_seconds"]["count"] == 2
+    assert snapshot["gauges"]["gemini.limiter_queue_depth"] == 0
+    assert snapshot["counters"]["gemini.circuit_rejections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_trial_reopens_the_circuit():
+    governor = GeminiGovernor(
+        requests_per_minute=600, tokens_per_minute=100_000, max_in_flight=1,
+        failure_threshold=1, reset_seconds=0.05,
+    )
+
+    async def trial():
+        async with governor.slot(10):
+            await asyncio.sleep(10)
+
+    for cancel_while_queued in (False, True):
+        governor.breaker.record_failure()
+        await asyncio.sleep(0.06)
+        if cancel_while_queued:
+            # The trial waits for the in-flight slot and is cancelled before its call starts
+            await governor.in_flight.acquire()
+        task = asyncio.create_task(trial())
+        await asyncio.sleep(0.01)
+        assert governor.breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        if cancel_while_queued:
+            governor.in_flight.release()
+
+        # The abandoned trial re-opens the circuit instead of leaving it half-open
+        assert governor.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            async with governor.slot(10):
+                pass
+
+        # After another reset period a new trial is let through
+        await asyncio.sleep(0.06)
+        async with governor.slot(10):
+            pass
+        assert governor.breaker.state == CircuitBreaker.CLOSED
+    assert governor.in_flight.in_flight == 0
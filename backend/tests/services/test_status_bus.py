@@ -0,0 +1,176 @@
+# backend/tests/services/test_status_bus.py
+
+import asyncio
+import json
+import threading
+from uuid import uuid4
+
+import pytest
+
+from app.api.sse import KEEPALIVE_COMMENT, status_event_stream
+from app.core.config import settings
+from app.services.events import status_bus
+from app.services.events.status_bus import (
+    DOCUMENT,
+    QUIZ,
+    StatusBus,
+    StatusListener,
+    is_terminal,
+    status_event,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_subscribers_receive_only_their_topic():
+    bus = StatusBus()
+    doc_id = uuid4()
+    async with bus.subscribe(DOCUMENT, doc_id) as events:
+        bus.publish(status_event(DOCUMENT, uuid4(), "summarizing"))
+        bus.publish(status_event(QUIZ, doc_id, "ready"))
+        bus.publish(status_event(DOCUMENT, doc_id, "summarizing"))
+
+        event = await asyncio.wait_for(events.get(), timeout=1)
+        assert event == {"type": "document", "id": str(doc_id), "status": "summarizing"}
+        assert events.empty()
+        assert bus.subscriber_count() == 1
+    assert bus.subscriber_count() == 0
+
+
+async def test_publish_from_another_thread():
+    bus = StatusBus()
+    quiz_id = uuid4()
+    async with bus.subscribe(QUIZ, quiz_id) as events:
+        thread = threading.Thread(target=bus.publish, args=(status_event(QUIZ, quiz_id, "ready"),))
+        thread.start()
+        thread.join()
+
+        event = await asyncio.wait_for(events.get(), timeout=1)
+        assert event["status"] == "ready"
+        assert is_terminal(QUIZ, event["status"])
+
+
+async def test_listener_republishes_events_from_other_processes(monkeypatch):
+    bus = StatusBus()
+    monkeypatch.setattr(status_bus, "_status_bus", bus)
+    listener = StatusListener(engine=None)
+    doc_id = uuid4()
+
+    async with bus.subscribe(DOCUMENT, doc_id) as events:
+        own = {**status_event(DOCUMENT, doc_id, "summarizing"), "origin": status_bus.PROCESS_ID}
+        listener._on_notify(None, 1, status_bus.NOTIFY_CHANNEL, json.dumps(own))
+        other = {**status_event(DOCUMENT, doc_id, "summarized"), "origin": "other-process"}
+        listener._on_notify(None, 1, status_bus.NOTIFY_CHANNEL, json.dumps(other))
+        listener._on_notify(None, 1, status_bus.NOTIFY_CHANNEL, "not json")
+
+        event = await asyncio.wait_for(events.get(), timeout=1)
+        assert event == status_event(DOCUMENT, doc_id, "summarized")
+        assert events.empty()
+
+
+class FakeDriverConnection:
+    def __init__(self):
+        self.listeners = []
+        self.termination_listeners = []
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    def remove_termination_listener(self, callback):
+        self.termination_listeners.remove(callback)
+
+    async def add_listener(self, channel, callback):
+        self.listeners.append(callback)
+
+    async def remove_listener(self, channel, callback):
+        self.listeners.remove(callback)
+
+    async def fetchval(self, query):
+        return 1
+
+    def is_closed(self):
+        return self.closed
+
+    def notify(self, event: dict):
+        for callback in list(self.listeners):
+            callback(self, 1, status_bus.NOTIFY_CHANNEL, json.dumps({**event, "origin": "other-process"}))
+
+    def terminate(self):
+        self.closed = True
+        for callback in list(self.termination_listeners):
+            callback(self)
+
+
+class FakeListenEngine:
+    def __init__(self, fail_first: int = 0):
+        self.fail_first = fail_first
+        self.connections = []
+
+    def connect(self):
+        engine = self
+
+        class Connection:
+            async def __aenter__(self):
+                if engine.fail_first:
+                    engine.fail_first -= 1
+                    raise OSError("connection refused")
+                driver_connection = FakeDriverConnection()
+                engine.connections.append(driver_connection)
+                self.raw = type("Raw", (), {"driver_connection": driver_connection})()
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            async def get_raw_connection(self):
+                return self.raw
+
+        return Connection()
+
+
+async def test_listener_reconnects_after_losing_its_connection(monkeypatch):
+    bus = StatusBus()
+    monkeypatch.setattr(status_bus, "_status_bus", bus)
+    monkeypatch.setattr(status_bus, "RECONNECT_BASE_SECONDS", 0.01)
+    engine = FakeListenEngine(fail_first=2)
+    listener = StatusListener(engine)
+    doc_id = uuid4()
+
+    await listener.start()
+    try:
+        async with bus.subscribe(DOCUMENT, doc_id) as events:
+            await asyncio.wait_for(listener.connected.wait(), timeout=1)
+            engine.connections[0].terminate()
+
+            async def reconnected():
+                while len(engine.connections) < 2 or not listener.connected.is_set():
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(reconnected(), timeout=1)
+            engine.connections[1].notify(status_event(DOCUMENT, doc_id, "summarized"))
+
+            event = await asyncio.wait_for(events.get(), timeout=1)
+            assert event == status_event(DOCUMENT, doc_id, "summarized")
+    finally:
+        await listener.stop()
+    assert engine.connections[1].listeners == []
+
+
+async def test_stream_catches_up_on_lost_events_at_keepalive(monkeypatch):
+    monkeypatch.setattr(status_bus, "_status_bus", StatusBus())
+    monkeypatch.setattr(settings, "STATUS_STREAM_KEEPALIVE_SECONDS", 0.01)
+    statuses = iter(["summarizing", "summarizing", "summarized"])
+
+    async def read_status():
+        return next(statuses)
+
+    # No event is ever published: the transition is only seen by re-reading
+    chunks = [chunk async for chunk in status_event_stream(DOCUMENT, uuid4(), read_status)]
+
+    assert chunks[1] == KEEPALIVE_COMMENT
+    assert [json.loads(chunk.split("data: ")[1])["status"] for chunk in (chunks[0], chunks[2])] == [
+        "summarizing",
+        "summarized",
+    ]
+    assert len(chunks) == 3
@@ -0,0 +1,101 @@
+# backend/tests/services/test_supabase_storage.py
+
+import io
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.storage.base import StorageError, StorageObjectNotFoundError
+from app.services.storage.supabase_storage import SupabaseStorage
+
+BLOB = bytes(range(256)) * 1024  # 256 KiB
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(settings, "STORAGE_RETRY_MAX_WAIT_SECONDS", 0)
+
+
+def make_storage(handler) -> SupabaseStorage:
+    return SupabaseStorage(
+        base_url="https://test.supabase.co/",
+        service_key="service-key",
+        bucket="user_documents",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        chunk_size=16 * 1024,
+        retry_attempts=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_streams_file_and_retries_server_errors():
+    bodies = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/storage/v1/object/user_documents/blobs/ab/abc.pdf"
+        assert request.headers["authorization"] == "Bearer service-key"
+        assert request.headers["x-upsert"] == "true"
+        assert request.headers["content-type"] == "application/pdf"
+        bodies.append(await request.aread())
+        return httpx.Response(503 if len(bodies) == 1 else 200, json={"Key": "user_documents/blobs/ab/abc.pdf"})
+
+    storage = make_storage(handler)
+    await storage.upload("blobs/ab/abc.pdf", io.BytesIO(BLOB), content_type="application/pdf")
+
+    # The file is rewound and sent in full on the retry
+    assert bodies == [BLOB, BLOB]
+    await storage.aclose()
+
+
+@pytest.mark.asyncio
+async def test_upload_does_not_retry_client_errors():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(413, json={"error": "Payload too large"})
+
+    storage = make_storage(handler)
+    with pytest.raises(StorageError) as excinfo:
+        await storage.upload("big.pdf", io.BytesIO(BLOB), content_type="application/pdf")
+    assert excinfo.value.status_code == 413
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_download_and_ranged_reads():
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("range")
+        if range_header is None:
+            return httpx.Response(200, content=BLOB)
+        start, end = range_header.removeprefix("bytes=").split("-")
+        return httpx.Response(206, content=BLOB[int(start):int(end) + 1])
+
+    storage = make_storage(handler)
+
+    assert await storage.download("blobs/ab/abc.pdf") == BLOB
+    assert await storage.read_range("blobs/ab/abc.pdf", 100, 199) == BLOB[100:200]
+    chunks = [chunk async for chunk in storage.iter_download("blobs/ab/abc.pdf")]
+    assert len(chunks) > 1 and b"".join(chunks) == BLOB
+
+
+@pytest.mark.asyncio
+async def test_download_retries_connection_errors_and_reports_missing_objects():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.url.path)
+        if request.url.path.endswith("missing.pdf"):
+            return httpx.Response(400, json={"statusCode": "404", "error": "not_found"})
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection reset", request=request)
+        return httpx.Response(200, content=b"hello")
+
+    storage = make_storage(handler)
+    assert await storage.download("present.pdf") == b"hello"
+    assert len(attempts) == 2
+
+    with pytest.raises(StorageObjectNotFoundError):
+        await storage.download("missing.pdf")
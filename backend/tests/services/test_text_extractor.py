@@ -1,12 +1,26 @@
+import asyncio
 import io
+import os
+import time
 import pytest
 from pathlib import Path
 import pypdf
+from app.core.config import settings
+from app.services.ai_generation import extraction_pool
+from app.services.ai_generation.extraction_pool import (
+    extract_text_in_pool,
+    get_extraction_pool,
+    shutdown_extraction_pool,
+    ExtractionTimeoutError,
+)
 from app.services.ai_generation.text_extractor import (
     extract_text_from_txt,
     extract_text_from_docx,
     extract_text_from_pdf,
     extract_text_from_file,
+    extract_text_from_pdf_pages,
+    count_pdf_pages,
+    iter_pdf_pages,
 )
 
 # Define the path to the test files
@@ -22,6 +36,12 @@ def test_extract_text_from_txt():
     assert "This is a test text file." in text
 
 
+def test_extract_text_from_legacy_encoded_txt():
+    """Tests that .txt files that are not UTF-8 are decoded as Windows-1252."""
+    text = extract_text_from_txt(io.BytesIO("Caf\u00e9 \u2013 notes".encode("cp1252")))
+    assert text == "Caf\u00e9 \u2013 notes"
+
+
 def test_extract_text_from_docx():
     """Tests extracting text from a .docx file."""
     file_path = TEST_FILES_DIR / "test.docx"
@@ -80,3 +100,103 @@ def test_extract_text_from_corrupted_file():
     with pytest.raises(pypdf.errors.PdfStreamError):
         extract_text_from_file(b"corrupted content", "test.pdf")
 
+
+
+def make_pdf(num_pages: int) -> bytes:
+    """Builds a PDF with one numbered line per page."""
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page_number in range(num_pages):
+        pdf.drawString(72, 720, f"Page number {page_number}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_iter_pdf_pages_yields_one_page_at_a_time():
+    """Tests that the page generator yields each page's text separately."""
+    reader = pypdf.PdfReader(io.BytesIO(make_pdf(3)))
+    pages = list(iter_pdf_pages(reader))
+
+    assert len(pages) == 3
+    assert all(f"Page number {n}" in page for n, page in enumerate(pages))
+    assert list(iter_pdf_pages(reader, 1, 2)) == pages[1:2]
+    # Pages are separated by form feeds, the page breaks chunking splits on
+    assert not pages[0].startswith("\f")
+    assert all(page.startswith("\f") for page in pages[1:])
+    assert "".join(pages).split("\f") == [pages[0]] + [page[1:] for page in pages[1:]]
+
+
+def test_extract_text_from_pdf_pages_matches_full_extraction():
+    """Tests that consecutive page ranges reassemble to the full text."""
+    content = make_pdf(5)
+    full_text = extract_text_from_pdf(io.BytesIO(content))
+
+    assert count_pdf_pages(content) == 5
+    parts = [extract_text_from_pdf_pages(content, start, start + 2) for start in range(0, 5, 2)]
+    assert "".join(parts) == full_text
+
+
+@pytest.mark.asyncio
+async def test_extract_text_in_pool_splits_large_pdfs(monkeypatch):
+    """Tests that a PDF split across pool workers comes back in page order."""
+    monkeypatch.setattr(settings, "EXTRACTION_MAX_WORKERS", 2)
+    monkeypatch.setattr(settings, "EXTRACTION_PAGES_PER_TASK", 3)
+    content = make_pdf(10)
+    try:
+        parts = []
+        text = await extract_text_in_pool(content, "lecture.pdf", on_part=parts.append)
+        assert text == extract_text_from_pdf(io.BytesIO(content))
+        # One part per page range, delivered in page order
+        assert len(parts) == 4 and "".join(parts) == text
+        positions = [text.index(f"Page number {n}") for n in range(10)]
+        assert positions == sorted(positions)
+
+        docx_path = TEST_FILES_DIR / "test.docx"
+        text = await extract_text_in_pool(docx_path.read_bytes(), "test.docx")
+        assert "This is a test docx file." in text
+
+        assert await extract_text_in_pool(b"content", "image.jpeg") is None
+    finally:
+        shutdown_extraction_pool()
+
+
+@pytest.mark.asyncio
+async def test_extract_text_in_pool_timeout(monkeypatch):
+    """Tests that a slow extraction is aborted and the pool keeps working."""
+    monkeypatch.setattr(settings, "EXTRACTION_MAX_WORKERS", 1)
+    try:
+        pool = get_extraction_pool()
+        with pytest.raises(ExtractionTimeoutError):
+            await extract_text_in_pool(make_pdf(50), "slow.pdf", timeout=0.001)
+        assert extraction_pool._pool is pool
+
+        text = await extract_text_in_pool(make_pdf(2), "fast.pdf")
+        assert "Page number 1" in text
+    finally:
+        shutdown_extraction_pool()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_job_only_kills_its_own_worker(monkeypatch):
+    """Tests that a job running next to one that times out is not affected."""
+    monkeypatch.setattr(settings, "EXTRACTION_MAX_WORKERS", 2)
+    try:
+        pool = get_extraction_pool()
+        timed_out, finished = await asyncio.gather(
+            asyncio.wait_for(pool.run(time.sleep, 60), timeout=2),
+            pool.run(time.sleep, 3),
+            return_exceptions=True,
+        )
+        assert isinstance(timed_out, asyncio.TimeoutError)
+        assert finished is None
+
+        # Only the timed-out job's worker was killed; the other one is reused
+        assert len(pool._workers) == 1
+        survivor = next(iter(pool._workers))
+        assert survivor.process.is_alive()
+        assert await pool.run(os.getpid) == survivor.process.pid
+    finally:
+        shutdown_extraction_pool()
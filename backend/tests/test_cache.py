@@ -0,0 +1,63 @@
+# backend/tests/test_cache.py
+
+import time
+
+import pytest
+
+from app.core.cache import LRUCache, SQLiteCache, TieredCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"  # "a" is now most recently used
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_respects_byte_budget_and_ttl(monkeypatch):
+    cache = LRUCache(max_entries=10, max_bytes=5, ttl_seconds=60)
+    cache.set("a", b"abc")
+    cache.set("b", b"abc")  # 6 bytes total, "a" is evicted
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 3
+
+    cache.set("too-big", b"abcdef")
+    assert cache.get("too-big") is None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.get("b") is None
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    disk = SQLiteCache(path, max_entries=2)
+    disk.set("a", b"1")
+    disk.set("b", b"2")
+    disk.set("c", b"3")
+
+    reopened = SQLiteCache(path)
+    assert reopened.stats()["entries"] == 2
+    assert reopened.get("c") == b"3"
+
+    disk.set("expired", b"x", ttl_seconds=-1)
+    assert disk.get("expired") is None
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    disk.set("key", b"value")
+    cache = TieredCache(LRUCache(max_entries=10), disk)
+
+    assert await cache.get("key") == b"value"
+    assert cache.memory.get("key") == b"value"
+
+    await cache.delete("key")
+    assert await cache.get("key") is None
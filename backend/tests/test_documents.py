@@ -8,12 +8,16 @@ from typing import AsyncGenerator
 from unittest.mock import MagicMock, AsyncMock, patch
 from uuid import UUID, uuid4
 from datetime import datetime
+import json
+from sqlmodel import select
 
 from app.main import app as fastapi_app
-from app.db.session import get_session
-from app.db.models import Document
-from app.supabase_client import get_supabase_admin_client
+from app.db.session import get_session, get_session_factory
+from app.db.models import Document, Job, Summary
+from app.services.storage.backends import get_document_storage
+from app.services.storage.local_storage import LocalStorage
 from app.api.summaries.main import run_text_extraction
+from app.services.storage.content import load_document_content, save_document_content
 from app.dependencies import get_current_user
 
 # Define local User model for testing to avoid circular dependencies with auth schema
@@ -38,19 +42,21 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest.fixture
-def mock_supabase_admin() -> MagicMock:
+def mock_storage() -> MagicMock:
     mock = MagicMock()
-    mock.storage.from_.return_value.upload = AsyncMock(return_value={"Key": "mock_path"})
-    mock.storage.from_.return_value.download = AsyncMock(return_value=b"simple text")
+    mock.upload = AsyncMock(return_value=None)
+    mock.download = AsyncMock(return_value=b"simple text")
+    mock.local_path.return_value = None
     return mock
 
 @pytest_asyncio.fixture
-async def client(db_session: AsyncSession, mock_supabase_admin: MagicMock) -> AsyncGenerator[AsyncClient, None]:
+async def client(db_session: AsyncSession, mock_storage: MagicMock) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
         yield db_session
 
     fastapi_app.dependency_overrides[get_session] = override_get_session
-    fastapi_app.dependency_overrides[get_supabase_admin_client] = lambda: mock_supabase_admin
+    fastapi_app.dependency_overrides[get_session_factory] = lambda: lambda: AsyncSession(engine)
+    fastapi_app.dependency_overrides[get_document_storage] = lambda: mock_storage
 
     transport = ASGITransport(app=fastapi_app)
     async with AsyncClient(transport=transport, base_url="http://test") as c:
@@ -69,11 +75,24 @@ async def test_upload_document_oversized_file(client: AsyncClient):
     assert response.status_code == 400
 
 @pytest.mark.asyncio
-@patch('app.api.summaries.main.BackgroundTasks.add_task')
-async def test_upload_document_success(mock_add_task: MagicMock, client: AsyncClient, db_session: AsyncSession):
-    # Prevent background tasks from running in this test
-    mock_add_task.return_value = None
-    
+async def test_upload_document_content_type_mismatch(client: AsyncClient):
+    response = await client.post("/api/v1/documents/upload", files={"file": ("fake.pdf", b"not really a pdf", "application/pdf")})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_upload_document_accepts_charset_empty_and_legacy_text(client: AsyncClient, db_session: AsyncSession):
+    for name, content, content_type in [
+        ("utf8.txt", b"content", "text/plain; charset=utf-8"),
+        ("empty.txt", b"", "text/plain"),
+        ("legacy.txt", "caf\u00e9 notes".encode("cp1252"), "text/plain"),
+    ]:
+        response = await client.post("/api/v1/documents/upload", files={"file": (name, content, content_type)})
+        assert response.status_code == 202, name
+        doc = await db_session.get(Document, UUID(response.json()["document_id"]))
+        assert doc.file_type == "text/plain"
+
+@pytest.mark.asyncio
+async def test_upload_document_success(client: AsyncClient, db_session: AsyncSession):
     response = await client.post("/api/v1/documents/upload", files={"file": ("test.txt", b"content", "text/plain")})
     assert response.status_code == 202
     data = response.json()
@@ -84,21 +103,25 @@ async def test_upload_document_success(mock_add_task: MagicMock, client: AsyncCl
     assert doc.filename == "test.txt"
     assert doc.status == "uploaded"
 
+    # Text extraction is queued as a durable job in the same transaction
+    jobs = (await db_session.execute(select(Job))).scalars().all()
+    assert len(jobs) == 1
+    assert jobs[0].job_type == "extract_text"
+    assert jobs[0].status == "queued"
+    assert json.loads(jobs[0].payload)["document_id"] == str(doc_id)
+
 @pytest.mark.asyncio
 @patch('app.services.ai_generation.summary_generator.call_gemini_summarize')
-@patch('app.api.summaries.main.get_supabase_admin_client')
 async def test_upload_and_summarize_success(
-    mock_supabase_admin: MagicMock,
     mock_gemini: AsyncMock,
-    client: AsyncClient, 
-    db_session: AsyncSession
+    client: AsyncClient,
+    db_session: AsyncSession,
+    mock_storage: MagicMock,
 ):
     # Mock the Gemini API to return a summary
     mock_gemini.return_value = "This is a test summary of the document content."
     
-    # Mock the return value of supabase_admin.storage.from_().download()
-    # Use a regular function that returns bytes directly (not async)
-    mock_supabase_admin.return_value.storage.from_.return_value.download = MagicMock(return_value=b"simple text content")
+    mock_storage.download.return_value = b"simple text content"
 
     user_id = uuid4()
     mock_user = MagicMock()
@@ -128,17 +151,66 @@ async def test_upload_and_summarize_success(
         storage_path="some/path",
         filename="test.txt",
         user_id=user_id, # Pass the user_id
-        supabase_admin=mock_supabase_admin.return_value,
+        storage=mock_storage,
         db_session=db_session,
     )
 
     updated_doc = await db_session.get(Document, doc_id)
     assert updated_doc is not None
     assert updated_doc.status == "summarized" # Should be summarized now
-    assert updated_doc.raw_content == "simple text content"
+    assert await load_document_content(db_session, doc_id) == "simple text content"
 
     fastapi_app.dependency_overrides.clear()
 
+@pytest.mark.asyncio
+@patch('app.services.ai_generation.summary_generator.call_gemini_summarize')
+async def test_upload_and_extract_with_local_storage(mock_gemini: AsyncMock, client: AsyncClient, db_session: AsyncSession, tmp_path):
+    mock_gemini.return_value = "Local summary."
+    storage = LocalStorage(str(tmp_path))
+    fastapi_app.dependency_overrides[get_document_storage] = lambda: storage
+
+    response = await client.post("/api/v1/documents/upload", files={"file": ("local.txt", b"offline lecture", "text/plain")})
+    assert response.status_code == 202
+    doc_id = UUID(response.json()["document_id"])
+    doc = await db_session.get(Document, doc_id)
+    storage_path = doc.storage_path
+    assert storage.local_path(storage_path) is not None
+
+    await run_text_extraction(
+        document_id=doc_id,
+        storage_path=storage_path,
+        filename="local.txt",
+        user_id=None,
+        storage=storage,
+        db_session=db_session,
+    )
+
+    assert await load_document_content(db_session, doc_id) == "offline lecture"
+    assert (await db_session.get(Document, doc_id)).status == "summarized"
+
+@pytest.mark.asyncio
+async def test_extraction_of_unsupported_file_fails_without_retry(db_session: AsyncSession):
+    storage = MagicMock()
+    storage.download = AsyncMock(return_value=b"\x89PNG image data")
+    storage.local_path.return_value = None
+    doc = Document(filename="diagram.png", file_type="text/plain", storage_path="blobs/cd/cde.png")
+    doc_id = doc.id
+    db_session.add(doc)
+    await db_session.commit()
+
+    # Returns normally, so the job queue does not retry it
+    await run_text_extraction(
+        document_id=doc_id,
+        storage_path="blobs/cd/cde.png",
+        filename="diagram.png",
+        user_id=None,
+        storage=storage,
+        db_session=db_session,
+    )
+
+    assert (await db_session.get(Document, doc_id)).status == "extraction-failed"
+    assert await load_document_content(db_session, doc_id) is None
+
 @pytest.mark.asyncio
 async def test_upload_document_guest_user(client: AsyncClient, db_session: AsyncSession):
     response = await client.post("/api/v1/documents/upload", files={"file": ("guest.txt", b"content", "text/plain")})
@@ -178,3 +250,148 @@ async def test_upload_document_authenticated_user(client: AsyncClient, db_sessio
 
     fastapi_app.dependency_overrides.clear()
 
+
+
+@pytest.mark.asyncio
+async def test_upload_identical_content_is_deduplicated(client: AsyncClient, db_session: AsyncSession, mock_storage: MagicMock):
+    first = await client.post("/api/v1/documents/upload", files={"file": ("a.txt", b"same lecture", "text/plain")})
+    second = await client.post("/api/v1/documents/upload", files={"file": ("b.txt", b"same lecture", "text/plain")})
+    assert first.status_code == 202
+    assert second.status_code == 202
+
+    doc_a = await db_session.get(Document, UUID(first.json()["document_id"]))
+    doc_b = await db_session.get(Document, UUID(second.json()["document_id"]))
+    assert doc_a.content_hash == doc_b.content_hash
+    assert doc_a.storage_path == doc_b.storage_path
+    assert doc_a.storage_path.startswith(f"blobs/{doc_a.content_hash[:2]}/")
+    # The blob is only stored once
+    assert mock_storage.upload.await_count == 1
+
+
+@pytest.mark.asyncio
+@patch('app.services.ai_generation.summary_generator.call_gemini_summarize')
+async def test_duplicate_upload_reuses_extracted_text_and_summary(mock_gemini: AsyncMock, db_session: AsyncSession):
+    mock_gemini.return_value = "Shared summary."
+    storage = MagicMock()
+    storage.download = AsyncMock(return_value=b"shared lecture text")
+    storage.local_path.return_value = None
+
+    doc_ids = []
+    for name in ("first.txt", "second.txt"):
+        doc = Document(filename=name, file_type="text/plain", storage_path="blobs/ab/abc.txt", content_hash="abc")
+        doc_ids.append(doc.id)
+        db_session.add(doc)
+        await db_session.commit()
+        await run_text_extraction(
+            document_id=doc_ids[-1],
+            storage_path="blobs/ab/abc.txt",
+            filename=name,
+            user_id=None,
+            storage=storage,
+            db_session=db_session,
+        )
+
+    # One download, one extraction and one LLM call for both documents
+    assert storage.download.await_count == 1
+    assert mock_gemini.call_count == 1
+
+    summaries = (await db_session.execute(select(Summary))).scalars().all()
+    assert sorted(s.document_id for s in summaries) == sorted(doc_ids)
+    assert all(s.summary_text == "Shared summary." for s in summaries)
+    assert all(s.summary_preview == "Shared summary." for s in summaries)
+    second = await db_session.get(Document, doc_ids[1])
+    assert await load_document_content(db_session, doc_ids[1]) == "shared lecture text"
+    assert second.status == "summarized"
+
+
+@pytest.mark.asyncio
+@patch('app.services.ai_generation.summary_generator.stream_gemini_summarize')
+async def test_stream_summary_sends_tokens_and_stores_summary(mock_stream: MagicMock, client: AsyncClient, db_session: AsyncSession):
+    async def fake_stream(prompt, text, prompt_version=None):
+        for piece in ("Streamed ", "summary."):
+            yield piece
+    mock_stream.side_effect = fake_stream
+
+    doc = Document(filename="s.txt", file_type="text/plain", storage_path="s.txt", status="text-extracted")
+    doc_id = doc.id
+    db_session.add(doc)
+    await save_document_content(db_session, doc_id, "lecture text")
+    await db_session.commit()
+
+    response = await client.get(f"/api/v1/documents/{doc_id}/summary/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    names = [lines[0].removeprefix("event: ") for lines in events]
+    payloads = [json.loads(lines[1].removeprefix("data: ")) for lines in events]
+    assert names == ["token", "token", "done"]
+    assert "".join(p["text"] for p in payloads[:2]) == "Streamed summary."
+
+    summary = (await db_session.execute(select(Summary).where(Summary.document_id == doc_id))).scalar_one()
+    assert summary.summary_text == "Streamed summary."
+    assert summary.summary_preview == "Streamed summary."
+    assert payloads[2]["summary_id"] == str(summary.id)
+    assert (await db_session.get(Document, doc_id)).status == "summarized"
+
+
+@pytest.mark.asyncio
+async def test_stream_summary_requires_extracted_text(client: AsyncClient, db_session: AsyncSession):
+    doc = Document(filename="p.txt", file_type="text/plain", storage_path="p.txt", status="extracting")
+    doc_id = doc.id
+    db_session.add(doc)
+    await db_session.commit()
+
+    response = await client.get(f"/api/v1/documents/{doc_id}/summary/stream")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_stream_document_status_pushes_transitions(client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.services.events.status_bus import DOCUMENT, get_status_bus, status_event
+
+    monkeypatch.setattr(settings, "STATUS_STREAM_TIMEOUT_SECONDS", 5.0)
+    doc = Document(filename="t.txt", file_type="text/plain", storage_path="t.txt", status="text-extracted")
+    doc_id = doc.id
+    db_session.add(doc)
+    await db_session.commit()
+
+    open_sessions = []
+
+    class TrackedSession(AsyncSession):
+        async def __aenter__(self):
+            open_sessions.append(self)
+            return await super().__aenter__()
+
+        async def __aexit__(self, *exc_info):
+            open_sessions.remove(self)
+            return await super().__aexit__(*exc_info)
+
+    fastapi_app.dependency_overrides[get_session_factory] = lambda: lambda: TrackedSession(engine)
+
+    async def pipeline():
+        bus = get_status_bus()
+        while bus.subscriber_count() == 0:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        # The stream holds no database session while it waits for events
+        assert open_sessions == []
+        for step in ("summarizing", "summarizing", "summarized"):
+            bus.publish(status_event(DOCUMENT, doc_id, step))
+
+    response, _ = await asyncio.gather(client.get(f"/api/v1/documents/{doc_id}/status/stream"), pipeline())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [json.loads(block.split("\n")[1].removeprefix("data: ")) for block in response.text.strip().split("\n\n")]
+    # Current status first, then each transition once, ending at the terminal status
+    assert [event["status"] for event in events] == ["text-extracted", "summarizing", "summarized"]
+    assert get_status_bus().subscriber_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_document_status_not_found(client: AsyncClient):
+    response = await client.get(f"/api/v1/documents/{uuid4()}/status/stream")
+    assert response.status_code == 404
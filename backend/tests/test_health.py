@@ -45,3 +45,14 @@ def test_health_check_db_disconnected(monkeypatch, client):
             "database_connection": "Supabase connection failed: Some error.",
         }
     }
+
+
+def test_metrics_endpoint(client):
+    from app.core.metrics import metrics
+    metrics.increment("test.counter")
+
+    response = client.get("/api/v1/metrics")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["counters"]["test.counter"] >= 1
+    assert {"gauges", "timings", "db_pool"} <= body.keys()
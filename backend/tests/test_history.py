@@ -105,7 +105,6 @@ async def sample_documents(db_session: AsyncSession) -> list[Document]:
             filename=f"test_document_{i}.pdf",
             file_type="application/pdf",
             storage_path=f"user_uploads/test_{i}.pdf",
-            raw_content=f"Test content for document {i}",
             status="text-extracted",
             created_at=datetime.utcnow() - timedelta(days=i)
         )
@@ -236,6 +235,60 @@ class TestSummaryHistory:
         assert data["total"] == 3
 
 
+    @pytest.mark.asyncio
+    async def test_get_summary_history_cursor_pagination(
+        self, 
+        authenticated_client: AsyncClient, 
+        sample_summaries: list[Summary]
+    ):
+        """Test keyset pagination of summaries with next_cursor."""
+        first = (await authenticated_client.get("/api/v1/history/summaries?limit=2")).json()
+        assert [item["id"] for item in first["data"]] == [str(s.id) for s in sample_summaries[:2]]
+        assert first["next_cursor"]
+        
+        second = (await authenticated_client.get(
+            f"/api/v1/history/summaries?limit=2&cursor={first['next_cursor']}"
+        )).json()
+        assert [item["id"] for item in second["data"]] == [str(sample_summaries[2].id)]
+        assert second["next_cursor"] is None
+        assert second["total"] == 3
+
+
+    @pytest.mark.asyncio
+    async def test_get_summary_history_reads_only_previews(
+        self, 
+        authenticated_client: AsyncClient, 
+        db_session: AsyncSession,
+        sample_summaries: list[Summary]
+    ):
+        """Test that the list uses stored previews and never selects full texts."""
+        from sqlalchemy import event
+
+        sample_summaries[0].summary_preview = "Stored preview"
+        db_session.add(sample_summaries[0])
+        await db_session.commit()
+
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await authenticated_client.get("/api/v1/history/summaries")
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        data = response.json()["data"]
+        assert data[0]["summary_preview"] == "Stored preview"
+        # Summaries without a stored preview fall back to the start of the text
+        assert data[1]["summary_preview"].startswith("This is a test summary for document 1")
+        assert not any("document_contents" in statement for statement in statements)
+        # summary_text is only referenced inside the SQL-side fallback
+        assert all(
+            statement.count("summaries.summary_text") == statement.count("substr(summaries.summary_text")
+            for statement in statements
+        )
+
+
 class TestQuizHistory:
     """Tests for GET /api/v1/history/quizzes endpoint."""
 
@@ -363,6 +416,53 @@ class TestCombinedHistory:
         assert data["total"] == 6
 
 
+    @pytest.mark.asyncio
+    async def test_get_combined_history_pages_interleave_types(
+        self, 
+        authenticated_client: AsyncClient, 
+        sample_summaries: list[Summary],
+        sample_quizzes: list[Quiz]
+    ):
+        """Test that SQL-side pages follow the same order as the full feed."""
+        full = (await authenticated_client.get("/api/v1/history")).json()["data"]
+        second_page = (await authenticated_client.get("/api/v1/history?limit=2&offset=2")).json()
+        
+        assert [item["id"] for item in second_page["data"]] == [item["id"] for item in full[2:4]]
+        # Summaries and quizzes alternate: summary i is newer than quiz i
+        assert [item["type"] for item in full] == ["summary", "quiz"] * 3
+        assert full[0]["preview"].startswith("This is a test summary for document 0")
+
+    @pytest.mark.asyncio
+    async def test_get_combined_history_cursor_walks_feed(
+        self, 
+        authenticated_client: AsyncClient, 
+        sample_summaries: list[Summary],
+        sample_quizzes: list[Quiz]
+    ):
+        """Test that following next_cursor visits every item exactly once, in order."""
+        full = (await authenticated_client.get("/api/v1/history")).json()
+        assert full["next_cursor"] is None
+        
+        seen = []
+        url = "/api/v1/history?limit=4"
+        while url:
+            page = (await authenticated_client.get(url)).json()
+            seen.extend(item["id"] for item in page["data"])
+            assert page["total"] == 6
+            url = f"/api/v1/history?limit=4&cursor={page['next_cursor']}" if page["next_cursor"] else None
+        
+        assert seen == [item["id"] for item in full["data"]]
+
+    @pytest.mark.asyncio
+    async def test_get_history_invalid_cursor(self, authenticated_client: AsyncClient):
+        """Test that a malformed cursor is rejected."""
+        for path in ("/api/v1/history", "/api/v1/history/summaries", "/api/v1/history/quizzes"):
+            response = await authenticated_client.get(f"{path}?cursor=not-a-cursor")
+            
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Invalid pagination cursor"
+
+
 # Additional fixtures for quiz review tests
 @pytest_asyncio.fixture
 async def quiz_with_questions(db_session: AsyncSession, sample_documents: list[Document]) -> Quiz:
@@ -389,7 +489,7 @@ async def quiz_with_questions(db_session: AsyncSession, sample_documents: list[D
         {
             "question_text": "What is the capital of France?",
             "question_type": "multiple_choice",
-            "options": json.dumps(["London", "Paris", "Berlin", "Madrid"]),
+            "options": ["London", "Paris", "Berlin", "Madrid"],
             "correct_answer": "Paris",
             "explanation": "Paris is the capital and largest city of France.",
             "order_index": 0,
@@ -397,7 +497,7 @@ async def quiz_with_questions(db_session: AsyncSession, sample_documents: list[D
         {
             "question_text": "Is the Earth flat?",
             "question_type": "true_false",
-            "options": json.dumps(["True", "False"]),
+            "options": ["True", "False"],
             "correct_answer": "False",
             "explanation": "The Earth is an oblate spheroid.",
             "order_index": 1,
@@ -7,12 +7,14 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlmodel import SQLModel
 from typing import AsyncGenerator
 from unittest.mock import MagicMock, AsyncMock, patch
-from uuid import uuid4
+from uuid import UUID, uuid4
 import json
 
 from app.main import app as fastapi_app
-from app.db.session import get_session
-from app.db.models import Document, Quiz, Question
+from app.db.session import get_session, get_session_factory
+from app.db.models import Document, Quiz, Question, Job
+from app.services.jobs.handlers import JOB_HANDLERS
+from app.services.storage.content import save_document_content
 from app.supabase_client import get_supabase_admin_client
 from app.dependencies import get_current_user
 
@@ -47,6 +49,7 @@ async def client(db_session: AsyncSession, mock_supabase_admin: MagicMock) -> As
         yield db_session
 
     fastapi_app.dependency_overrides[get_session] = override_get_session
+    fastapi_app.dependency_overrides[get_session_factory] = lambda: lambda: AsyncSession(engine)
     fastapi_app.dependency_overrides[get_supabase_admin_client] = lambda: mock_supabase_admin
     # Allow guest access (no authenticated user)
     fastapi_app.dependency_overrides[get_current_user] = lambda: None
@@ -66,10 +69,14 @@ async def sample_document(db_session: AsyncSession) -> Document:
         filename="test_notes.txt",
         file_type="text/plain",
         storage_path="user_uploads/test.txt",
-        raw_content="This is a test document about Python programming. Python is a high-level programming language. It supports multiple programming paradigms.",
         status="text-extracted"
     )
     db_session.add(document)
+    await save_document_content(
+        db_session,
+        document.id,
+        "This is a test document about Python programming. Python is a high-level programming language. It supports multiple programming paradigms.",
+    )
     await db_session.commit()
     await db_session.refresh(document)
     return document
@@ -96,7 +103,7 @@ async def sample_quiz_with_questions(db_session: AsyncSession, sample_document:
         quiz_id=quiz.id,
         question_type="multiple_choice",
         question_text="What is Python?",
-        options=json.dumps(["A. A snake", "B. A programming language", "C. A database", "D. An OS"]),
+        options=["A. A snake", "B. A programming language", "C. A database", "D. An OS"],
         correct_answer="B",
         explanation="Python is a high-level programming language.",
         order_index=0
@@ -106,7 +113,7 @@ async def sample_quiz_with_questions(db_session: AsyncSession, sample_document:
         quiz_id=quiz.id,
         question_type="true_false",
         question_text="Python supports multiple programming paradigms.",
-        options=json.dumps(["True", "False"]),
+        options=["True", "False"],
         correct_answer="True",
         explanation="Python supports procedural, object-oriented, and functional programming.",
         order_index=1
@@ -168,7 +175,7 @@ async def test_generate_quiz_document_not_found(client: AsyncClient):
 @pytest.mark.asyncio
 async def test_generate_quiz_no_text_extracted(client: AsyncClient, db_session: AsyncSession):
     """Test quiz generation fails when document has no extracted text."""
-    # Create document without raw_content
+    # Create document without extracted text
     document = Document(
         id=uuid4(),
         filename="empty.txt",
@@ -192,6 +199,7 @@ async def test_generate_quiz_no_text_extracted(client: AsyncClient, db_session:
 async def test_generate_quiz_success(
     mock_gemini: AsyncMock,
     client: AsyncClient,
+    db_session: AsyncSession,
     sample_document: Document
 ):
     """Test successful quiz generation."""
@@ -214,8 +222,112 @@ async def test_generate_quiz_success(
     assert response.status_code == 202
     data = response.json()
     assert data["status"] == "success"
-    assert data["data"]["status"] == "ready"
-    assert data["data"]["total_questions"] == 1
+    assert data["data"]["status"] == "generating"
+
+    # Run the queued generation job as the worker would
+    from sqlmodel import select
+    job = (await db_session.execute(select(Job))).scalars().one()
+    assert job.job_type == "generate_quiz"
+    await JOB_HANDLERS[job.job_type](json.loads(job.payload), db_session)
+
+    quiz = await db_session.get(Quiz, UUID(data["data"]["id"]))
+    await db_session.refresh(quiz)
+    assert quiz.status == "ready"
+    assert quiz.total_questions == 1
+
+
+@pytest.mark.asyncio
+@patch('app.services.ai_generation.quiz_generator.call_gemini_quiz')
+async def test_generate_quiz_inserts_questions_in_one_statement(
+    mock_gemini: AsyncMock,
+    db_session: AsyncSession,
+    sample_document: Document
+):
+    """Test that all generated questions are written with a single multi-row INSERT."""
+    from sqlalchemy import event
+    from sqlmodel import select
+    from app.services.ai_generation.quiz_generator import generate_quiz
+
+    mock_gemini.return_value = json.dumps([
+        {"question_type": "true_false", "question_text": f"Statement {i}?", "options": ["True", "False"],
+         "correct_answer": "True", "explanation": None}
+        for i in range(5)
+    ])
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        quiz = await generate_quiz(sample_document.id, None, 5, None, db_session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert sum(stmt.startswith("INSERT INTO questions") for stmt in statements) == 1
+    assert quiz.status == "ready"
+    assert quiz.total_questions == 5
+    questions = (await db_session.execute(
+        select(Question).where(Question.quiz_id == quiz.id).order_by(Question.order_index)
+    )).scalars().all()
+    assert [q.question_text for q in questions] == [f"Statement {i}?" for i in range(5)]
+
+
+@pytest.mark.asyncio
+@patch('app.services.ai_generation.quiz_generator.call_gemini_quiz')
+async def test_regenerating_a_quiz_replaces_its_questions(
+    mock_gemini: AsyncMock,
+    db_session: AsyncSession,
+    sample_document: Document
+):
+    """Test that a retried generation job leaves one set of questions on the quiz."""
+    from sqlmodel import select
+    from app.services.ai_generation.quiz_generator import generate_quiz
+
+    def questions_json(prefix: str, count: int) -> str:
+        return json.dumps([
+            {"question_type": "true_false", "question_text": f"{prefix} {i}?", "options": ["True", "False"],
+             "correct_answer": "True", "explanation": None}
+            for i in range(count)
+        ])
+
+    mock_gemini.return_value = questions_json("First", 3)
+    quiz = await generate_quiz(sample_document.id, None, 3, None, db_session)
+    mock_gemini.return_value = questions_json("Second", 2)
+    quiz = await generate_quiz(sample_document.id, None, 2, None, db_session, quiz_id=quiz.id)
+
+    assert quiz.status == "ready"
+    assert quiz.total_questions == 2
+    questions = (await db_session.execute(
+        select(Question).where(Question.quiz_id == quiz.id).order_by(Question.order_index)
+    )).scalars().all()
+    assert [q.question_text for q in questions] == ["Second 0?", "Second 1?"]
+
+
+@pytest.mark.asyncio
+@patch('app.services.ai_generation.quiz_generator.invalidate_quiz', new_callable=AsyncMock)
+@patch('app.services.ai_generation.quiz_generator.call_gemini_quiz')
+async def test_generated_quiz_stays_ready_when_a_post_commit_step_fails(
+    mock_gemini: AsyncMock,
+    mock_invalidate: AsyncMock,
+    db_session: AsyncSession,
+    sample_document: Document
+):
+    """Test that a failure after the questions are committed does not mark the quiz failed."""
+    from app.services.ai_generation.quiz_generator import generate_quiz
+
+    mock_gemini.return_value = json.dumps([
+        {"question_type": "true_false", "question_text": "Statement?", "options": ["True", "False"],
+         "correct_answer": "True", "explanation": None}
+    ])
+    mock_invalidate.side_effect = RuntimeError("cache unavailable")
+
+    quiz = await generate_quiz(sample_document.id, None, 1, None, db_session)
+    quiz_id = quiz.id
+
+    db_session.expire_all()
+    stored = await db_session.get(Quiz, quiz_id)
+    assert stored.status == "ready"
+    assert stored.total_questions == 1
 
 
 @pytest.mark.asyncio
@@ -232,6 +344,42 @@ async def test_get_quiz_success(client: AsyncClient, sample_quiz_with_questions:
         assert "correct_answer" not in q
 
 
+@pytest.mark.asyncio
+async def test_get_quiz_is_served_from_cache(client: AsyncClient, sample_quiz_with_questions: Quiz):
+    """Test that a ready quiz is served from the quiz cache without database queries."""
+    from sqlalchemy import event
+    from app.services.read_models.quiz_cache import get_cached_quiz, invalidate_quiz
+
+    first = await client.get(f"/api/v1/quizzes/{sample_quiz_with_questions.id}")
+    assert first.status_code == 200
+    assert await get_cached_quiz(sample_quiz_with_questions.id) is not None
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        second = await client.get(f"/api/v1/quizzes/{sample_quiz_with_questions.id}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert statements == []
+
+    # An authenticated user who does not own the quiz is still rejected on a cache hit
+    owner_id = uuid4()
+    sample_quiz_with_questions.user_id = owner_id
+    await invalidate_quiz(sample_quiz_with_questions.id)
+    other_user = MagicMock()
+    other_user.id = str(uuid4())
+    fastapi_app.dependency_overrides[get_current_user] = lambda: None
+    assert (await client.get(f"/api/v1/quizzes/{sample_quiz_with_questions.id}")).status_code == 200
+    fastapi_app.dependency_overrides[get_current_user] = lambda: other_user
+    assert (await client.get(f"/api/v1/quizzes/{sample_quiz_with_questions.id}")).status_code == 403
+    await invalidate_quiz(sample_quiz_with_questions.id)
+
+
 @pytest.mark.asyncio
 async def test_get_quiz_not_found(client: AsyncClient):
     """Test getting a non-existent quiz."""
@@ -310,6 +458,19 @@ async def test_get_quizzes_for_nonexistent_document(client: AsyncClient):
     assert response.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_stream_quiz_status(client: AsyncClient, sample_quiz_with_questions: Quiz):
+    """Test that the status stream of a ready quiz sends its status and ends."""
+    response = await client.get(f"/api/v1/quizzes/{sample_quiz_with_questions.id}/status/stream")
+    assert response.status_code == 200
+    assert response.text.startswith("event: status\n")
+    event = json.loads(response.text.split("\n")[1].removeprefix("data: "))
+    assert event == {"type": "quiz", "id": str(sample_quiz_with_questions.id), "status": "ready"}
+
+    response = await client.get(f"/api/v1/quizzes/{uuid4()}/status/stream")
+    assert response.status_code == 404
+
+
 # --- Tests for Quiz Generator Service ---
 
 @pytest.mark.asyncio
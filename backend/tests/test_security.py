@@ -0,0 +1,96 @@
+# backend/tests/test_security.py
+
+import json
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.core.cache import LRUCache
+from app.core.security import AuthenticatedUser, TokenVerifier, set_token_verifier
+from app.dependencies import get_current_user
+
+pytestmark = pytest.mark.asyncio
+
+SECRET = "super-secret-jwt-token-with-at-least-32-characters"
+JWKS_URL = "https://test.supabase.co/auth/v1/.well-known/jwks.json"
+
+
+def make_verifier(**overrides) -> TokenVerifier:
+    options = dict(
+        secret=SECRET,
+        audience="authenticated",
+        jwks_url=JWKS_URL,
+        jwks_cache_seconds=600,
+        leeway_seconds=0,
+        cache=LRUCache(max_entries=100),
+        cache_ttl_seconds=60,
+    )
+    options.update(overrides)
+    return TokenVerifier(**options)
+
+
+def claims(**overrides) -> dict:
+    return {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 3600,
+            "email": "a@example.com", "role": "authenticated", **overrides}
+
+
+async def test_verifies_hs256_tokens_and_caches_them():
+    verifier = make_verifier()
+    token = jwt.encode(claims(), SECRET, algorithm="HS256")
+
+    user = await verifier.verify(token)
+    assert user == AuthenticatedUser(id="user-1", email="a@example.com", role="authenticated")
+
+    with patch("app.core.security.jwt.decode") as decode:
+        assert (await verifier.verify(token)).id == "user-1"
+    decode.assert_not_called()
+
+
+@pytest.mark.parametrize("token", [
+    jwt.encode(claims(exp=int(time.time()) - 10), SECRET, algorithm="HS256"),
+    jwt.encode(claims(aud="anon-other"), SECRET, algorithm="HS256"),
+    jwt.encode(claims(), "wrong-secret-wrong-secret-wrong-secret", algorithm="HS256"),
+    jwt.encode({"aud": "authenticated", "exp": int(time.time()) + 60}, SECRET, algorithm="HS256"),
+    "not-a-jwt",
+])
+async def test_rejects_invalid_tokens(token):
+    with pytest.raises(jwt.InvalidTokenError):
+        await make_verifier().verify(token)
+
+
+async def test_verifies_asymmetric_tokens_with_cached_jwks():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk_set = jwt.PyJWKSet.from_dict({"keys": [{**public_jwk, "kid": "key-1", "alg": "RS256", "use": "sig"}]})
+    verifier = make_verifier()
+
+    with patch.object(jwt.PyJWKClient, "get_jwk_set", return_value=jwk_set) as fetch:
+        for subject in ("user-1", "user-2"):
+            token = jwt.encode(claims(sub=subject), private_key, algorithm="RS256", headers={"kid": "key-1"})
+            assert (await verifier.verify(token)).id == subject
+
+        # Unknown key ids do not refetch again right away
+        unknown = jwt.encode(claims(), private_key, algorithm="RS256", headers={"kid": "key-2"})
+        with pytest.raises(jwt.InvalidKeyError):
+            await verifier.verify(unknown)
+
+    assert fetch.call_count == 1
+
+
+async def test_get_current_user_verifies_locally():
+    set_token_verifier(make_verifier())
+    try:
+        token = jwt.encode(claims(sub="user-42"), SECRET, algorithm="HS256")
+        with patch("app.dependencies.get_supabase_anon_client") as supabase:
+            user = await get_current_user(authorization=f"Bearer {token}")
+            guest = await get_current_user(authorization="Bearer invalid")
+        supabase.assert_not_called()
+
+        assert user.id == "user-42"
+        assert guest is None
+        assert await get_current_user(authorization=None) is None
+    finally:
+        set_token_verifier(None)
@@ -0,0 +1,55 @@
+# backend/tests/test_supabase_client.py
+
+import jwt
+import pytest
+
+from app.core.config import settings
+from app import supabase_client
+from app.supabase_client import (
+    close_supabase_clients,
+    get_http_client,
+    get_supabase_admin_client,
+    get_supabase_anon_client,
+    get_supabase_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def supabase_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_URL", "https://test.supabase.co")
+    monkeypatch.setattr(settings, "SUPABASE_ANON_KEY", jwt.encode({"role": "anon"}, "secret-secret-secret-secret-secret!"))
+    monkeypatch.setattr(settings, "SUPABASE_SERVICE_ROLE_KEY", jwt.encode({"role": "service_role"}, "secret-secret-secret-secret-secret!"))
+    close_supabase_clients()
+    yield
+    close_supabase_clients()
+
+
+def test_shared_clients_are_created_once():
+    assert get_supabase_admin_client() is get_supabase_admin_client()
+    assert get_supabase_anon_client() is get_supabase_anon_client()
+    assert get_supabase_admin_client() is not get_supabase_anon_client()
+
+
+def test_request_clients_isolate_sessions_but_share_connections():
+    first, second = get_supabase_client(), get_supabase_client()
+
+    assert first is not second
+    assert first.auth is not second.auth
+    http_client = get_http_client()
+    for client in (first, second, get_supabase_admin_client()):
+        assert client.options.httpx_client is http_client
+        assert client.options.persist_session is False
+    # Credentials travel per request, never as defaults on the shared pool
+    assert "apikey" not in http_client.headers
+    assert "Authorization" not in http_client.headers
+
+
+def test_close_releases_the_pool():
+    admin = get_supabase_admin_client()
+    http_client = get_http_client()
+
+    close_supabase_clients()
+
+    assert http_client.is_closed
+    assert supabase_client._admin_client is None
+    assert get_supabase_admin_client() is not admin
@@ -32,6 +32,7 @@ import * as supabaseUtils from '../src/utils/supabase'
 
 const mockGetSummary = docService.getSummary as jest.Mock
 const mockGetSummaryStatus = docService.getSummaryStatus as jest.Mock
+const mockWaitForDocumentStatus = docService.waitForDocumentStatus as jest.Mock
 const mockCreateBrowserClient = supabaseUtils.createBrowserClient as jest.Mock
 
 // Mock initial state for Zustand store
@@ -97,6 +98,25 @@ describe('SummaryDisplayPage', () => {
     })
   })
 
+  it('waits for the streamed status while the summary is generated', async () => {
+    mockGetSummaryStatus.mockResolvedValue({ status: 'summarizing' })
+    mockWaitForDocumentStatus.mockResolvedValue('summarized')
+    mockGetSummary.mockResolvedValue({ summary_text: 'Streamed summary.' })
+
+    render(<SummaryDisplayPage />)
+
+    await waitFor(() => {
+      const markdownContent = screen.getByTestId('markdown-content')
+      expect(markdownContent.textContent).toContain('Streamed summary.')
+    })
+    expect(mockWaitForDocumentStatus).toHaveBeenCalledWith(
+      'test-doc-id',
+      expect.arrayContaining(['summarized', 'summary-failed']),
+      'test-token',
+      expect.any(Object),
+    )
+  })
+
   it('copies summary to clipboard', async () => {
     mockGetSummaryStatus.mockResolvedValue({ status: 'completed' })
     mockGetSummary.mockResolvedValue({ summary_text: 'This is a summary.' })
@@ -6,6 +6,7 @@ import {
   getQuiz,
   submitQuiz,
   getQuizzesForDocument,
+  waitForQuizReady,
 } from '../../src/services/quizzes'
 
 jest.mock('axios')
@@ -118,6 +119,84 @@ describe('Quizzes Service', () => {
     })
   })
 
+  describe('waitForQuizReady', () => {
+    const quizWithStatus = (status: string) => ({
+      data: {
+        id: 'quiz-123',
+        document_id: 'doc-456',
+        title: 'Test Quiz',
+        status,
+        total_questions: status === 'ready' ? 1 : 0,
+        created_at: '2025-12-07T12:00:00Z',
+        questions: [],
+      },
+    })
+
+    it('should poll until the quiz is ready', async () => {
+      mockedAxios.get
+        .mockResolvedValueOnce(quizWithStatus('generating'))
+        .mockResolvedValueOnce(quizWithStatus('generating'))
+        .mockResolvedValueOnce(quizWithStatus('ready'))
+
+      const result = await waitForQuizReady('quiz-123', 'test-token', { intervalMs: 0 })
+
+      expect(mockedAxios.get).toHaveBeenCalledTimes(3)
+      expect(mockedAxios.get).toHaveBeenCalledWith(
+        '/api/v1/quizzes/quiz-123',
+        { headers: { Authorization: 'Bearer test-token' } }
+      )
+      expect(result.status).toBe('ready')
+    })
+
+    it('should throw when generation fails', async () => {
+      mockedAxios.get
+        .mockResolvedValueOnce(quizWithStatus('generating'))
+        .mockResolvedValueOnce(quizWithStatus('failed'))
+
+      await expect(
+        waitForQuizReady('quiz-123', undefined, { intervalMs: 0 })
+      ).rejects.toThrow('Failed to generate quiz: generation failed')
+    })
+
+    it('should give up after the timeout', async () => {
+      mockedAxios.get.mockResolvedValueOnce(quizWithStatus('generating'))
+
+      await expect(
+        waitForQuizReady('quiz-123', undefined, { intervalMs: 0, timeoutMs: 0 })
+      ).rejects.toThrow('timed out')
+    })
+
+    it('should wait for the streamed status before fetching the quiz', async () => {
+      const sources: any[] = []
+      ;(global as any).EventSource = class {
+        listeners: Record<string, (event: { data: string }) => void> = {}
+        onerror = null
+        constructor(public url: string) {
+          sources.push(this)
+        }
+        addEventListener(type: string, listener: (event: { data: string }) => void) {
+          this.listeners[type] = listener
+        }
+        close() {}
+      }
+      mockedAxios.get.mockResolvedValueOnce(quizWithStatus('ready'))
+
+      try {
+        const result = waitForQuizReady('quiz-123', undefined, { intervalMs: 0 })
+        expect(sources[0].url).toBe('/api/v1/quizzes/quiz-123/status/stream')
+        expect(mockedAxios.get).not.toHaveBeenCalled()
+        sources[0].listeners.status({
+          data: JSON.stringify({ type: 'quiz', id: 'quiz-123', status: 'ready' }),
+        })
+
+        expect((await result).status).toBe('ready')
+        expect(mockedAxios.get).toHaveBeenCalledTimes(1)
+      } finally {
+        delete (global as any).EventSource
+      }
+    })
+  })
+
   describe('submitQuiz', () => {
     const mockSubmitResponse = {
       data: {
@@ -0,0 +1,89 @@
+// frontend/__tests__/services/status-stream.test.ts
+import axios from 'axios'
+import { waitForDocumentStatus } from '@/services/documents'
+import {
+  DOCUMENT_TERMINAL_STATUSES,
+  waitForStreamedStatus,
+} from '@/services/status-stream'
+
+jest.mock('axios')
+const mockedAxios = axios as jest.Mocked<typeof axios>
+
+class FakeEventSource {
+  static instances: FakeEventSource[] = []
+  listeners: Record<string, (event: MessageEvent) => void> = {}
+  onerror: (() => void) | null = null
+  closed = false
+
+  constructor(public url: string) {
+    FakeEventSource.instances.push(this)
+  }
+
+  addEventListener(type: string, listener: (event: MessageEvent) => void) {
+    this.listeners[type] = listener
+  }
+
+  close() {
+    this.closed = true
+  }
+
+  emit(status: string) {
+    this.listeners.status({
+      data: JSON.stringify({ type: 'document', id: 'doc-1', status }),
+    } as MessageEvent)
+  }
+}
+
+describe('Status stream', () => {
+  beforeEach(() => {
+    FakeEventSource.instances = []
+    ;(global as any).EventSource = FakeEventSource
+  })
+
+  afterEach(() => {
+    delete (global as any).EventSource
+    jest.clearAllMocks()
+  })
+
+  it('should resolve with the first awaited status and close the stream', async () => {
+    const result = waitForStreamedStatus(
+      '/api/v1/documents/doc-1/status/stream',
+      DOCUMENT_TERMINAL_STATUSES,
+      1000,
+    )
+    const source = FakeEventSource.instances[0]
+    source.emit('summarizing')
+    source.emit('summarized')
+
+    await expect(result).resolves.toBe('summarized')
+    expect(source.url).toBe('/api/v1/documents/doc-1/status/stream')
+    expect(source.closed).toBe(true)
+  })
+
+  it('should resolve with null when the stream fails', async () => {
+    const result = waitForStreamedStatus('/stream', ['ready'], 1000)
+    FakeEventSource.instances[0].onerror?.()
+
+    await expect(result).resolves.toBeNull()
+  })
+
+  it('should fall back to polling when the stream fails', async () => {
+    mockedAxios.get
+      .mockRejectedValueOnce(new Error('Not Found'))
+      .mockResolvedValueOnce({ data: { status: 'text-extracted' } })
+
+    const result = waitForDocumentStatus(
+      'doc-1',
+      ['text-extracted', ...DOCUMENT_TERMINAL_STATUSES],
+      'test-token',
+      { intervalMs: 0 },
+    )
+    FakeEventSource.instances[0].onerror?.()
+
+    await expect(result).resolves.toBe('text-extracted')
+    expect(mockedAxios.get).toHaveBeenCalledWith(
+      '/api/v1/documents/doc-1/status',
+      { headers: { Authorization: 'Bearer test-token' } },
+    )
+  })
+})
@@ -3,7 +3,8 @@ import { cookies } from 'next/headers'
 
 /**
  * Catch-all API route that proxies requests to the backend FastAPI server.
- * Supports all HTTP methods and passes through FormData for file uploads.
+ * Supports all HTTP methods, passes through FormData for file uploads and
+ * streams Server-Sent Events responses unbuffered.
  */
 export async function POST(
   req: NextRequest,
@@ -95,8 +96,24 @@ async function handleApiRequest(
           : JSON.stringify(body)
         : undefined,
       credentials: 'include',
+      // Closes the backend request when the client goes away (event streams)
+      signal: req.signal,
     })
 
+    // Pass event streams (status updates) through as they arrive
+    if (
+      backendResponse.headers.get('content-type')?.includes('text/event-stream')
+    ) {
+      return new Response(backendResponse.body, {
+        status: backendResponse.status,
+        headers: {
+          'Content-Type': 'text/event-stream',
+          'Cache-Control': 'no-cache',
+          'X-Accel-Buffering': 'no',
+        },
+      })
+    }
+
     // Get the response data
     const responseData = await backendResponse.json().catch(() => null)
 
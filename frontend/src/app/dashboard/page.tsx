@@ -6,8 +6,9 @@ import React, { useState, useEffect, useCallback } from 'react'
 import { useRouter } from 'next/navigation'
 import Link from 'next/link'
 import FileUploadZone from '@/app/upload/components/FileUploadZone'
-import { uploadDocument, generateSummary, getSummaryStatus } from '@/services/documents'
-import { generateQuiz } from '@/services/quizzes'
+import { uploadDocument, generateSummary, waitForDocumentStatus } from '@/services/documents'
+import { DOCUMENT_TERMINAL_STATUSES } from '@/services/status-stream'
+import { generateQuiz, waitForQuizReady } from '@/services/quizzes'
 import { getSummaryHistory, getQuizHistory, type SummaryHistoryItem, type QuizHistoryItem } from '@/services/history'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
@@ -143,22 +144,12 @@ const DashboardPage: React.FC = () => {
     setProcessingAction(true)
     try {
       // Wait for text extraction to complete, then generate summary
-      let retries = 0
-      const maxRetries = 30
-      let status = null
-      
-      while (retries < maxRetries) {
-        try {
-          status = await getSummaryStatus(uploadedDocumentId, accessToken || undefined)
-          if (status.status === 'text-extracted' || status.status === 'summary-ready') {
-            break
-          }
-        } catch (e) {
-          // Status endpoint might fail if document not ready
-        }
-        await new Promise(resolve => setTimeout(resolve, 1000))
-        retries++
-      }
+      await waitForDocumentStatus(
+        uploadedDocumentId,
+        ['text-extracted', ...DOCUMENT_TERMINAL_STATUSES],
+        accessToken || undefined,
+        { timeoutMs: 30000 },
+      )
       
       // Trigger summary generation
       await generateSummary(uploadedDocumentId, accessToken || undefined)
@@ -186,26 +177,19 @@ const DashboardPage: React.FC = () => {
     setProcessingAction(true)
     try {
       // Wait for text extraction to complete
-      let retries = 0
-      const maxRetries = 30
-      let status = null
-      
-      while (retries < maxRetries) {
-        try {
-          status = await getSummaryStatus(uploadedDocumentId, accessToken || undefined)
-          if (status.status === 'text-extracted' || status.status === 'summary-ready') {
-            break
-          }
-        } catch (e) {
-          // Status endpoint might fail if document not ready
-        }
-        await new Promise(resolve => setTimeout(resolve, 1000))
-        retries++
-      }
+      await waitForDocumentStatus(
+        uploadedDocumentId,
+        ['text-extracted', ...DOCUMENT_TERMINAL_STATUSES],
+        accessToken || undefined,
+        { timeoutMs: 30000 },
+      )
       
       // Generate quiz
       const quiz = await generateQuiz(uploadedDocumentId, 5, undefined, accessToken || undefined)
       
+      // Questions are generated in the background; wait until they exist
+      await waitForQuizReady(quiz.id, accessToken || undefined)
+      
       // Navigate to quiz page
       window.location.href = `/quizzes/${quiz.id}`
     } catch (error: any) {
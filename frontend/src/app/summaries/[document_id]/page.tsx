@@ -6,12 +6,16 @@ import { useParams } from 'next/navigation'
 import ReactMarkdown from 'react-markdown'
 import { CopyToClipboard } from 'react-copy-to-clipboard'
 import { useSummaryStore } from '@/lib/store'
-import { getSummary, getSummaryStatus } from '@/services/documents'
+import { getSummary, getSummaryStatus, waitForDocumentStatus } from '@/services/documents'
+import { DOCUMENT_TERMINAL_STATUSES } from '@/services/status-stream'
 import { Button } from '@/components/ui/button'
 import { GenerateQuizButton } from '@/components/quiz'
 import { FeedbackButton } from '@/components/feedback'
 import type { Session } from '@supabase/supabase-js'
 
+// Give up waiting for a summary after this long
+const SUMMARY_WAIT_MS = 10 * 60 * 1000
+
 const SummaryDisplayPage = () => {
   const params = useParams()
   const documentId = params.document_id as string
@@ -77,21 +81,33 @@ const SummaryDisplayPage = () => {
         const statusData = await getSummaryStatus(documentId, accessToken)
         console.log('Status data received:', statusData)
 
+        let status: string | null = statusData.status
         if (
-          statusData.status === 'completed' ||
-          statusData.status === 'summarized'
+          status !== 'completed' &&
+          status !== 'failed' &&
+          !DOCUMENT_TERMINAL_STATUSES.includes(statusData.status)
         ) {
+          console.log(`Status is ${status}, waiting for the summary...`)
+          // Pushed by the status stream; polled every 5s if it is unavailable
+          status = await waitForDocumentStatus(
+            documentId,
+            DOCUMENT_TERMINAL_STATUSES,
+            accessToken,
+            { intervalMs: 5000, timeoutMs: SUMMARY_WAIT_MS },
+          )
+        }
+
+        if (status === 'completed' || status === 'summarized') {
           console.log('Summary completed, fetching summary...')
           const summary = await getSummary(documentId, accessToken)
           console.log('Summary received:', summary)
           addSummary(documentId, summary.summary_text, summary.summary_id)
-        } else if (statusData.status === 'failed') {
+        } else if (!status) {
+          console.log('Timed out waiting for the summary')
+          setSummaryError(documentId, 'Timed out waiting for the summary.')
+        } else {
           console.log('Summary generation failed')
           setSummaryError(documentId, 'Summary generation failed.')
-        } else {
-          console.log(`Status is ${statusData.status}, polling again in 5s...`)
-          // If processing, poll again after a delay
-          setTimeout(fetchStatus, 5000)
         }
       } catch (error) {
         console.error('Error fetching status:', error)
@@ -5,7 +5,7 @@ import React from 'react'
 import { Button } from '@/components/ui/button'
 import { Spinner } from '@/components/ui/spinner'
 import { useQuizStore } from '@/lib/quizStore'
-import { generateQuiz, getQuiz } from '@/services/quizzes'
+import { generateQuiz, waitForQuizReady } from '@/services/quizzes'
 import { useRouter } from 'next/navigation'
 import { FileQuestion } from 'lucide-react'
 
@@ -33,8 +33,8 @@ export function GenerateQuizButton({
       // Generate quiz via API
       const quiz = await generateQuiz(documentId, numQuestions, undefined, accessToken)
       
-      // Fetch the full quiz with questions
-      const quizWithQuestions = await getQuiz(quiz.id, accessToken)
+      // Questions are generated in the background; wait for them
+      const quizWithQuestions = await waitForQuizReady(quiz.id, accessToken)
       
       // Set in store
       setCurrentQuiz(quizWithQuestions)
@@ -1,6 +1,7 @@
 // frontend/src/services/documents.ts
 
 import axios from 'axios'
+import { waitForStreamedStatus } from './status-stream'
 
 interface UploadResponse {
   document_id: string
@@ -149,3 +150,46 @@ export const getSummaryStatus = async (
     }
   }
 }
+
+interface WaitForDocumentStatusOptions {
+  intervalMs?: number
+  timeoutMs?: number
+}
+
+/**
+ * Wait until a document reaches one of statuses (include the terminal ones).
+ *
+ * Listens on the document's status stream and falls back to polling
+ * getSummaryStatus when the stream is unavailable. Resolves with the status
+ * reached, or null on timeout.
+ */
+export const waitForDocumentStatus = async (
+  documentId: string,
+  statuses: string[],
+  accessToken?: string,
+  { intervalMs = 1000, timeoutMs = 120000 }: WaitForDocumentStatusOptions = {},
+): Promise<string | null> => {
+  const deadline = Date.now() + timeoutMs
+
+  const streamed = await waitForStreamedStatus(
+    `/api/v1/documents/${documentId}/status/stream`,
+    statuses,
+    timeoutMs,
+  )
+  if (streamed) {
+    return streamed
+  }
+
+  while (Date.now() < deadline) {
+    try {
+      const { status } = await getSummaryStatus(documentId, accessToken)
+      if (statuses.includes(status)) {
+        return status
+      }
+    } catch (e) {
+      // Status endpoint might fail if document not ready
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs))
+  }
+  return null
+}
@@ -2,6 +2,7 @@
 
 import axios from 'axios'
 import { Quiz, QuizResults, QuestionType } from '@/lib/quizStore'
+import { QUIZ_TERMINAL_STATUSES, waitForStreamedStatus } from './status-stream'
 
 interface GenerateQuizRequest {
   document_id: string
@@ -108,6 +109,47 @@ export const getQuiz = async (
   }
 }
 
+interface WaitForQuizOptions {
+  intervalMs?: number
+  timeoutMs?: number
+}
+
+/**
+ * Wait until a generated quiz is ready and return it with its questions.
+ *
+ * Quiz generation runs in the background: the generate endpoint answers
+ * 202 with status "generating", so the quiz has no questions yet. The quiz's
+ * status stream reports when generation ends; the quiz is then fetched.
+ */
+export const waitForQuizReady = async (
+  quizId: string,
+  accessToken?: string,
+  { intervalMs = 1000, timeoutMs = 120000 }: WaitForQuizOptions = {}
+): Promise<QuizWithQuestionsResponse> => {
+  const deadline = Date.now() + timeoutMs
+
+  // Wait for the pushed status first; polling covers a missing or failed stream
+  await waitForStreamedStatus(
+    `/api/v1/quizzes/${quizId}/status/stream`,
+    QUIZ_TERMINAL_STATUSES,
+    timeoutMs,
+  )
+
+  while (true) {
+    const quiz = await getQuiz(quizId, accessToken)
+    if (quiz.status === 'ready') {
+      return quiz
+    }
+    if (quiz.status === 'failed') {
+      throw new Error('Failed to generate quiz: generation failed')
+    }
+    if (Date.now() >= deadline) {
+      throw new Error('Failed to generate quiz: timed out waiting for questions')
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs))
+  }
+}
+
 /**
  * Submit quiz answers and get results
  */
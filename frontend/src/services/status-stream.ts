@@ -0,0 +1,60 @@
+// frontend/src/services/status-stream.ts
+
+/**
+ * Status updates pushed by the backend's Server-Sent Events endpoints
+ * (/api/v1/documents/{id}/status/stream and /api/v1/quizzes/{id}/status/stream).
+ *
+ * The streams send the current status, then every transition, and close after
+ * a terminal status.
+ */
+
+// Statuses after which a document or quiz no longer changes
+export const DOCUMENT_TERMINAL_STATUSES = [
+  'summarized',
+  'summary-failed',
+  'extraction-failed',
+]
+export const QUIZ_TERMINAL_STATUSES = ['ready', 'failed']
+
+interface StatusEvent {
+  type: 'document' | 'quiz'
+  id: string
+  status: string
+}
+
+/**
+ * Wait for the stream at url to report one of statuses.
+ *
+ * Resolves with that status, or with null when the stream is unavailable
+ * (no EventSource support, connection error) or timeoutMs passes, so callers
+ * can fall back to polling. statuses should include the terminal statuses:
+ * the stream closes after them.
+ */
+export const waitForStreamedStatus = (
+  url: string,
+  statuses: string[],
+  timeoutMs: number,
+): Promise<string | null> => {
+  if (typeof EventSource === 'undefined' || timeoutMs <= 0) {
+    return Promise.resolve(null)
+  }
+
+  return new Promise(resolve => {
+    const source = new EventSource(url)
+    const finish = (status: string | null) => {
+      clearTimeout(timer)
+      source.close()
+      resolve(status)
+    }
+    const timer = setTimeout(() => finish(null), timeoutMs)
+
+    source.addEventListener('status', event => {
+      const data: StatusEvent = JSON.parse((event as MessageEvent).data)
+      if (statuses.includes(data.status)) {
+        finish(data.status)
+      }
+    })
+    // EventSource would reconnect on its own; polling is cheaper to reason about
+    source.onerror = () => finish(null)
+  })
+}